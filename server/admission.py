@@ -0,0 +1,130 @@
+"""
+Admission control for live sessions and describe pipelines.
+
+An AdmissionController allows at most `max_active` holders at once. When
+it is full, up to `queue_size` callers wait (FIFO) for at most
+`queue_timeout_s`. Everyone beyond that is shed straight away with a
+retry-after hint, instead of being admitted and making every session slower.
+
+`max_active <= 0` disables the cap.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict
+
+
+class Overloaded(RuntimeError):
+    def __init__(self, what: str, retry_after_s: float):
+        super().__init__(f"{what} is at capacity, retry in {retry_after_s:.0f}s")
+        self.retry_after_s = retry_after_s
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        name: str,
+        max_active: int,
+        queue_size: int = 0,
+        queue_timeout_s: float = 2.0,
+        retry_after_s: float = 5.0,
+    ):
+        self.name = name
+        self.max_active = max_active
+        self.queue_size = queue_size
+        self.queue_timeout_s = queue_timeout_s
+        self.retry_after_s = retry_after_s
+
+        self._sem = asyncio.Semaphore(max_active) if max_active > 0 else None
+        self.active = 0
+        self.waiting = 0
+
+        self.admitted = 0
+        self.admitted_after_wait = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.wait_s_total = 0.0
+
+    @property
+    def limited(self) -> bool:
+        return self._sem is not None
+
+    async def acquire(self, wait: bool = True) -> bool:
+        """Take a slot; False means the caller was shed and must not proceed."""
+        if self._sem is None:
+            self.active += 1
+            self.admitted += 1
+            return True
+
+        if not self._sem.locked():
+            await self._sem.acquire()  # free slot: returns without suspending
+        else:
+            if not wait or self.waiting >= self.queue_size:
+                self.shed_queue_full += 1
+                return False
+            self.waiting += 1
+            t0 = time.monotonic()
+            try:
+                await asyncio.wait_for(self._sem.acquire(), self.queue_timeout_s)
+            except asyncio.TimeoutError:
+                self.shed_timeout += 1
+                return False
+            finally:
+                self.waiting -= 1
+                self.wait_s_total += time.monotonic() - t0
+            self.admitted_after_wait += 1
+
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        if self._sem is not None:
+            self._sem.release()
+
+    async def run(self, factory, wait: bool = True):
+        """Await `factory()` inside a slot, or raise Overloaded."""
+        if not await self.acquire(wait=wait):
+            raise Overloaded(self.name, self.retry_after_s)
+        try:
+            return await factory()
+        finally:
+            self.release()
+
+    @property
+    def shed(self) -> int:
+        return self.shed_queue_full + self.shed_timeout
+
+    def stats(self) -> Dict[str, Any]:
+        waited = self.admitted_after_wait + self.shed_timeout
+        return {
+            "max_active": self.max_active,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_timeout": self.shed_timeout,
+            "waited": waited,
+            "avg_wait_ms": round(1000 * self.wait_s_total / waited, 1) if waited else 0.0,
+        }
+
+
+def admission_from_env(
+    name: str,
+    prefix: str,
+    max_active: int,
+    queue_size: int,
+    queue_timeout_s: float = 2.0,
+    retry_after_s: float = 5.0,
+) -> AdmissionController:
+    """<prefix>_MAX / _QUEUE / _QUEUE_TIMEOUT_S / _RETRY_AFTER_S override the defaults."""
+    return AdmissionController(
+        name,
+        max_active=int(os.getenv(f"{prefix}_MAX", str(max_active))),
+        queue_size=int(os.getenv(f"{prefix}_QUEUE", str(queue_size))),
+        queue_timeout_s=float(os.getenv(f"{prefix}_QUEUE_TIMEOUT_S", str(queue_timeout_s))),
+        retry_after_s=float(os.getenv(f"{prefix}_RETRY_AFTER_S", str(retry_after_s))),
+    )
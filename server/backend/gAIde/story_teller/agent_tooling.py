@@ -5,6 +5,7 @@ from typing import Any, Dict
 # Use a proper package/relative import — NOT "from Test...."
 # If this file lives in gAIde/story_teller/, this relative import will work:
 from .research_function import generate_facts  # async def generate_facts(place, profile, timeout_s=90) -> dict
+from .info_image_agent.tracing import span
 
 # Tool function that ADK will auto-wrap.
 # Keep it async so we don't fight event loops inside ADK.
@@ -12,7 +13,8 @@ async def research_attraction(image: str, profile: Dict[str, Any]) -> Dict[str,
     """
     Return structured facts JSON for an attraction.
     Args:
-      str: a path to an image file (local)
+      image: a "frame:" reference to an in-memory frame, or a local image path
       profile: interests/mobility/locale dict
     """
-    return await generate_facts(image, profile)
\ No newline at end of file
+    with span("research_attraction"):
+        return await generate_facts(image, profile)
\ No newline at end of file
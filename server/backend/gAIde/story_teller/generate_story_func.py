@@ -3,12 +3,16 @@ import asyncio, json, re, uuid, threading
 from typing import Any, Dict, Optional
 
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.genai import types
 
 # Import your orchestrator Storyteller agent factory.
 # Prefer relative import if this file sits in the same package as storyteller_agent/.
 from .story_teller_agent import make_orchestrator  # __init__.py should `from .agent import make_orchestrator`
+from .info_image_agent.genai_client import aclose_genai_async_client
+from .info_image_agent.image_input import ImageInput, register_frame, release_frame
+from .session_store import TASK_SESSIONS
+from .info_image_agent.telemetry import record_upstream_error, stage_timer
+from .info_image_agent.tracing import in_context, span
 
 def _strip_code_fences(text: str) -> str:
     """
@@ -25,23 +29,36 @@ def _strip_code_fences(text: str) -> str:
 
 
 async def generate_story(
-    image: str,
+    image: ImageInput,
     profile: Dict[str, Any],
     timeout_s: int = 90,
 ) -> str:
     """
     Run the Storyteller orchestrator once and return the STORY_SCRIPT as plain text.
     No human prompt is used. The agent will call the research tool internally.
+    `image` may be raw bytes/memoryview (kept in memory end to end) or a file path.
     """
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        # The orchestrator passes the image to its tool as a string: hand it a frame ref
+        ref = register_frame(image)
+        try:
+            return await generate_story(ref, profile, timeout_s)
+        finally:
+            release_frame(ref)
+
+    with span("generate_story", timeout_s=timeout_s):
+        return await _generate_story(image, profile, timeout_s)
+
+
+async def _generate_story(image: ImageInput, profile: Dict[str, Any], timeout_s: int) -> str:
     # Build agent (locale usually lives in profile)
     locale = profile.get("locale", "en-US")
     agent = make_orchestrator(locale=locale)
 
-    # Create an in-memory session and runner
+    # One-shot task session in the shared bounded store (deleted when done)
     app_name, user_id, session_id = "story_app", "svc", f"task-{uuid.uuid4()}"
-    session = InMemorySessionService()
-    await session.create_session(app_name=app_name, user_id=user_id, session_id=session_id)
-    runner = Runner(agent=agent, app_name=app_name, session_service=session)
+    await TASK_SESSIONS.create_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    runner = Runner(agent=agent, app_name=app_name, session_service=TASK_SESSIONS)
 
     # Send ONLY structured inputs; the agent decides to call the tool.
     payload = json.dumps({"image": image, "profile": profile}, ensure_ascii=False)
@@ -55,7 +72,14 @@ async def generate_story(
         return final_text
 
     # Run with a timeout for safety
-    text = await asyncio.wait_for(_run_once(), timeout=timeout_s)
+    try:
+        with stage_timer("story"), span("orchestrator", agent=agent.name, locale=locale):
+            text = await asyncio.wait_for(_run_once(), timeout=timeout_s)
+    except Exception as e:
+        record_upstream_error("story_agent", e)
+        raise
+    finally:
+        await TASK_SESSIONS.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
     if not text:
         raise RuntimeError("Storyteller returned no final response.")
 
@@ -64,7 +88,7 @@ async def generate_story(
 
 
 def generate_story_sync(
-    image: str,
+    image: ImageInput,
     profile: Dict[str, Any],
     timeout_s: int = 90,
 ) -> str:
@@ -83,9 +107,14 @@ def generate_story_sync(
         except BaseException as e:
             err["e"] = e
         finally:
-            loop.close()
+            # Its async genai connections die with this loop: close them first
+            try:
+                loop.run_until_complete(aclose_genai_async_client())
+            finally:
+                loop.close()
 
-    t = threading.Thread(target=_runner, daemon=True)
+    # The caller's trace context must follow the work onto the new thread and loop
+    t = threading.Thread(target=in_context(_runner), daemon=True)
     t.start()
     t.join()
 
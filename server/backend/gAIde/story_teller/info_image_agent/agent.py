@@ -1,10 +1,22 @@
 import os
+import re
 import sys
 import json
-import mimetypes
-import math
-from typing import Optional, Any, Dict, List, Union
-import requests
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, Dict, List, Tuple, Union
+
+from .places_cache import PLACES_CACHE, geohash_bbox
+from .places_client import PLACES_HTTP
+from . import fakes
+from .genai_client import get_genai_async_client, get_genai_client
+from .geo import haversine_m as _haversine_m, rank_by_distance
+from .image_input import load_image
+from .telemetry import record_upstream_error, stage_timer, timed
+from .tracing import add_token_usage, in_context, span, traced
+
+logger = logging.getLogger(__name__)
 
 # Make google.adk optional so CLI can run even if it's missing
 try:
@@ -41,15 +53,6 @@ _load_env_from_file(os.path.join(os.path.dirname(__file__), ".env"))
 
 # ----------------------------------------------------------------------
 
-# gaversin formula to count distance
-def _haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    R = 6371000.0
-    p1, p2 = math.radians(lat1), math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlmb = math.radians(lon2 - lon1)
-    a = math.sin(dphi / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dlmb / 2) ** 2
-    return 2 * R * math.asin(math.sqrt(a))
-
 def get_coordinates() -> Dict[str, float]:
     """
     Return current GNSS coordinates.
@@ -61,19 +64,23 @@ def get_coordinates() -> Dict[str, float]:
 
 GMP_API_KEY = os.getenv("GMP_API_KEY")  
 
-def find_places_nearby(
-    place_type: Optional[str],
-    latitude: float,
-    longitude: float,
-    radius_m: int = 150,
-    language: str = "en",
-) -> List[Dict[str, Any]]:
-    
-    # print("find_places_nearby is called")
+# Offline stand-in: a local searchNearby server (FAKE_BACKEND=places, see fakes.py)
+if fakes.enabled("places"):
+    GMP_API_KEY = GMP_API_KEY or "fake-key"
 
-    if not GMP_API_KEY:
-        return {"status": "error", "error_message": "GMP_API_KEY is not set."}
 
+def _places_url() -> str:
+    # The stand-in starts on first search, never at import: spawned workers import this module too
+    return fakes.places_url() if fakes.enabled("places") else PLACES_NEARBY_URL
+
+
+def _search_request(
+    latitude: float,
+    longitude: float,
+    radius_m: float,
+    language: str,
+) -> tuple[Dict[str, str], Dict[str, Any]]:
+    """Headers and body for a Places searchNearby POST."""
     headers = {
         "Content-Type": "application/json",
         "X-Goog-Api-Key": GMP_API_KEY,
@@ -95,116 +102,384 @@ def find_places_nearby(
     #     body["includedTypes"] = [place_type]
     # else:
     # body["includedTypes"] = "tourist_attraction"
+    return headers, body
+
+
+def _parse_search_response(r: Any) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    if not r.is_success:
+        # print("Places API error:", r.status_code, r.text)
+        record_upstream_error("places", f"http_{r.status_code}")
+        return {"status": "error", "error_message": f"Places API {r.status_code}: {r.text}"}
+    data = r.json()
+    return data.get("places", []) or []
+
+
+def _search_nearby_raw(
+    latitude: float,
+    longitude: float,
+    radius_m: float,
+    language: str,
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """POST Places searchNearby on the pooled client; returns raw places or an error dict."""
+    headers, body = _search_request(latitude, longitude, radius_m, language)
     try:
-        r = requests.post(PLACES_NEARBY_URL, headers=headers, json=body, timeout=15)
+        r = PLACES_HTTP.post_json(_places_url(), headers=headers, body=body)
     except Exception as e:
+        record_upstream_error("places", e)
         return {"status": "error", "error_message": f"Network error: {e!r}"}
+    return _parse_search_response(r)
 
-    if not r.ok:
-        # print("Places API error:", r.status_code, r.text)
-        return {"status": "error", "error_message": f"Places API {r.status_code}: {r.text}"}
 
-    data = r.json()
-    places = data.get("places", []) or []
+async def _search_nearby_raw_async(
+    latitude: float,
+    longitude: float,
+    radius_m: float,
+    language: str,
+) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    headers, body = _search_request(latitude, longitude, radius_m, language)
+    try:
+        r = await PLACES_HTTP.post_json_async(_places_url(), headers=headers, body=body)
+    except Exception as e:
+        record_upstream_error("places", e)
+        return {"status": "error", "error_message": f"Network error: {e!r}"}
+    return _parse_search_response(r)
 
-    out: List[Dict[str, Any]] = []
+
+def _tile_query(cell: str, radius_m: int) -> tuple[float, float, float]:
+    """Centre of a geohash cell and the search radius that covers the whole cell."""
+    lat_lo, lon_lo, lat_hi, lon_hi = geohash_bbox(cell)
+    c_lat, c_lon = (lat_lo + lat_hi) / 2, (lon_lo + lon_hi) / 2
+    # Widen the search so any query point inside the cell is fully covered
+    half_diag = _haversine_m(c_lat, c_lon, lat_hi, lon_hi)
+    return c_lat, c_lon, radius_m + half_diag
+
+
+def _fetch_tile(cell: str, radius_m: int, language: str) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    """Fetch (or reuse) all places covering a geohash cell for the given radius."""
+    # Concurrent misses on the same tile share one searchNearby call
+    return PLACES_CACHE.get_or_fetch(
+        (cell, int(radius_m), language),
+        lambda: _search_nearby_raw(*_tile_query(cell, radius_m), language),
+    )
+
+
+async def _fetch_tile_async(cell: str, radius_m: int, language: str) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
+    return await PLACES_CACHE.get_or_fetch_async(
+        (cell, int(radius_m), language),
+        lambda: _search_nearby_raw_async(*_tile_query(cell, radius_m), language),
+    )
+
+
+def _rank_nearby(
+    places: List[Dict[str, Any]],
+    latitude: float,
+    longitude: float,
+    radius_m: int,
+) -> List[Dict[str, Any]]:
+    """Keep raw Places results within radius_m of the point, nearest first."""
+    located = []
     for p in places:
         loc = p.get("location") or {}
-        plat, plng = loc.get("latitude"), loc.get("longitude")
-        if plat is None or plng is None:
-            continue
-        dist = _haversine_m(float(latitude), float(longitude), float(plat), float(plng))
-        out.append({
-            "name": (p.get("displayName") or {}).get("text"),
-            "address": p.get("formattedAddress"),
-            "latitude": plat,
-            "longitude": plng,
+        if loc.get("latitude") is not None and loc.get("longitude") is not None:
+            located.append(p)
+    order, dists = rank_by_distance(
+        float(latitude), float(longitude),
+        [float(p["location"]["latitude"]) for p in located],
+        [float(p["location"]["longitude"]) for p in located],
+        radius_m=radius_m,
+    )
+    return [
+        {
+            "name": (located[i].get("displayName") or {}).get("text"),
+            "address": located[i].get("formattedAddress"),
+            "latitude": located[i]["location"]["latitude"],
+            "longitude": located[i]["location"]["longitude"],
             "distance_m": round(dist, 1),
-        })
+        }
+        for i, dist in zip(order, dists)
+    ]
 
-    out.sort(key=lambda x: x["distance_m"])
 
+@timed("places")
+@traced("places")
+def find_places_nearby(
+    place_type: Optional[str],
+    latitude: float,
+    longitude: float,
+    radius_m: int = 150,
+    language: str = "en",
+) -> List[Dict[str, Any]]:
+    
+    # print("find_places_nearby is called")
+
+    if not GMP_API_KEY:
+        return {"status": "error", "error_message": "GMP_API_KEY is not set."}
+
+    # Served from the geospatial tile cache when the user hasn't left the cell
+    places = _fetch_tile(PLACES_CACHE.cell_for(latitude, longitude), radius_m, language)
+    if not isinstance(places, list):
+        return places
 
     # print("find_places_nearby is executed")
     # print()
 
-    return out
+    return _rank_nearby(places, latitude, longitude, radius_m)
 
 
-def recognize_showplace_auto(image_path: str, *,lat, lon) -> str:
+@timed("places")
+@traced("places")
+async def find_places_nearby_async(
+    place_type: Optional[str],
+    latitude: float,
+    longitude: float,
+    radius_m: int = 150,
+    language: str = "en",
+) -> List[Dict[str, Any]]:
+    """Asyncio variant of find_places_nearby (same cache, same pooled client)."""
+    if not GMP_API_KEY:
+        return {"status": "error", "error_message": "GMP_API_KEY is not set."}
+
+    places = await _fetch_tile_async(PLACES_CACHE.cell_for(latitude, longitude), radius_m, language)
+    if not isinstance(places, list):
+        return places
+    return _rank_nearby(places, latitude, longitude, radius_m)
+
+
+# Pipelined recognition: how long to wait for Places once vision is done
+RECOGNIZE_PIPELINED = os.getenv("RECOGNIZE_PIPELINED", "1") != "0"
+PLACES_GRACE_S = float(os.getenv("RECOGNIZE_PLACES_GRACE_S", "0.3"))
+
+_FANOUT_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="recognize")
+
+
+def _parse_place_json(text: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Best-effort parse of a recognition response into a dict (None if not JSON)."""
+    if not text:
+        return None
+    s = re.sub(r"^```(?:json)?\s*|\s*```$", "", text.strip())
+    i, j = s.find("{"), s.rfind("}")
+    if i == -1 or j <= i:
+        return None
+    try:
+        data = json.loads(s[i:j + 1])
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _norm_name(name: Any) -> str:
+    return re.sub(r"[\W_]+", " ", str(name or "").lower()).strip()
+
+
+# Words shorter than this ("st", "of", "la") don't count towards a name match
+NAME_TOKEN_MIN = 3
+
+
+def _name_tokens(name: str) -> frozenset:
+    return frozenset(t for t in name.split() if len(t) >= NAME_TOKEN_MIN)
+
+
+def _same_place_name(a: str, b: str) -> bool:
+    """
+    Whole-word comparison of two normalized names: equal, or one name's words
+    all appear in the other and there are at least two of them. "Alte
+    Pinakothek" matches "Alte Pinakothek Museum"; "Museum" or "Bar" alone never
+    match "Museum Brandhorst" or "Barcelona Cathedral".
+    """
+    if a == b:
+        return True
+    ta, tb = _name_tokens(a), _name_tokens(b)
+    if not ta or not tb:
+        return False
+    if ta == tb:
+        return True
+    shorter, longer = (ta, tb) if len(ta) <= len(tb) else (tb, ta)
+    return len(shorter) >= 2 and shorter <= longer
+
+
+def _reconcile_with_nearby(vision_text: str, nearby_list: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    If the vision-only answer names one of the nearby places, return it with the
+    authoritative Places name/address/coordinates. None means "needs disambiguation".
+    """
+    vision = _parse_place_json(vision_text)
+    name = _norm_name(vision.get("name")) if vision else ""
+    if not name:
+        return None
+    for p in nearby_list:
+        candidate = _norm_name(p.get("name"))
+        if candidate and _same_place_name(candidate, name):
+            place = dict(vision)
+            place.update({
+                "name": p["name"],
+                "address": p.get("address") or place.get("address"),
+                "latitude": p["latitude"],
+                "longitude": p["longitude"],
+            })
+            return json.dumps(place, ensure_ascii=False)
+    return None
+
+
+def _recognize_sequential(image_path: str, lat: float, lon: float, radius_m: int) -> str:
+    try:
+        nearby_list = find_places_nearby(None, lat, lon, radius_m=radius_m, language="en")
+        # print(nearby_list)
+    except Exception as e:
+        logger.warning(f"find_places_nearby failed, recognizing without nearby places: {e!r}")
+        return recognize_showplace(image_path, locale="en")
+    return _recognize_with_places(image_path, nearby_list)
+
+
+def _recognize_with_places(image_path: str, nearby_list: Any) -> str:
+    """Nearby-assisted recognition, or vision-only when there are no places."""
+    if not nearby_list or not isinstance(nearby_list, list):
+        return recognize_showplace(image_path, locale="en")
+
+    wrapped = {"find_places_nearby_response": {"result": nearby_list}}
+    try:
+        return recognize_showplace_with_nearby(image_path, wrapped, locale="en")
+    except Exception:
+        return recognize_showplace(image_path, locale="en")
+
+
+@traced("recognize")
+def recognize_showplace_auto(image_path: str, *,lat, lon, pipelined: bool = RECOGNIZE_PIPELINED) -> str:
     """
     Orchestrate the full flow using current GNSS coordinates:
       1) get_coordinates() -> lat/lon
       2) find_places_nearby(None, lat, lon, radius_m)
       3) recognize_showplace_with_nearby(image_path, places)
     Falls back to vision-only recognition if any step fails.
+    image_path may also be raw bytes or a "frame:" reference (no disk I/O).
+
+    pipelined=True starts vision-only recognition and the Places lookup at the
+    same time. If places arrive in time, a matching vision answer is reconciled
+    with the Places entry (no second model call); a non-matching one is
+    disambiguated with recognize_showplace_with_nearby. Otherwise the vision
+    answer is returned as is.
     """
     radius_m = 100
 
+    if not pipelined:
+        return _recognize_sequential(image_path, lat, lon, radius_m)
+
+    # Executor threads don't inherit contextvars: bind each call to the caller's trace
+    vision_f = _FANOUT_POOL.submit(in_context(recognize_showplace), image_path, locale="en")
+    places_f = _FANOUT_POOL.submit(in_context(find_places_nearby), None, lat, lon, radius_m=radius_m, language="en")
+
     try:
-        nearby_list = find_places_nearby(None, lat, lon, radius_m=radius_m, language="en")
-        # print(nearby_list)
+        vision_text = vision_f.result()
     except Exception:
-        print("nearby_list has an error")
-        return recognize_showplace(image_path, locale="en")
+        # Vision failed on its own: the nearby-assisted path may still work
+        try:
+            nearby_list = places_f.result()
+        except Exception:
+            nearby_list = None
+        return _recognize_with_places(image_path, nearby_list)
+
+    try:
+        nearby_list = places_f.result(timeout=PLACES_GRACE_S)
+    except Exception:
+        nearby_list = None  # late or failed: use the vision answer
+    return _finish_pipelined(image_path, vision_text, nearby_list)
+
 
+def _finish_pipelined(image_path: str, vision_text: str, nearby_list: Any) -> str:
     if not nearby_list or not isinstance(nearby_list, list):
-        return recognize_showplace(image_path, locale="en")
+        return vision_text
+
+    reconciled = _reconcile_with_nearby(vision_text, nearby_list)
+    if reconciled is not None:
+        return reconciled
 
     wrapped = {"find_places_nearby_response": {"result": nearby_list}}
     try:
         return recognize_showplace_with_nearby(image_path, wrapped, locale="en")
     except Exception:
-        return recognize_showplace(image_path, locale="en")
+        return vision_text
 
 
-def recognize_showplace(image_path: str, locale: str = "en") -> str:
-    """
-    Identify the most likely landmark/showplace in an image using Gemini 2.0 Flash.
+@traced("recognize")
+async def recognize_showplace_auto_async(
+    image_path: str,
+    *,
+    lat: float,
+    lon: float,
+    pipelined: bool = RECOGNIZE_PIPELINED,
+) -> str:
+    """Asyncio variant of recognize_showplace_auto (Places via the pooled async client, Gemini via client.aio)."""
+    radius_m = 100
 
-    Args:
-        image_path: Local filesystem path to the image.
-        locale: Optional BCP-47 language code for the response (default: "en").
+    if not pipelined:
+        return await asyncio.to_thread(_recognize_sequential, image_path, lat, lon, radius_m)
 
-    Returns:
-        A concise string naming the most likely landmark/showplace, optionally with location.
+    # The fetch is the tile's single-flight leader: it always runs to the end so
+    # a late answer still warms PLACES_CACHE, like the thread on the sync path
+    places_task = asyncio.create_task(
+        find_places_nearby_async(None, lat, lon, radius_m=radius_m, language="en")
+    )
+    _PLACES_TASKS.add(places_task)
+    places_task.add_done_callback(_forget_places_task)
+    try:
+        vision_text = await recognize_showplace_async(image_path, locale="en")
+    except Exception:
+        # Vision failed on its own: the nearby-assisted path may still work
+        try:
+            nearby_list = await asyncio.shield(places_task)
+        except Exception:
+            nearby_list = None
+        return await _recognize_with_places_async(image_path, nearby_list)
 
-    Raises:
-        FileNotFoundError: If the image does not exist.
-        RuntimeError: If the Gemini client or request fails.
-    """
+    try:
+        nearby_list = await asyncio.wait_for(asyncio.shield(places_task), timeout=PLACES_GRACE_S)
+    except Exception:
+        nearby_list = None  # late or failed: use the vision answer
+    if not nearby_list or not isinstance(nearby_list, list):
+        return vision_text
 
-    if not image_path:
-        raise ValueError("image_path is required")
-    if not os.path.isfile(image_path):
-        raise FileNotFoundError(f"Image not found: {image_path}")
+    reconciled = _reconcile_with_nearby(vision_text, nearby_list)
+    if reconciled is not None:
+        return reconciled
 
-    api_key = os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        raise RuntimeError(
-            "GOOGLE_API_KEY is not set. Add it to environment or multi_tool_agent/.env"
-        )
+    wrapped = {"find_places_nearby_response": {"result": nearby_list}}
+    try:
+        return await recognize_showplace_with_nearby_async(image_path, wrapped, locale="en")
+    except Exception:
+        return vision_text
+
+
+# Places fetches outliving their recognize call (the loop only keeps weak refs)
+_PLACES_TASKS: "set[asyncio.Task]" = set()
+
+
+def _forget_places_task(task: "asyncio.Task") -> None:
+    _PLACES_TASKS.discard(task)
+    if not task.cancelled():
+        task.exception()  # retrieved: a late failure isn't "never retrieved"
+
+
+async def _recognize_with_places_async(image_path: str, nearby_list: Any) -> str:
+    if not nearby_list or not isinstance(nearby_list, list):
+        return await recognize_showplace_async(image_path, locale="en")
+
+    wrapped = {"find_places_nearby_response": {"result": nearby_list}}
+    try:
+        return await recognize_showplace_with_nearby_async(image_path, wrapped, locale="en")
+    except Exception:
+        return await recognize_showplace_async(image_path, locale="en")
+
+
+def _vision_contents(image_path: str) -> List[Any]:
+    """Prompt and image part of the vision-only recognition request."""
+    image_bytes, mime_type = load_image(image_path)
 
     try:
-        from google import genai
         from google.genai import types as genai_types
     except Exception as e:
         raise RuntimeError(
             "google-genai is required. Install with: pip install google-genai"
         ) from e
 
-    # Create client
-    client = genai.Client(api_key=api_key)
-
-    # Read image
-    with open(image_path, "rb") as f:
-        image_bytes = f.read()
-
-    mime_type, _ = mimetypes.guess_type(image_path)
-    if mime_type is None:
-        # Default to JPEG if unknown
-        mime_type = "image/jpeg"
-
     # Build input parts
     try:
         # google-genai >= 1.30 supports Part.from_bytes with keyword-only args
@@ -233,13 +508,57 @@ def recognize_showplace(image_path: str, locale: str = "en") -> str:
         
          """
     )
+    return [prompt, image_part]
+
+
+async def recognize_showplace_async(image_path: str, locale: str = "en") -> str:
+    """recognize_showplace on the shared client's async surface (no worker thread)."""
+    contents = _vision_contents(image_path)
+    client = get_genai_async_client()
+    try:
+        with stage_timer("recognition"), span("recognition", model="gemini-2.0-flash", nearby=False):
+            response = await client.models.generate_content(
+                model="gemini-2.0-flash",
+                contents=contents,
+            )
+            add_token_usage(getattr(response, "usage_metadata", None))
+        text: Optional[str] = getattr(response, "text", None)
+        return text.strip()
+    except Exception as e:
+        record_upstream_error("genai", e)
+        raise RuntimeError(f"Gemini request failed: {e}") from e
+
+
+def recognize_showplace(image_path: str, locale: str = "en") -> str:
+    """
+    Identify the most likely landmark/showplace in an image using Gemini 2.0 Flash.
+
+    Args:
+        image_path: Local filesystem path to the image. Python callers may also pass
+            raw bytes/memoryview or a "frame:" reference (see image_input.py).
+        locale: Optional BCP-47 language code for the response (default: "en").
+
+    Returns:
+        A concise string naming the most likely landmark/showplace, optionally with location.
+
+    Raises:
+        FileNotFoundError: If the image does not exist.
+        RuntimeError: If the Gemini client or request fails.
+    """
+
+    contents = _vision_contents(image_path)
+
+    # Shared process-wide client (keeps its connection pool warm)
+    client = get_genai_client()
 
     try:
         # Prefer the models.generate_content path
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=[prompt, image_part],
-        )
+        with stage_timer("recognition"), span("recognition", model="gemini-2.0-flash", nearby=False):
+            response = client.models.generate_content(
+                model="gemini-2.0-flash",
+                contents=contents,
+            )
+            add_token_usage(getattr(response, "usage_metadata", None))
         text: Optional[str] = getattr(response, "text", None)
         # if not text:
         #     # Some SDK versions return candidates[0].content.parts[0].text
@@ -256,11 +575,20 @@ def recognize_showplace(image_path: str, locale: str = "en") -> str:
         #     text = str(response)
         return text.strip()
     except Exception as e:
+        record_upstream_error("genai", e)
         raise RuntimeError(f"Gemini request failed: {e}") from e
 
 
 # Helper to load/normalize nearby places JSON structure
-def _load_nearby_places(data_or_path: Union[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _load_nearby_places(
+    data_or_path: Union[str, Dict[str, Any]],
+    origin: Optional[Tuple[float, float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Normalized places, nearest first. With origin=(lat, lon), distance_m is
+    recomputed from that point for every place (batched); otherwise the
+    stored distance_m values are used and places without one go last.
+    """
     data: Dict[str, Any]
     if isinstance(data_or_path, str):
         if not os.path.isfile(data_or_path):
@@ -297,66 +625,43 @@ def _load_nearby_places(data_or_path: Union[str, Dict[str, Any]]) -> List[Dict[s
             "distance_m": item.get("distance_m"),
         })
 
+    if origin is not None:
+        order, dists = rank_by_distance(
+            float(origin[0]), float(origin[1]),
+            [p["latitude"] for p in cleaned], [p["longitude"] for p in cleaned],
+        )
+        ranked = []
+        for i, dist in zip(order, dists):
+            cleaned[i]["distance_m"] = round(dist, 1)
+            ranked.append(cleaned[i])
+        return ranked
+
     # Sort by distance if present
     cleaned.sort(key=lambda x: (float(x["distance_m"]) if x.get("distance_m") is not None else float("inf")))
     return cleaned
 
 
-def recognize_showplace_with_nearby(
+def _nearby_contents(
     image_path: str,
     places_json: Union[str, Dict[str, Any]],
     *,
-    locale: str = "en",
-    max_places: int = 30,
-) -> str:
-    """
-    Recognize a landmark in an image with additional context of nearby showplaces
-    to disambiguate lookalikes by location (e.g., replicas).
-
-    Inputs:
-      - image_path: local path to the image file
-      - places_json: path to a JSON file or the parsed dict with schema:
-            {"find_places_nearby_response": {"result": [ {name, latitude, longitude, address?, distance_m?}, ... ]}}
-      - locale: response language (default "en")
-      - max_places: maximum number of nearby places to provide as context
-
-    Returns:
-      - String response from Gemini, ideally naming the most likely showplace among the provided nearby options,
-        and indicating reasoning/coordinates.
-    """
-
-    if not image_path:
-        raise ValueError("image_path is required")
-    if not os.path.isfile(image_path):
-        raise FileNotFoundError(f"Image not found: {image_path}")
+    locale: str,
+    max_places: int,
+) -> Optional[Tuple[List[Any], int]]:
+    """Request contents for nearby-assisted recognition and the number of places sent; None without usable places."""
+    image_bytes, mime_type = load_image(image_path)
 
     nearby = _load_nearby_places(places_json)
     if not nearby:
-        # Fallback to vision-only if no usable places
-        return recognize_showplace(image_path=image_path, locale=locale)
-
-    api_key = os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        raise RuntimeError(
-            "GOOGLE_API_KEY is not set. Add it to environment or multi_tool_agent/.env"
-        )
+        return None
 
     try:
-        from google import genai
         from google.genai import types as genai_types
     except Exception as e:
         raise RuntimeError(
             "google-genai is required. Install with: pip install google-genai"
         ) from e
 
-    client = genai.Client(api_key=api_key)
-
-    with open(image_path, "rb") as f:
-        image_bytes = f.read()
-    mime_type, _ = mimetypes.guess_type(image_path)
-    if mime_type is None:
-        mime_type = "image/jpeg"
-
     try:
         image_part = genai_types.Part.from_bytes(data=image_bytes, mime_type=mime_type)
     except Exception as e:
@@ -401,12 +706,47 @@ def recognize_showplace_with_nearby(
          """
 
     )
+    return [system_prompt, task_prompt, image_part], len(nearby_trimmed)
+
+
+def recognize_showplace_with_nearby(
+    image_path: str,
+    places_json: Union[str, Dict[str, Any]],
+    *,
+    locale: str = "en",
+    max_places: int = 30,
+) -> str:
+    """
+    Recognize a landmark in an image with additional context of nearby showplaces
+    to disambiguate lookalikes by location (e.g., replicas).
+
+    Inputs:
+      - image_path: local path to the image file (or raw bytes / "frame:" reference)
+      - places_json: path to a JSON file or the parsed dict with schema:
+            {"find_places_nearby_response": {"result": [ {name, latitude, longitude, address?, distance_m?}, ... ]}}
+      - locale: response language (default "en")
+      - max_places: maximum number of nearby places to provide as context
+
+    Returns:
+      - String response from Gemini, ideally naming the most likely showplace among the provided nearby options,
+        and indicating reasoning/coordinates.
+    """
+
+    request = _nearby_contents(image_path, places_json, locale=locale, max_places=max_places)
+    if request is None:
+        # Fallback to vision-only if no usable places
+        return recognize_showplace(image_path=image_path, locale=locale)
+    contents, n_nearby = request
+
+    client = get_genai_client()
 
     try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=[system_prompt, task_prompt, image_part],
-        )
+        with stage_timer("recognition"), span("recognition", model="gemini-2.0-flash", nearby=n_nearby):
+            response = client.models.generate_content(
+                model="gemini-2.0-flash",
+                contents=contents,
+            )
+            add_token_usage(getattr(response, "usage_metadata", None))
         text: Optional[str] = getattr(response, "text", None)
         # if not text:
         #     candidates = getattr(response, "candidates", None)
@@ -421,6 +761,35 @@ def recognize_showplace_with_nearby(
         #     text = str(response)
         return text.strip()
     except Exception as e:
+        record_upstream_error("genai", e)
+        raise RuntimeError(f"Gemini request with nearby places failed: {e}") from e
+
+
+async def recognize_showplace_with_nearby_async(
+    image_path: str,
+    places_json: Union[str, Dict[str, Any]],
+    *,
+    locale: str = "en",
+    max_places: int = 30,
+) -> str:
+    """recognize_showplace_with_nearby on the shared client's async surface."""
+    request = _nearby_contents(image_path, places_json, locale=locale, max_places=max_places)
+    if request is None:
+        return await recognize_showplace_async(image_path, locale=locale)
+    contents, n_nearby = request
+
+    client = get_genai_async_client()
+    try:
+        with stage_timer("recognition"), span("recognition", model="gemini-2.0-flash", nearby=n_nearby):
+            response = await client.models.generate_content(
+                model="gemini-2.0-flash",
+                contents=contents,
+            )
+            add_token_usage(getattr(response, "usage_metadata", None))
+        text: Optional[str] = getattr(response, "text", None)
+        return text.strip()
+    except Exception as e:
+        record_upstream_error("genai", e)
         raise RuntimeError(f"Gemini request with nearby places failed: {e}") from e
 
 # Instantiate the agent and register the tool function so root_agent can use it.
@@ -0,0 +1,441 @@
+"""
+Offline stand-ins for the upstream APIs: genai generate_content and Places searchNearby.
+
+Selected with FAKE_BACKEND (comma list of genai, places, live; "all" for
+everything). The live stand-in for Runner.run_live sits next to the server
+in fake_live.py and uses the same latency/error knobs.
+
+  FAKE_GENAI_LATENCY=lognormal:0.9,0.35     per generate_content call
+  FAKE_GENAI_ERROR_RATE=0.02                503 / 429 errors, as google.genai raises them
+  FAKE_PLACES_LATENCY=lognormal:0.12,0.3    per searchNearby POST
+  FAKE_PLACES_ERROR_RATE=0.0                HTTP 503 / 429 answers
+  FAKE_SEED=0                               latency and error draws
+
+Latency specs: "fixed:S", "uniform:LO,HI", "lognormal:MEDIAN,SIGMA" or a
+bare number of seconds.
+
+Responses depend only on the request (image bytes, prompt, coordinates):
+the same frame always recognizes as the same landmark and the same point
+always returns the same places. Latency and error draws come from the
+seeded RNG.
+
+The Places stand-in is a real local HTTP server, so the pooled client, the
+tile cache and the response parsing all run as in production:
+
+    python -m backend.gAIde.story_teller.info_image_agent.fakes --port 8089
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .geo import rank_by_distance
+
+# ADK is optional here: only agent models need it
+try:
+    from google.adk.models.google_llm import Gemini as _Gemini
+except Exception:
+    _Gemini = None  # type: ignore[assignment]
+
+FAKE_BACKEND = {s.strip().lower() for s in os.getenv("FAKE_BACKEND", "").split(",") if s.strip()}
+
+_FIXTURE = os.path.join(os.path.dirname(__file__), "..", "..", "..", "location_list.json")
+
+
+def enabled(part: str) -> bool:
+    """True when FAKE_BACKEND selects the stand-in for `part` (genai, places, live)."""
+    return part in FAKE_BACKEND or "all" in FAKE_BACKEND or "1" in FAKE_BACKEND
+
+
+@dataclass(frozen=True)
+class Latency:
+    dist: str
+    a: float
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        dist, _, params = spec.strip().partition(":")
+        if not params:
+            return cls("fixed", float(dist))
+        values = [float(x) for x in params.split(",")]
+        if dist not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"unknown latency distribution {dist!r}")
+        return cls(dist, *values)
+
+    def sample(self, rnd: random.Random) -> float:
+        if self.dist == "uniform":
+            return rnd.uniform(self.a, self.b)
+        if self.dist == "lognormal":
+            return rnd.lognormvariate(math.log(self.a), self.b) if self.a > 0 else 0.0
+        return self.a
+
+
+class Upstream:
+    """Latency and error draws for one fake upstream, from env <prefix>_LATENCY / _ERROR_RATE."""
+
+    def __init__(self, prefix: str, default_latency: str, seed: Optional[int] = None):
+        self.latency = Latency.parse(os.getenv(f"{prefix}_LATENCY", default_latency))
+        self.error_rate = float(os.getenv(f"{prefix}_ERROR_RATE", "0"))
+        self._rnd = random.Random(int(os.getenv("FAKE_SEED", "0")) if seed is None else seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def draw(self) -> Tuple[float, bool]:
+        """(delay seconds, fail?) for the next call."""
+        with self._lock:
+            self.calls += 1
+            fail = self.error_rate > 0 and self._rnd.random() < self.error_rate
+            self.errors += fail
+            return self.latency.sample(self._rnd), fail
+
+    def pick(self, options: List[Any]) -> Any:
+        with self._lock:
+            return self._rnd.choice(options)
+
+
+def stable_hash(*parts: Any) -> int:
+    """Process-independent hash (unlike hash()) for deterministic fake responses."""
+    h = hashlib.blake2b(digest_size=8)
+    for p in parts:
+        h.update(p if isinstance(p, (bytes, bytearray, memoryview)) else str(p).encode())
+    return int.from_bytes(h.digest(), "big")
+
+
+def load_fixture_places() -> List[Dict[str, Any]]:
+    """Known landmarks (name/address/latitude/longitude) around the default coordinates."""
+    try:
+        with open(_FIXTURE, encoding="utf-8") as f:
+            return list(json.load(f)["find_places_nearby_response"]["result"])
+    except Exception:
+        return [{"name": "BMW Welt", "address": "Am Olympiapark 1, 80809 München, Germany",
+                 "latitude": 48.1771981, "longitude": 11.5562963}]
+
+
+# ---------------------------------------------------------------------------
+# genai
+# ---------------------------------------------------------------------------
+
+def _genai_error(status: int) -> Exception:
+    from google.genai import errors
+
+    if status == 429:
+        return errors.ClientError(429, {"error": {"code": 429, "message": "fake quota exhausted", "status": "RESOURCE_EXHAUSTED"}})
+    return errors.ServerError(503, {"error": {"code": 503, "message": "fake model overloaded", "status": "UNAVAILABLE"}})
+
+
+def _flatten_contents(contents: Any) -> Tuple[List[str], List[bytes], List[Any]]:
+    """(texts, inline blobs, function responses) of str / Part / Content inputs."""
+    texts: List[str] = []
+    blobs: List[bytes] = []
+    responses: List[Any] = []
+    items = contents if isinstance(contents, list) else [contents]
+    for item in items:
+        if isinstance(item, str):
+            texts.append(item)
+            continue
+        parts = getattr(item, "parts", None)
+        for part in parts if parts is not None else [item]:
+            if getattr(part, "text", None):
+                texts.append(part.text)
+            if getattr(part, "inline_data", None) is not None and part.inline_data.data:
+                blobs.append(part.inline_data.data)
+            if getattr(part, "function_response", None) is not None:
+                responses.append(part.function_response)
+    return texts, blobs, responses
+
+
+def _tool_names(config: Any) -> Tuple[List[str], bool]:
+    """Declared function names and whether google_search is enabled."""
+    names, search = [], False
+    for tool in getattr(config, "tools", None) or []:
+        for decl in getattr(tool, "function_declarations", None) or []:
+            names.append(decl.name)
+        search = search or getattr(tool, "google_search", None) is not None
+    return names, search
+
+
+class FakeModels:
+    """The `client.models` / `client.aio.models` surface used by recognition and ADK agents."""
+
+    def __init__(self, upstream: Upstream, places: List[Dict[str, Any]], is_async: bool):
+        self._upstream = upstream
+        self._places = places
+        self._async = is_async
+
+    def _respond(self, model: str, contents: Any, config: Any = None):
+        from google.genai import types
+
+        texts, blobs, responses = _flatten_contents(contents)
+        prompt = "\n".join(texts)
+        system = str(getattr(config, "system_instruction", "") or "")
+        functions, search = _tool_names(config)
+
+        part: types.Part
+        if "research_attraction" in functions and not responses:
+            part = types.Part(function_call=types.FunctionCall(name="research_attraction", args=self._tool_args(texts)))
+        elif "research_attraction" in functions:
+            part = types.Part(text=self._story(responses[-1].response))
+        elif search:
+            part = types.Part(text=json.dumps(self._facts(system), ensure_ascii=False))
+        elif blobs:
+            part = types.Part(text=json.dumps(self._recognize(blobs[0], prompt), ensure_ascii=False))
+        else:
+            part = types.Part(text=f"(fake {model}) {prompt[:80]}")
+
+        out_chars = len(part.text or "") + 40
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=(len(prompt) + len(system)) // 4 + 258 * len(blobs),
+            candidates_token_count=out_chars // 4,
+            total_token_count=(len(prompt) + len(system) + out_chars) // 4 + 258 * len(blobs),
+        )
+        return types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.Content(role="model", parts=[part]), finish_reason="STOP")],
+            usage_metadata=usage,
+            model_version=model,
+        )
+
+    @staticmethod
+    def _tool_args(texts: List[str]) -> Dict[str, Any]:
+        for text in reversed(texts):
+            try:
+                payload = json.loads(text)
+            except Exception:
+                continue
+            if isinstance(payload, dict) and "image" in payload:
+                return {"image": payload["image"], "profile": payload.get("profile", {})}
+        return {"image": "", "profile": {}}
+
+    def _recognize(self, image: bytes, prompt: str) -> Dict[str, Any]:
+        m = re.search(r"sorted by distance\):\n(\[.*?\])\n", prompt, re.S)
+        place = None
+        if m:
+            # With a nearby list, prefer a known landmark from it, else the nearest entry
+            nearby = json.loads(m.group(1))
+            known = {p.get("name") for p in self._places}
+            place = next((p for p in nearby if p.get("name") in known), nearby[0] if nearby else None)
+        if place is None:
+            place = self._places[stable_hash(image) % len(self._places)]
+        return {
+            "name": place.get("name"),
+            "address": place.get("address"),
+            "latitude": place.get("latitude"),
+            "longitude": place.get("longitude"),
+            "description": f"{place.get('name')} is a well-known sight here (offline stand-in).",
+        }
+
+    @staticmethod
+    def _facts(instruction: str) -> Dict[str, Any]:
+        m = re.search(r"Name:\s*(.+)", instruction)
+        name = m.group(1).strip() if m else "the attraction"
+        return {
+            "attraction": {"name": name, "address": "", "coordinates": {"lat": None, "lng": None}},
+            "essentials": {"hours_today": "10:00-18:00", "last_entry_time": "17:30", "closing_soon_minutes": None},
+            "highlights": [{"title": f"{name} facade", "why_it_matters": "Signature view.", "estimated_minutes": 10}],
+            "context_snippets": [f"{name} is a fixture landmark of the offline backend."],
+            "confidence_notes": "offline stand-in",
+        }
+
+    @staticmethod
+    def _story(facts: Any) -> str:
+        result = facts.get("result", facts) if isinstance(facts, dict) else {}
+        name = ((result or {}).get("attraction") or {}).get("name") or "this place"
+        return (
+            "===== STORY_SCRIPT =====\n"
+            f"You are standing in front of {name}. "
+            "This narration comes from the offline stand-in backend, so every run tells the same short story. "
+            "Take a moment to look up at the facade before you move on."
+        )
+
+    def generate_content(self, *, model: str, contents: Any, config: Any = None):
+        if self._async:
+            return self._generate_content_async(model, contents, config)
+        delay, fail = self._upstream.draw()
+        time.sleep(delay)
+        if fail:
+            raise _genai_error(self._upstream.pick([429, 503]))
+        return self._respond(model, contents, config)
+
+    async def _generate_content_async(self, model: str, contents: Any, config: Any):
+        delay, fail = self._upstream.draw()
+        await asyncio.sleep(delay)
+        if fail:
+            raise _genai_error(self._upstream.pick([429, 503]))
+        return self._respond(model, contents, config)
+
+    async def generate_content_stream(self, *, model: str, contents: Any, config: Any = None):
+        response = await self._generate_content_async(model, contents, config)
+
+        async def stream():
+            yield response
+
+        return stream()
+
+
+class _FakeAio:
+    def __init__(self, models: FakeModels):
+        self.models = models
+
+
+class FakeGenaiClient:
+    """Drop-in for `genai.Client` as used here (models / aio.models)."""
+
+    vertexai = False
+
+    def __init__(self, upstream: Optional[Upstream] = None, places: Optional[List[Dict[str, Any]]] = None):
+        self.upstream = upstream or Upstream("FAKE_GENAI", "lognormal:0.9,0.35")
+        places = places or load_fixture_places()
+        self.models = FakeModels(self.upstream, places, is_async=False)
+        self.aio = _FakeAio(FakeModels(self.upstream, places, is_async=True))
+
+
+if _Gemini is not None:
+    class FakeGemini(_Gemini):
+        """ADK Gemini model whose API client is a FakeGenaiClient."""
+
+        fake_client: Any = None
+
+        @property
+        def api_client(self):
+            return self.fake_client
+
+
+def make_fake_gemini(model: str, client: Any):
+    """`model=` for ADK agents (they accept a BaseLlm instance) bound to `client`."""
+    if _Gemini is None:
+        raise RuntimeError("google-adk is required for fake agent models")
+    return FakeGemini(model=model, fake_client=client)
+
+
+# ---------------------------------------------------------------------------
+# Places searchNearby
+# ---------------------------------------------------------------------------
+
+def search_nearby(body: Dict[str, Any], fixture: List[Dict[str, Any]], synthetic: int = 12) -> List[Dict[str, Any]]:
+    """Places API shaped results: fixture places in the circle plus deterministic synthetic ones."""
+    circle = body["locationRestriction"]["circle"]
+    lat, lon = circle["center"]["latitude"], circle["center"]["longitude"]
+    radius = float(circle["radius"])
+    limit = int(body.get("maxResultCount", 20))
+
+    order, _ = rank_by_distance(
+        lat, lon, [p["latitude"] for p in fixture], [p["longitude"] for p in fixture], radius_m=radius
+    )
+    found = [(fixture[i]["name"], fixture[i].get("address", ""), fixture[i]["latitude"], fixture[i]["longitude"]) for i in order]
+    # Synthetic places are seeded by the rounded centre, so a tile always gets the same ones
+    rnd = random.Random(stable_hash(round(lat, 4), round(lon, 4), int(radius)))
+    for i in range(synthetic):
+        d = radius * math.sqrt(rnd.random())
+        theta = rnd.uniform(0, 2 * math.pi)
+        plat = lat + d * math.cos(theta) / 111_320
+        plon = lon + d * math.sin(theta) / (111_320 * max(0.01, math.cos(math.radians(lat))))
+        found.append((f"Landmark {rnd.randrange(10_000):04d}", f"Fake street {i + 1}", plat, plon))
+
+    return [
+        {
+            "displayName": {"text": name, "languageCode": body.get("languageCode", "en")},
+            "formattedAddress": address,
+            "location": {"latitude": plat, "longitude": plon},
+        }
+        for name, address, plat, plon in found[:limit]
+    ]
+
+
+class FakePlacesServer:
+    """Local HTTP server for POST /v1/places:searchNearby."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, upstream: Optional[Upstream] = None):
+        self.upstream = upstream or Upstream("FAKE_PLACES", "lognormal:0.12,0.3")
+        self.fixture = load_fixture_places()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoint
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", "0"))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                delay, fail = server.upstream.draw()
+                time.sleep(delay)
+                if fail:
+                    status = server.upstream.pick([429, 503])
+                    payload = {"error": {"code": status, "message": "fake places error"}}
+                elif not self.path.endswith("places:searchNearby"):
+                    status, payload = 404, {"error": {"code": 404, "message": self.path}}
+                else:
+                    status, payload = 200, {"places": search_nearby(body, server.fixture)}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/places:searchNearby"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-places", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+_places_server: Optional[FakePlacesServer] = None
+_places_lock = threading.Lock()
+
+
+def start_places_server() -> str:
+    """Process-wide fake Places server (started on first use); returns its searchNearby URL."""
+    global _places_server
+    with _places_lock:
+        if _places_server is None:
+            _places_server = FakePlacesServer(port=int(os.getenv("FAKE_PLACES_PORT", "0")))
+            _places_server.start()
+        return _places_server.url
+
+
+def places_url() -> str:
+    """
+    searchNearby URL of the stand-in: FAKE_PLACES_URL when a parent process
+    already serves it, else this process's server, started now and exported
+    so processes spawned later (frame pool, supervised workers) reuse it.
+    """
+    url = os.getenv("FAKE_PLACES_URL")
+    if not url:
+        url = os.environ["FAKE_PLACES_URL"] = start_places_server()
+    return url
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the fake Places searchNearby endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    args = parser.parse_args()
+    places = FakePlacesServer(args.host, args.port)
+    print(f"Fake Places on {places.url} (latency {places.upstream.latency}, error rate {places.upstream.error_rate})")
+    places.httpd.serve_forever()
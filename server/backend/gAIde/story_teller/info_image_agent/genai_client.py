@@ -0,0 +1,132 @@
+"""
+Process-wide google-genai client.
+
+Recognition used to build a fresh `genai.Client` on every call, throwing
+away its HTTP connection pool each time. This module keeps a single client
+per process for sync calls (`get_genai_client()`) and one per event loop for
+async calls (`get_genai_async_client()`), and exposes explicit close hooks for
+the server lifecycle.
+
+Async connections belong to the loop that opened them: reused from another
+loop after the first one closed (generate_story_sync runs every call on a
+fresh loop) they fail with "Event loop is closed". Hence the per-loop clients;
+whoever closes a loop calls `aclose_genai_async_client()` first.
+
+With FAKE_BACKEND including "genai" the shared client is the offline
+stand-in from fakes.py, and `agent_model()` hands ADK agents a Gemini model
+bound to it, so the whole describe pipeline runs without network.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, Optional, Tuple
+
+from . import fakes
+
+_client: Optional[Any] = None
+_client_key: Optional[str] = None
+_lock = threading.Lock()
+# Event loop -> client whose `.aio` pool that loop owns
+_loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+def _api_key() -> str:
+    api_key = os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        raise RuntimeError(
+            "GOOGLE_API_KEY is not set. Add it to environment or multi_tool_agent/.env"
+        )
+    return api_key
+
+
+def _new_client(api_key: str) -> Any:
+    try:
+        from google import genai
+    except Exception as e:
+        raise RuntimeError(
+            "google-genai is required. Install with: pip install google-genai"
+        ) from e
+    return genai.Client(api_key=api_key)
+
+
+def get_genai_client() -> Any:
+    """Return the shared `genai.Client`, creating it on first use."""
+    global _client, _client_key
+
+    if fakes.enabled("genai"):
+        with _lock:
+            if _client is None or _client_key != "fake":
+                _client, _client_key = fakes.FakeGenaiClient(), "fake"
+            return _client
+
+    api_key = _api_key()
+    with _lock:
+        if _client is not None and _client_key == api_key:
+            return _client
+        _client = _new_client(api_key)
+        _client_key = api_key
+        return _client
+
+
+def get_genai_async_client() -> Any:
+    """Async surface (`client.aio`) of the running loop's client."""
+    if fakes.enabled("genai"):
+        return get_genai_client().aio  # no connections to tie to a loop
+
+    api_key = _api_key()
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _loop_clients.get(loop)
+        if client is None or client._api_client.api_key != api_key:
+            client = _loop_clients[loop] = _new_client(api_key)
+        return client.aio
+
+
+def agent_model(name: str) -> Any:
+    """`model=` for ADK agents: the model name, or a Gemini on the shared fake client."""
+    if fakes.enabled("genai"):
+        return fakes.make_fake_gemini(name, get_genai_client())
+    return name
+
+
+def _transports(client: Any) -> Tuple[Any, Any]:
+    """
+    The sync and async httpx clients behind a `genai.Client` (None for the
+    offline stand-in). google-genai (1.33) has no public close, so the
+    lifecycle hooks close these directly.
+    """
+    api_client = getattr(client, "_api_client", None)
+    return getattr(api_client, "_httpx_client", None), getattr(api_client, "_async_httpx_client", None)
+
+
+def close_genai_client() -> None:
+    """Drop the shared client and close its sync connection pool."""
+    global _client, _client_key
+    with _lock:
+        client, _client, _client_key = _client, None, None
+    if client is None:
+        return
+    sync_http, _ = _transports(client)
+    if sync_http is not None:
+        sync_http.close()
+
+
+async def aclose_genai_async_client() -> None:
+    """Close the running loop's async pool; call it before closing the loop."""
+    with _lock:
+        client = _loop_clients.pop(asyncio.get_running_loop(), None)
+    if client is None:
+        return
+    sync_http, async_http = _transports(client)
+    if async_http is not None:
+        await async_http.aclose()
+    if sync_http is not None:
+        sync_http.close()
+
+
+async def aclose_genai_client() -> None:
+    """Close the running loop's async pool and the shared client's sync pool."""
+    await aclose_genai_async_client()
+    close_genai_client()
@@ -0,0 +1,123 @@
+"""
+Distance and bearing kernel for ranking candidate places around a point.
+
+Scalar `math` per candidate is cheapest for the ~20 results one searchNearby
+call returns; NumPy wins once a candidate set gets large (merged tiles, POI
+dumps, fixture files). The batched functions pick the path by size:
+
+    GEO_VECTOR_MIN=32   candidates at which the NumPy path takes over
+                        (crossover measured by benchmarks/bench_geo_kernel.py)
+
+Both paths return plain Python lists/floats, so callers never see arrays.
+Without NumPy everything runs on the scalar path.
+"""
+
+import math
+import os
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except Exception:  # optional: scalar path only
+    np = None  # type: ignore[assignment]
+
+EARTH_RADIUS_M = 6371000.0
+VECTOR_MIN = int(os.getenv("GEO_VECTOR_MIN", "32"))
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in metres."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def bearing_deg(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Initial bearing from point 1 to point 2, degrees clockwise from north in [0, 360)."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dlmb = math.radians(lon2 - lon1)
+    y = math.sin(dlmb) * math.cos(p2)
+    x = math.cos(p1) * math.sin(p2) - math.sin(p1) * math.cos(p2) * math.cos(dlmb)
+    return math.degrees(math.atan2(y, x)) % 360.0
+
+
+def _use_numpy(n: int, vectorized: Optional[bool]) -> bool:
+    if np is None:
+        return False
+    return n >= VECTOR_MIN if vectorized is None else vectorized
+
+
+def _haversine_np(lat: float, lon: float, lats, lons):
+    p1 = math.radians(lat)
+    p2 = np.radians(lats)
+    dphi = p2 - p1
+    dlmb = np.radians(lons) - math.radians(lon)
+    a = np.sin(dphi / 2) ** 2 + math.cos(p1) * np.cos(p2) * np.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _bearing_np(lat: float, lon: float, lats, lons):
+    p1 = math.radians(lat)
+    p2 = np.radians(lats)
+    dlmb = np.radians(lons) - math.radians(lon)
+    y = np.sin(dlmb) * np.cos(p2)
+    x = math.cos(p1) * np.sin(p2) - math.sin(p1) * np.cos(p2) * np.cos(dlmb)
+    return np.degrees(np.arctan2(y, x)) % 360.0
+
+
+def distances_m(
+    lat: float, lon: float, lats: Sequence[float], lons: Sequence[float], *, vectorized: Optional[bool] = None
+) -> List[float]:
+    """Distance in metres from (lat, lon) to each candidate."""
+    if _use_numpy(len(lats), vectorized):
+        return _haversine_np(lat, lon, np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)).tolist()
+    return [haversine_m(lat, lon, plat, plon) for plat, plon in zip(lats, lons)]
+
+
+def bearings_deg(
+    lat: float, lon: float, lats: Sequence[float], lons: Sequence[float], *, vectorized: Optional[bool] = None
+) -> List[float]:
+    """Initial bearing from (lat, lon) to each candidate."""
+    if _use_numpy(len(lats), vectorized):
+        return _bearing_np(lat, lon, np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)).tolist()
+    return [bearing_deg(lat, lon, plat, plon) for plat, plon in zip(lats, lons)]
+
+
+def rank_by_distance(
+    lat: float,
+    lon: float,
+    lats: Sequence[float],
+    lons: Sequence[float],
+    *,
+    radius_m: Optional[float] = None,
+    limit: Optional[int] = None,
+    vectorized: Optional[bool] = None,
+) -> Tuple[List[int], List[float]]:
+    """
+    Indices of the candidates within radius_m, nearest first (ties keep input
+    order), and their distances. `limit` keeps only the nearest N; callers
+    build result dicts for the survivors only.
+    """
+    n = len(lats)
+    if not _use_numpy(n, vectorized):
+        dist = distances_m(lat, lon, lats, lons, vectorized=False)
+        order = [i for i in range(n) if radius_m is None or dist[i] <= radius_m]
+        order.sort(key=dist.__getitem__)
+        if limit is not None:
+            order = order[:limit]
+        return order, [dist[i] for i in order]
+
+    dist = _haversine_np(lat, lon, np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64))
+    idx = np.arange(n) if radius_m is None else np.flatnonzero(dist <= radius_m)
+    if limit is not None and limit < idx.size:
+        if limit <= 0:
+            return [], []
+        # Partial selection first: only candidates up to the limit-th distance get sorted
+        kth = np.partition(dist[idx], limit - 1)[limit - 1]
+        idx = idx[dist[idx] <= kth]
+        idx = idx[np.lexsort((idx, dist[idx]))][:limit]
+    else:
+        idx = idx[np.argsort(dist[idx], kind="stable")]
+    return idx.tolist(), dist[idx].tolist()
@@ -0,0 +1,89 @@
+"""
+Image inputs for the recognition/story pipeline.
+
+Frames travel through the pipeline in memory. Anything that accepts an image
+takes one of:
+
+  - bytes / bytearray / memoryview  raw encoded image (JPEG, PNG, WebP)
+  - "frame:<id>"                    reference returned by register_frame()
+  - any other str                   local file path (input adapter)
+
+Frame references exist because the storyteller orchestrator hands the image
+to `research_attraction` through an LLM tool call, which can only carry
+strings; the bytes stay in this process-local registry meanwhile.
+"""
+
+import mimetypes
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Tuple, Union
+
+ImageInput = Union[str, bytes, bytearray, memoryview]
+
+FRAME_REF_PREFIX = "frame:"
+
+_MAX_FRAMES = 64
+_frames: "OrderedDict[str, bytes]" = OrderedDict()
+_frames_lock = threading.Lock()
+
+
+def register_frame(data: Union[bytes, bytearray, memoryview]) -> str:
+    """Keep an in-memory frame addressable by a short string reference."""
+    data = bytes(data)
+    ref = FRAME_REF_PREFIX + uuid.uuid4().hex
+    with _frames_lock:
+        _frames[ref] = data
+        _frames.move_to_end(ref)
+        while len(_frames) > _MAX_FRAMES:
+            _frames.popitem(last=False)
+    return ref
+
+
+def release_frame(ref: str) -> None:
+    with _frames_lock:
+        _frames.pop(ref, None)
+
+
+def sniff_mime_type(data: bytes) -> str:
+    """Guess the MIME type from magic bytes; JPEG is the default."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return "image/jpeg"
+
+
+def load_image(image: ImageInput) -> Tuple[bytes, str]:
+    """
+    Resolve any ImageInput to (bytes, mime_type).
+
+    Raises:
+        ValueError: empty input.
+        FileNotFoundError: unknown frame reference or missing file.
+    """
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        data = bytes(image)
+        if not data:
+            raise ValueError("image is empty")
+        return data, sniff_mime_type(data)
+
+    if not image:
+        raise ValueError("image is required")
+
+    if image.startswith(FRAME_REF_PREFIX):
+        with _frames_lock:
+            data = _frames.get(image)
+        if data is None:
+            raise FileNotFoundError(f"Frame not found (expired?): {image}")
+        return data, sniff_mime_type(data)
+
+    if not os.path.isfile(image):
+        raise FileNotFoundError(f"Image not found: {image}")
+    with open(image, "rb") as f:
+        data = f.read()
+    mime_type, _ = mimetypes.guess_type(image)
+    return data, mime_type or sniff_mime_type(data)
@@ -0,0 +1,225 @@
+"""
+Geospatial tile cache for Places `searchNearby` results.
+
+Queries are snapped to a geohash cell. The first query in a cell fetches all
+places around the cell centre (radius widened by the cell's half-diagonal so
+every point in the cell is covered); later queries from anywhere in the same
+cell are answered from memory by filtering/re-ranking the cached places.
+
+Caveat: the Places API caps results (maxResultCount=20, ranked by
+popularity), so a widened fetch in very dense areas can miss minor places
+that a point query would have returned.
+
+Concurrent misses on the same tile share one fetch (get_or_fetch /
+get_or_fetch_async): the first caller fetches, the others wait for its
+result instead of sending their own searchNearby.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+# Fetch result: places (cached) or an error status dict (passed through, not cached)
+FetchResult = Union[List[Dict[str, Any]], Dict[str, Any]]
+# Followers of a cancelled async fetch retry instead of inheriting the cancellation
+_RETRY = object()
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = 7) -> str:
+    """Standard geohash of a point (precision 7 ≈ 150 m x 150 m cells)."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars: List[str] = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_lo = mid
+            else:
+                bits <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_lo = mid
+            else:
+                bits <<= 1
+                lat_hi = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def geohash_bbox(cell: str) -> Tuple[float, float, float, float]:
+    """Bounding box (lat_lo, lon_lo, lat_hi, lon_hi) of a geohash cell."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+    for ch in cell:
+        idx = _BASE32.index(ch)
+        for shift in range(4, -1, -1):
+            bit = (idx >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                if bit:
+                    lon_lo = mid
+                else:
+                    lon_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+class PlacesTileCache:
+    """Thread-safe LRU + TTL map from (cell, radius, language) to raw places."""
+
+    def __init__(self, precision: int = 7, max_tiles: int = 1024, ttl_s: float = 900.0):
+        self.precision = precision
+        self.max_tiles = max_tiles
+        self.ttl_s = ttl_s
+        self._tiles: "OrderedDict[Hashable, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def cell_for(self, latitude: float, longitude: float) -> str:
+        return geohash_encode(latitude, longitude, self.precision)
+
+    def _lookup(self, key: Hashable) -> Optional[List[Dict[str, Any]]]:
+        item = self._tiles.get(key)
+        if item is not None and time.monotonic() < item[0]:
+            self._tiles.move_to_end(key)
+            return item[1]
+        if item is not None:
+            del self._tiles[key]
+        return None
+
+    def _store(self, key: Hashable, places: List[Dict[str, Any]]) -> None:
+        self._tiles[key] = (time.monotonic() + self.ttl_s, places)
+        self._tiles.move_to_end(key)
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+
+    def get(self, key: Hashable) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            places = self._lookup(key)
+            if places is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return places
+
+    def put(self, key: Hashable, places: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._store(key, places)
+
+    def _claim(self, key: Hashable) -> Tuple[Optional[List[Dict[str, Any]]], Optional[Future], bool]:
+        """(cached places, in-flight future, this caller fetches?) for one lookup."""
+        with self._lock:
+            places = self._lookup(key)
+            if places is not None:
+                self.hits += 1
+                return places, None, False
+            future = self._inflight.get(key)
+            if future is not None:
+                # Someone is already fetching this tile; count as a hit
+                self.hits += 1
+                self.coalesced += 1
+                return None, future, False
+            self.misses += 1
+            future = self._inflight[key] = Future()
+            return None, future, True
+
+    def _settle(self, key: Hashable, future: Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if isinstance(result, list):
+                self._store(key, result)
+            self._inflight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], FetchResult]) -> FetchResult:
+        """Cached places for `key`, or the result of one `fetch()` shared by concurrent callers."""
+        while True:
+            places, future, leader = self._claim(key)
+            if places is not None:
+                return places
+            if not leader:
+                result = future.result()
+                if result is not _RETRY:
+                    return result
+                continue
+            try:
+                result = fetch()
+            except BaseException as e:
+                self._settle(key, future, error=e)
+                raise
+            self._settle(key, future, result)
+            return result
+
+    async def get_or_fetch_async(self, key: Hashable, fetch: Callable[[], Awaitable[FetchResult]]) -> FetchResult:
+        """Asyncio variant of get_or_fetch; shares in-flight fetches with sync callers."""
+        while True:
+            places, future, leader = self._claim(key)
+            if places is not None:
+                return places
+            if not leader:
+                # shield: a cancelled follower must not cancel the shared future
+                result = await asyncio.shield(asyncio.wrap_future(future))
+                if result is not _RETRY:
+                    return result
+                continue
+            try:
+                result = await fetch()
+            except asyncio.CancelledError:
+                self._settle(key, future, _RETRY)
+                raise
+            except BaseException as e:
+                self._settle(key, future, error=e)
+                raise
+            self._settle(key, future, result)
+            return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tiles.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "tiles": len(self._tiles),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight),
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+PLACES_CACHE = PlacesTileCache(
+    precision=int(os.getenv("PLACES_CACHE_PRECISION", "7")),
+    max_tiles=int(os.getenv("PLACES_CACHE_MAX_TILES", "1024")),
+    ttl_s=float(os.getenv("PLACES_CACHE_TTL_S", "900")),
+)
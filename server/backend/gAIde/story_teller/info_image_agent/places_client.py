@@ -0,0 +1,130 @@
+"""
+Shared, connection-pooled HTTP client for the Places API.
+
+One `httpx.AsyncClient` lives on a dedicated background event loop, so its
+keep-alive pool stays warm across server sessions, across the throwaway
+loops created by `generate_story_sync`, and across plain CLI calls:
+
+  - `await client.post_json_async(...)` from any running loop
+  - `client.post_json(...)` blocking facade for scripts/CLI
+
+A semaphore on the background loop caps concurrent in-flight requests.
+"""
+
+import asyncio
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+
+
+class PlacesHTTPClient:
+    def __init__(
+        self,
+        max_connections: int = 10,
+        keepalive_expiry_s: float = 60.0,
+        timeout_s: float = 15.0,
+    ):
+        self.max_connections = max_connections
+        self.keepalive_expiry_s = keepalive_expiry_s
+        self.timeout_s = timeout_s
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+
+        self.requests_total = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    # ---------- lifecycle ----------
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run():
+                asyncio.set_event_loop(loop)
+                self._client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                        keepalive_expiry=self.keepalive_expiry_s,
+                    ),
+                    timeout=self.timeout_s,
+                )
+                self._sem = asyncio.Semaphore(self.max_connections)
+                ready.set()
+                loop.run_forever()
+
+            thread = threading.Thread(target=_run, name="places-http", daemon=True)
+            thread.start()
+            ready.wait()
+            self._loop, self._thread = loop, thread
+            return loop
+
+    async def _shutdown(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def close(self) -> None:
+        """Close pooled connections and stop the background loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+        loop.close()
+
+    async def aclose(self) -> None:
+        await asyncio.to_thread(self.close)
+
+    # ---------- requests ----------
+
+    async def _post(self, url: str, headers: Dict[str, str], body: Dict[str, Any]) -> httpx.Response:
+        assert self._client is not None and self._sem is not None
+        async with self._sem:
+            self.requests_total += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                return await self._client.post(url, headers=headers, json=body)
+            finally:
+                self.in_flight -= 1
+
+    async def post_json_async(
+        self, url: str, *, headers: Dict[str, str], body: Dict[str, Any]
+    ) -> httpx.Response:
+        loop = self._ensure_started()
+        fut = asyncio.run_coroutine_threadsafe(self._post(url, headers, body), loop)
+        return await asyncio.wrap_future(fut)
+
+    def post_json(self, url: str, *, headers: Dict[str, str], body: Dict[str, Any]) -> httpx.Response:
+        """Blocking facade; must not be called from the client's own loop."""
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(self._post(url, headers, body), loop).result()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests_total,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "max_connections": self.max_connections,
+        }
+
+
+PLACES_HTTP = PlacesHTTPClient(
+    max_connections=int(os.getenv("PLACES_HTTP_MAX_CONNECTIONS", "10")),
+)
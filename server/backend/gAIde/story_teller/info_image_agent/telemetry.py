@@ -0,0 +1,235 @@
+"""
+Process-wide metrics: counters, gauges and latency histograms in Prometheus text format.
+
+Deliberately tiny (no prometheus_client dependency): the pipeline records
+stage latencies and upstream errors here from any thread or event loop, and
+the WebSocket server renders everything at /metrics.
+
+    with stage_timer("places"):
+        ...
+
+    @timed("recognition")
+    def recognize_showplace(...): ...
+
+    record_upstream_error("places", "http_429")
+"""
+
+import functools
+import inspect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+_LabelValues = Tuple[str, ...]
+
+# Seconds; spans sub-second cache hits to minute-long agent runs
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: Tuple[str, ...], values: _LabelValues, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> _LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[_LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_label_str(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Value computed at scrape time by `fn` -> number or {label tuple: number}."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, fn: Callable[[], Any], labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        value = self.fn()
+        if isinstance(value, dict):
+            items = [((k,) if isinstance(k, str) else tuple(k), v) for k, v in value.items()]
+        else:
+            items = [((), value)]
+        return self.header() + [f"{self.name}{_label_str(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [per-bucket counts..., sum, count]
+        self._series: Dict[_LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self, **labels: Any) -> Optional[Dict[str, float]]:
+        """count / sum / avg for one label set (for logs and stats())."""
+        series = self._series.get(self._key(labels))
+        if not series or not series[-1]:
+            return None
+        return {"count": series[-1], "sum": round(series[-2], 3), "avg": round(series[-2] / series[-1], 3)}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        lines = self.header()
+        for key, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                le = f'le="{_fmt(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_str(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_str(self.labelnames, key)} {_fmt(series[-2])}")
+            lines.append(f"{self.name}_count{_label_str(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing  # idempotent on module re-import
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge(self, name: str, help_text: str, fn: Callable[[], Any], labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, fn, labelnames))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:  # a broken gauge must not take down the scrape
+                lines.append(f"# {metric.name} unavailable: {e!r}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_LATENCY = REGISTRY.histogram(
+    "gaid_describe_stage_seconds",
+    "Latency of describe pipeline stages (describe, story, research, recognition, places).",
+    ("stage",),
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "gaid_upstream_errors_total",
+    "Errors from upstream services by service and error type.",
+    ("upstream", "type"),
+)
+
+
+def record_upstream_error(upstream: str, error: Any) -> None:
+    """`error` is an exception (its class name is used) or a short type string."""
+    kind = error if isinstance(error, str) else type(error).__name__
+    UPSTREAM_ERRORS.inc(upstream=upstream, type=kind)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - t0, stage=stage)
+
+
+def timed(stage: str):
+    """Decorator form of stage_timer for sync and async functions."""
+
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with stage_timer(stage):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,339 @@
+"""
+Tracing spans for the describe pipeline, on OpenTelemetry (already pulled in by google-adk).
+
+Each describe is one trace:
+
+    describe_place
+      generate_story
+        orchestrator                    <- ADK agent_run / call_llm spans nest here
+          research_attraction
+            generate_facts
+              recognize -> recognition, places
+              research_agent            <- google_search agent, its call_llm spans
+
+ADK's own `call_llm` spans carry `gen_ai.usage.*` token counts; recognition
+calls add theirs with `add_token_usage`. Tracing is off (no-op API, no cost)
+unless configured from env:
+
+    TRACE_FILE=traces.jsonl     one JSON waterfall per describe (see WaterfallProcessor);
+                                "{pid}" in the path gives each worker process its own file
+    TRACE_EXPORTER=gcp|otlp     also send every span to Cloud Trace / an OTLP collector
+    TRACE_LOG_SLOW_S=20         log a text waterfall for describes slower than this
+
+Context lives in contextvars: asyncio tasks and `asyncio.to_thread` carry it
+automatically, bare threads and executors need `in_context`.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from opentelemetry import context as otel_context
+from opentelemetry import trace
+
+try:
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import SpanProcessor, TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+except Exception:  # api-only install: spans stay no-ops
+    TracerProvider = None  # type: ignore[assignment]
+    SpanProcessor = object  # type: ignore[assignment,misc]
+
+logger = logging.getLogger(__name__)
+
+_tracer = trace.get_tracer("gaid.describe")
+
+# Marks root spans whose traces the waterfall processor collects
+WATERFALL_ATTR = "gaid.waterfall"
+TOKEN_ATTRS = {"input": "gen_ai.usage.input_tokens", "output": "gen_ai.usage.output_tokens"}
+
+
+@contextmanager
+def span(name: str, *, root: bool = False, **attrs: Any):
+    """
+    Open a span as a child of the current one.
+
+    root=True starts a new trace (one waterfall), linked to the enclosing span
+    if there is one: describe_place runs inside a live session that lasts far
+    longer than any describe.
+    """
+    attributes = {k: v for k, v in attrs.items() if v is not None}
+    if not root:
+        with _tracer.start_as_current_span(name, attributes=attributes) as s:
+            yield s
+        return
+
+    parent = trace.get_current_span().get_span_context()
+    links = [trace.Link(parent)] if parent.is_valid else None
+    attributes[WATERFALL_ATTR] = True
+    with _tracer.start_as_current_span(
+        name, context=otel_context.Context(), attributes=attributes, links=links
+    ) as s:
+        yield s
+
+
+def traced(name: str):
+    """Decorator form of span() for sync and async functions."""
+
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def in_context(fn: Callable) -> Callable:
+    """Bind `fn` to a copy of the current context, for threads and executor.submit."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def add_token_usage(usage: Any) -> None:
+    """Add a genai `usage_metadata` to the current span, as ADK does for call_llm."""
+    current = trace.get_current_span()
+    if usage is None or not current.is_recording():
+        return
+    for key, field in (("input", "prompt_token_count"), ("output", "candidates_token_count")):
+        n = getattr(usage, field, None)
+        if n is not None:
+            current.set_attribute(TOKEN_ATTRS[key], n)
+
+
+# ---------------------------------------------------------------------------
+# Waterfall export
+# ---------------------------------------------------------------------------
+
+_MAX_ATTR_CHARS = 200
+# ADK puts whole requests/responses in attributes; keep the waterfall readable
+_SKIPPED_ATTR_PREFIXES = ("gcp.vertex.agent.llm_request", "gcp.vertex.agent.llm_response",
+                          "gcp.vertex.agent.tool_call_args", "gcp.vertex.agent.tool_response",
+                          "gcp.vertex.agent.data")
+
+
+def _small_attrs(attributes: Any) -> Dict[str, Any]:
+    out = {}
+    for k, v in (attributes or {}).items():
+        if k == WATERFALL_ATTR or k.startswith(_SKIPPED_ATTR_PREFIXES):
+            continue
+        if isinstance(v, str) and len(v) > _MAX_ATTR_CHARS:
+            v = v[:_MAX_ATTR_CHARS] + "..."
+        elif isinstance(v, tuple):
+            v = list(v)
+        out[k] = v
+    return out
+
+
+def build_waterfall(spans: List[Any]) -> Optional[Dict[str, Any]]:
+    """One trace (finished SDK spans) -> nested-by-depth rows with subtree token totals."""
+    by_id = {s.context.span_id: s for s in spans}
+    roots = [s for s in spans if s.parent is None or s.parent.span_id not in by_id]
+    if not roots:
+        return None
+    root = min(roots, key=lambda s: s.start_time)
+
+    children: Dict[int, List[Any]] = {}
+    for s in spans:
+        if s is not root and s.parent is not None and s.parent.span_id in by_id:
+            children.setdefault(s.parent.span_id, []).append(s)
+
+    rows: List[Dict[str, Any]] = []
+
+    def walk(s: Any, depth: int) -> Dict[str, int]:
+        attributes = s.attributes or {}
+        tokens = {k: int(attributes.get(attr) or 0) for k, attr in TOKEN_ATTRS.items()}
+        row = {
+            "name": s.name,
+            "depth": depth,
+            "offset_ms": round((s.start_time - root.start_time) / 1e6, 1),
+            "duration_ms": round((s.end_time - s.start_time) / 1e6, 1),
+            "status": s.status.status_code.name.lower(),
+        }
+        attrs = _small_attrs(s.attributes)
+        if attrs:
+            row["attributes"] = attrs
+        rows.append(row)
+        for child in sorted(children.get(s.context.span_id, []), key=lambda c: c.start_time):
+            for k, n in walk(child, depth + 1).items():
+                tokens[k] += n
+        if any(tokens.values()):
+            row["tokens"] = tokens
+        return tokens
+
+    totals = walk(root, 0)
+    return {
+        "trace_id": format(root.context.trace_id, "032x"),
+        "name": root.name,
+        "start_unix": round(root.start_time / 1e9, 3),
+        "duration_ms": round((root.end_time - root.start_time) / 1e6, 1),
+        "status": root.status.status_code.name.lower(),
+        "tokens": totals,
+        "spans": rows,
+    }
+
+
+def format_waterfall(waterfall: Dict[str, Any], width: int = 40) -> str:
+    """Text rendering for logs: indented names with offset/duration bars."""
+    total = max(waterfall["duration_ms"], 1.0)
+    lines = [f"trace {waterfall['trace_id']} {waterfall['name']} {waterfall['duration_ms']:.0f} ms tokens={waterfall['tokens']}"]
+    for row in waterfall["spans"]:
+        start = int(width * row["offset_ms"] / total)
+        length = max(1, int(width * row["duration_ms"] / total))
+        bar = " " * start + "#" * min(length, width - start)
+        label = ("  " * row["depth"] + row["name"])[:44]
+        tokens = f" tok={row['tokens']['input']}/{row['tokens']['output']}" if "tokens" in row else ""
+        lines.append(f"  {label:<44} |{bar:<{width}}| {row['duration_ms']:>9.1f} ms{tokens}")
+    return "\n".join(lines)
+
+
+class WaterfallProcessor(SpanProcessor):
+    """
+    Collects the spans of each describe trace and writes one JSON line per
+    trace when its root ends. Only traces started with span(..., root=True)
+    are collected; the long-lived live-session traces ADK emits are ignored.
+
+    Root spans end on the serving loop, so building, writing and logging the
+    waterfall happen on a background writer thread; a full backlog drops
+    traces rather than blocking.
+    """
+
+    def __init__(self, path: Optional[str], slow_log_s: Optional[float] = None,
+                 max_traces: int = 256, max_spans: int = 2000):
+        self.path = path
+        self.slow_log_s = slow_log_s
+        self.max_traces = max_traces
+        self.max_spans = max_spans
+        self._traces: "OrderedDict[int, List[Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: "queue.Queue[Any]" = queue.Queue(maxsize=max_traces)
+        self._writer: Optional[threading.Thread] = None
+        self.exported = 0
+        self.dropped_traces = 0
+
+    def on_start(self, span, parent_context=None) -> None:
+        if span.parent is None and span.attributes and span.attributes.get(WATERFALL_ATTR):
+            with self._lock:
+                self._traces[span.context.trace_id] = []
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)  # root never ended (cancelled loop, ...)
+                    self.dropped_traces += 1
+
+    def on_end(self, span) -> None:
+        trace_id = span.context.trace_id
+        with self._lock:
+            spans = self._traces.get(trace_id)
+            if spans is None:
+                return
+            if len(spans) < self.max_spans:
+                spans.append(span)
+            if span.parent is not None:
+                return
+            del self._traces[trace_id]
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="trace-waterfall", daemon=True)
+                self._writer.start()
+        try:
+            self._pending.put_nowait(spans)
+        except queue.Full:
+            self.dropped_traces += 1
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            if isinstance(item, threading.Event):  # force_flush marker
+                item.set()
+                continue
+            try:
+                self._export(item)
+            except Exception:
+                logger.exception("Writing trace waterfall failed")
+
+    def _export(self, spans: List[Any]) -> None:
+        waterfall = build_waterfall(spans)
+        if waterfall is None:
+            return
+        self.exported += 1
+        if self.path:
+            line = json.dumps(waterfall, ensure_ascii=False, default=str)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        if self.slow_log_s is not None and waterfall["duration_ms"] >= 1000 * self.slow_log_s:
+            logger.info("Slow describe:\n%s", format_waterfall(waterfall))
+
+    def shutdown(self) -> None:
+        self.force_flush()
+        writer = self._writer
+        if writer is not None:
+            self._pending.put(None)
+            writer.join(timeout=5)
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        if self._writer is None:
+            return True
+        done = threading.Event()
+        try:
+            self._pending.put(done, timeout=timeout_millis / 1000)
+        except queue.Full:
+            return False
+        return done.wait(timeout_millis / 1000)
+
+
+def _collector_exporter(kind: str):
+    if kind == "gcp":
+        from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
+        return CloudTraceSpanExporter()
+    if kind == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()  # OTEL_EXPORTER_OTLP_* env vars
+    raise ValueError(f"unknown TRACE_EXPORTER {kind!r}")
+
+
+_configured = False
+
+
+def configure_from_env() -> bool:
+    """Install a tracer provider per TRACE_* env vars (idempotent). False = tracing stays off."""
+    global _configured
+    if _configured:
+        return True
+    path = os.getenv("TRACE_FILE") or None
+    if path:
+        path = path.replace("{pid}", str(os.getpid()))
+    exporter_kind = (os.getenv("TRACE_EXPORTER") or "").strip().lower()
+    slow = os.getenv("TRACE_LOG_SLOW_S")
+    if not (path or exporter_kind or slow):
+        return False
+    if TracerProvider is None:
+        logger.warning("TRACE_* set but opentelemetry-sdk is not installed; tracing disabled")
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": os.getenv("TRACE_SERVICE_NAME", "gaide-server")}))
+    provider.add_span_processor(WaterfallProcessor(path, slow_log_s=float(slow) if slow else None))
+    if exporter_kind:
+        try:
+            provider.add_span_processor(BatchSpanProcessor(_collector_exporter(exporter_kind)))
+        except Exception as e:
+            logger.warning(f"Trace exporter {exporter_kind!r} unavailable: {e!r}")
+    trace.set_tracer_provider(provider)
+    _configured = True
+    return True
@@ -14,6 +14,7 @@ from google.adk.tools import google_search
 
 # --- Defaults (can be overridden via env) ---
 from .config import PLACE as DEFAULT_PLACE, USER_PROFILE as DEFAULT_USER_PROFILE
+from .info_image_agent.genai_client import agent_model
 
 def _load_overrides() -> tuple[Dict[str, Any], Dict[str, Any]]:
     """Optionally override PLACE/USER_PROFILE with JSON in env vars."""
@@ -147,7 +148,7 @@ def build_instruction(place: Dict[str, Any], user_profile: Dict[str, Any]) -> st
 def make_agent(place: Dict[str, Any], user_profile: Dict[str, Any]) -> Agent:
     return Agent(
         name="attraction_facts_agent",
-        model="gemini-2.5-flash",
+        model=agent_model("gemini-2.5-flash"),
         instruction=build_instruction(place, user_profile),
         description="Gathers structured, interest-aware facts (incl. context/history) using Google Search; returns JSON only.",
         tools=[google_search],
@@ -1,12 +1,22 @@
 # agent_function.py
-import asyncio, json, re, uuid
-from typing import Any, Dict
+import asyncio, contextvars, json, logging, re, uuid
+from typing import Any, Dict, Optional
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.genai import types
-from .info_image_agent.agent import recognize_showplace_auto
+from .info_image_agent.agent import get_coordinates, recognize_showplace_auto_async
+from .info_image_agent.genai_client import aclose_genai_async_client
+from .info_image_agent.image_input import ImageInput
+from .session_store import TASK_SESSIONS
+from .info_image_agent.telemetry import record_upstream_error, stage_timer
+from .info_image_agent.tracing import span, traced
 from .research_agent import make_agent  # your factory that bakes place/profile into instruction
 
+logger = logging.getLogger(__name__)
+
+# Place already recognized for the frame being described (the server recognizes
+# before its story-cache lookup); generate_facts uses it instead of asking again
+KNOWN_PLACE: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("known_place", default=None)
+
 def _parse_loose_json(text: str) -> Dict[str, Any]:
     """Tolerant JSON parser: strips ``` fences & returns the first {...} block."""
     s = text.strip()
@@ -18,29 +28,38 @@ def _parse_loose_json(text: str) -> Dict[str, Any]:
         raise ValueError("No JSON object found in final response.")
     return json.loads(s[i:j+1])
 
+async def recognize_place(image: ImageInput) -> Dict[str, Any]:
+    """Recognize the landmark in memory (bytes / frame ref / path); {} if it fails."""
+    coords = get_coordinates()
+    try:
+        place = await recognize_showplace_auto_async(
+            image, lat=coords["latitude"], lon=coords["longitude"]
+        )
+        return _parse_loose_json(place)
+    except Exception as e:
+        logger.warning(f"recognize_showplace_auto_async failed: {e!r}")
+        return {}
+
+
+@traced("generate_facts")
 async def generate_facts(
-    image: str,
+    image: ImageInput,
     profile: Dict[str, Any],
     timeout_s: int = 90
 ) -> Dict[str, Any]:
     """Run your agent once and return the JSON as a Python dict. No human prompt."""
-    # place = recognize_showplace_auto(image)
-    place = "{}"
-    # strip code fences and parse
-    clean = re.sub(r"^```(?:json)?\s*|\s*```$", "", place.strip(), flags=re.DOTALL)
-    place = json.loads(clean)
+    place = KNOWN_PLACE.get() or await recognize_place(image)
 
-    print(place)
+    logger.debug(f"Recognized place: {place}")
 
     # raise NotImplementedError(f"This is the place: {place}")
     # print("Recognized place:", place)
     agent = make_agent(place, profile)
 
-    session = InMemorySessionService()
     app_name, user_id, session_id = "facts_app", "svc", f"task-{uuid.uuid4()}"
-    await session.create_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    await TASK_SESSIONS.create_session(app_name=app_name, user_id=user_id, session_id=session_id)
 
-    runner = Runner(agent=agent, app_name=app_name, session_service=session)
+    runner = Runner(agent=agent, app_name=app_name, session_service=TASK_SESSIONS)
 
     # Internal trigger: empty user message (no real prompt needed)
     content = types.Content(role="user", parts=[types.Part(text="")])
@@ -52,7 +71,14 @@ async def generate_facts(
                 final = ev.content.parts[0].text
         return final
 
-    text = await asyncio.wait_for(_run_once(), timeout=timeout_s)
+    try:
+        with stage_timer("research"), span("research_agent", agent=agent.name, place=place.get("name")):
+            text = await asyncio.wait_for(_run_once(), timeout=timeout_s)
+    except Exception as e:
+        record_upstream_error("research_agent", e)
+        raise
+    finally:
+        await TASK_SESSIONS.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
     if not text:
         raise RuntimeError("Agent returned no final response.")
 
@@ -62,6 +88,12 @@ async def generate_facts(
     except Exception:
         return _parse_loose_json(text)
 
-def generate_facts_sync(place: Dict[str, Any], profile: Dict[str, Any], timeout_s: int = 90) -> Dict[str, Any]:
+def generate_facts_sync(image: ImageInput, profile: Dict[str, Any], timeout_s: int = 90) -> Dict[str, Any]:
     """Synchronous convenience wrapper."""
-    return asyncio.run(generate_facts(place, profile, timeout_s))
\ No newline at end of file
+    async def _run() -> Dict[str, Any]:
+        try:
+            return await generate_facts(image, profile, timeout_s)
+        finally:
+            await aclose_genai_async_client()  # asyncio.run closes the loop next
+
+    return asyncio.run(_run())
\ No newline at end of file
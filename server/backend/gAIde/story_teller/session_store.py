@@ -0,0 +1,353 @@
+"""
+Bounded ADK session service with idle eviction and an optional SQLite spill tier.
+
+InMemorySessionService keeps every session forever. BoundedSessionService
+is a drop-in BaseSessionService that keeps a hot, in-memory LRU tier
+capped by session count and by an estimate of retained bytes, and evicts
+sessions idle for longer than `idle_ttl_s`. With `spill_path` set, evicted
+sessions are serialised to SQLite and transparently reloaded on the next
+get_session (e.g. a client resuming after a long pause); without it they are
+dropped.
+
+Safe to share between event loops/threads (generate_story_sync runs its own
+loop in a worker thread): in-memory bookkeeping is guarded by a lock and
+SQLite I/O runs off the event loop.
+"""
+
+import asyncio
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.events.event import Event
+from google.adk.sessions.base_session_service import (
+    BaseSessionService,
+    GetSessionConfig,
+    ListSessionsResponse,
+)
+from google.adk.sessions.session import Session
+from google.adk.sessions.state import State
+
+_Key = Tuple[str, str, str]  # (app_name, user_id, session_id)
+
+# Rough per-event cost of ids, author, actions and pydantic overhead
+_EVENT_OVERHEAD = 512
+_SESSION_OVERHEAD = 1024
+
+
+def _event_size(event: Event) -> int:
+    size = _EVENT_OVERHEAD
+    content = event.content
+    if content is not None and content.parts:
+        for part in content.parts:
+            if part.text:
+                size += len(part.text)
+            if part.inline_data is not None and part.inline_data.data:
+                size += len(part.inline_data.data)
+            if part.function_call is not None and part.function_call.args:
+                size += len(json.dumps(part.function_call.args, default=str))
+            if part.function_response is not None and part.function_response.response:
+                size += len(json.dumps(part.function_response.response, default=str))
+    return size
+
+
+class _Entry:
+    __slots__ = ("session", "size", "last_access")
+
+    def __init__(self, session: Session, size: int):
+        self.session = session
+        self.size = size
+        self.last_access = time.monotonic()
+
+
+class BoundedSessionService(BaseSessionService):
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        max_bytes: int = 256 * 1024 * 1024,
+        idle_ttl_s: float = 30 * 60,
+        spill_path: Optional[str] = None,
+        spill_ttl_s: float = 24 * 3600,
+    ):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.idle_ttl_s = idle_ttl_s
+        self.spill_ttl_s = spill_ttl_s
+
+        self._hot: "OrderedDict[_Key, _Entry]" = OrderedDict()  # LRU: oldest access first
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.app_state: Dict[str, Dict[str, Any]] = {}
+        self.user_state: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if spill_path:
+            self._db = sqlite3.connect(spill_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " app_name TEXT, user_id TEXT, session_id TEXT, data TEXT, spilled_at REAL,"
+                " PRIMARY KEY (app_name, user_id, session_id))"
+            )
+        # Rows in the spill table, kept current by the (off-loop) spill helpers
+        self._spilled_rows = self._count_spilled_locked() if self._db is not None else 0
+
+        self.evicted_idle = 0
+        self.evicted_memory = 0
+        self.spilled = 0
+        self.reloaded = 0
+
+    # ---------- hot tier ----------
+
+    def _admit(self, key: _Key, session: Session, size: int) -> List[Session]:
+        """Insert/refresh under the lock; returns sessions evicted to make room."""
+        old = self._hot.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        self._hot[key] = _Entry(session, size)
+        self._bytes += size
+        return self._evict_locked(protect=key)
+
+    def _evict_locked(self, protect: Optional[_Key] = None) -> List[Session]:
+        evicted: List[Session] = []
+        cutoff = time.monotonic() - self.idle_ttl_s
+        while self._hot:
+            key, entry = next(iter(self._hot.items()))
+            if key == protect:
+                break
+            if entry.last_access < cutoff:
+                self.evicted_idle += 1
+            elif len(self._hot) > self.max_sessions or self._bytes > self.max_bytes:
+                self.evicted_memory += 1
+            else:
+                break
+            del self._hot[key]
+            self._bytes -= entry.size
+            evicted.append(entry.session)
+        return evicted
+
+    def _touch(self, key: _Key) -> Optional[_Entry]:
+        entry = self._hot.get(key)
+        if entry is not None:
+            entry.last_access = time.monotonic()
+            self._hot.move_to_end(key)
+        return entry
+
+    async def _spill(self, sessions: List[Session]) -> None:
+        if not sessions or self._db is None:
+            return
+        await asyncio.to_thread(self._spill_sync, sessions)
+
+    # ---------- spill tier (blocking; run via to_thread) ----------
+
+    def _spill_sync(self, sessions: List[Session]) -> None:
+        now = time.time()
+        rows = [(s.app_name, s.user_id, s.id, s.model_dump_json(), now) for s in sessions]
+        with self._db_lock:
+            self._db.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?)", rows)
+            self._db.execute("DELETE FROM sessions WHERE spilled_at < ?", (now - self.spill_ttl_s,))
+            self._spilled_rows = self._count_spilled_locked()
+        self.spilled += len(rows)
+
+    def _unspill_sync(self, key: _Key) -> Optional[Session]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT data FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?", key
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?", key
+            )
+            self._spilled_rows = self._count_spilled_locked()
+        return Session.model_validate_json(row[0])
+
+    def _delete_spilled_sync(self, key: _Key) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?", key
+            )
+            self._spilled_rows = self._count_spilled_locked()
+
+    def _list_spilled_sync(self, app_name: str, user_id: str) -> List[Session]:
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT data FROM sessions WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+            ).fetchall()
+        return [Session.model_validate_json(data) for (data,) in rows]
+
+    def _count_spilled_locked(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def spilled_count(self) -> int:
+        """Sessions in the spill table, without touching SQLite (safe on the event loop)."""
+        return self._spilled_rows
+
+    # ---------- state merging (app:/user: prefixes, as InMemorySessionService) ----------
+
+    def _merge_state(self, session: Session) -> Session:
+        for k, v in self.app_state.get(session.app_name, {}).items():
+            session.state[State.APP_PREFIX + k] = v
+        for k, v in self.user_state.get((session.app_name, session.user_id), {}).items():
+            session.state[State.USER_PREFIX + k] = v
+        return session
+
+    # ---------- BaseSessionService ----------
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=state or {},
+            last_update_time=time.time(),
+        )
+        with self._lock:
+            evicted = self._admit((app_name, user_id, session_id), session, _SESSION_OVERHEAD)
+        await self._spill(evicted)
+        return self._merge_state(copy.deepcopy(session))
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        with self._lock:
+            entry = self._touch(key)
+            session = copy.deepcopy(entry.session) if entry is not None else None
+
+        if session is None:
+            if self._db is None:
+                return None
+            stored = await asyncio.to_thread(self._unspill_sync, key)
+            if stored is None:
+                return None
+            self.reloaded += 1
+            size = _SESSION_OVERHEAD + sum(_event_size(e) for e in stored.events)
+            with self._lock:
+                evicted = self._admit(key, stored, size)
+            await self._spill(evicted)
+            session = copy.deepcopy(stored)
+
+        if config:
+            if config.num_recent_events:
+                session.events = session.events[-config.num_recent_events:]
+            if config.after_timestamp:
+                session.events = [e for e in session.events if e.timestamp >= config.after_timestamp]
+        return self._merge_state(session)
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        with self._lock:
+            hot = [
+                e.session.model_copy(update={"events": []}, deep=True)
+                for (a, u, _), e in self._hot.items()
+                if a == app_name and u == user_id
+            ]
+        if self._db is not None:
+            hot += await asyncio.to_thread(self._list_spilled_sync, app_name, user_id)
+        for session in hot:
+            session.events = []
+            self._merge_state(session)
+        return ListSessionsResponse(sessions=hot)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        with self._lock:
+            entry = self._hot.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size
+        if self._db is not None:
+            await asyncio.to_thread(self._delete_spilled_sync, key)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        await super().append_event(session=session, event=event)
+        if event.partial:
+            return event
+        session.last_update_time = event.timestamp
+
+        if event.actions and event.actions.state_delta:
+            for k, v in event.actions.state_delta.items():
+                if k.startswith(State.APP_PREFIX):
+                    self.app_state.setdefault(session.app_name, {})[k.removeprefix(State.APP_PREFIX)] = v
+                elif k.startswith(State.USER_PREFIX):
+                    self.user_state.setdefault((session.app_name, session.user_id), {})[
+                        k.removeprefix(State.USER_PREFIX)
+                    ] = v
+
+        key = (session.app_name, session.user_id, session.id)
+        size = _event_size(event)
+        with self._lock:
+            entry = self._touch(key)
+        if entry is None:
+            # Evicted while still in use (e.g. a long live session under memory
+            # pressure): re-admit the caller's copy, which carries full history
+            stored = copy.deepcopy(session)
+            with self._lock:
+                evicted = self._admit(key, stored, _SESSION_OVERHEAD + sum(_event_size(e) for e in stored.events))
+        else:
+            await super().append_event(session=entry.session, event=event)
+            entry.session.last_update_time = event.timestamp
+            with self._lock:
+                entry.size += size
+                if self._hot.get(key) is entry:
+                    self._bytes += size
+                evicted = self._evict_locked(protect=key)
+        await self._spill(evicted)
+        return event
+
+    # ---------- maintenance / metrics ----------
+
+    async def evict_idle(self) -> int:
+        """Evict idle sessions now (eviction otherwise happens on writes)."""
+        with self._lock:
+            evicted = self._evict_locked()
+        await self._spill(evicted)
+        return len(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hot, hot_bytes = len(self._hot), self._bytes
+        return {
+            "hot_sessions": hot,
+            "hot_bytes": hot_bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "occupancy": round(max(hot / self.max_sessions, hot_bytes / self.max_bytes), 3),
+            "spilled_sessions": self.spilled_count(),
+            "evicted_idle": self.evicted_idle,
+            "evicted_memory": self.evicted_memory,
+            "reloaded": self.reloaded,
+        }
+
+
+def session_store_from_env(prefix: str = "SESSION_STORE") -> BoundedSessionService:
+    """Build a store from <prefix>_MAX_SESSIONS / _MAX_MB / _IDLE_TTL_S / _SPILL_PATH."""
+    return BoundedSessionService(
+        max_sessions=int(os.getenv(f"{prefix}_MAX_SESSIONS", "1000")),
+        max_bytes=int(float(os.getenv(f"{prefix}_MAX_MB", "256")) * 1024 * 1024),
+        idle_ttl_s=float(os.getenv(f"{prefix}_IDLE_TTL_S", str(30 * 60))),
+        spill_path=os.getenv(f"{prefix}_SPILL_PATH") or None,
+    )
+
+
+# One-shot agent runs (generate_story / generate_facts): short-lived task sessions
+TASK_SESSIONS = BoundedSessionService(max_sessions=256, max_bytes=64 * 1024 * 1024, idle_ttl_s=10 * 60)
@@ -0,0 +1,213 @@
+# story_cache.py
+"""
+Content-addressed cache in front of generate_story.
+
+Key = perceptual hash of the camera frame + recognized place (when known)
+      + geohash cell of the client's location (when the caller has a real fix)
+      + the profile fields that change the story (interests, locale, mobility).
+
+Frames whose hash carries almost no information (uniform black, white or
+grey frames all hash to zero) get no key and bypass the cache.
+
+Entries are evicted LRU once `max_entries` is reached and expire after
+`ttl_s`. Concurrent requests for the same key share one in-flight
+generation instead of running the pipeline twice.
+"""
+import asyncio
+import hashlib
+import io
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .info_image_agent.places_cache import geohash_encode
+
+# Pillow is optional: without it we fall back to an exact content hash
+try:
+    from PIL import Image as _PILImage
+except Exception:
+    _PILImage = None  # type: ignore[assignment]
+
+PROFILE_KEY_FIELDS = ("interests", "locale", "mobility")
+# Same cell size as the places tile cache (precision 7 ≈ 150 m)
+LOCATION_PRECISION = int(os.getenv("STORY_CACHE_GEOHASH_PRECISION", "7"))
+# dHashes with fewer set bits than this come from (nearly) uniform frames
+MIN_DHASH_BITS = 4
+
+
+def frame_fingerprint(frame: bytes) -> str:
+    """
+    64-bit difference hash (dHash) of a JPEG frame, as hex.
+    Small changes in exposure/compression keep the same hash, so repeat shots
+    of the same landmark map to the same entry. Falls back to a content hash
+    when Pillow is missing or the image cannot be decoded.
+    """
+    if _PILImage is not None:
+        try:
+            with _PILImage.open(io.BytesIO(frame)) as img:
+                img.draft("L", (64, 64))  # let the JPEG decoder downscale cheaply
+                small = img.convert("L").resize((9, 8))
+                px = list(small.getdata())
+            bits = 0
+            for row in range(8):
+                for col in range(8):
+                    bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+            return f"d{bits:016x}"
+        except Exception:
+            pass
+    return "b" + hashlib.blake2b(frame, digest_size=8).hexdigest()
+
+
+def is_informative(fingerprint: str) -> bool:
+    """False for dHashes of (nearly) uniform frames, which all look alike."""
+    if not fingerprint.startswith("d"):
+        return True
+    return bin(int(fingerprint[1:], 16)).count("1") >= MIN_DHASH_BITS
+
+
+def _place_key(place: Optional[Dict[str, Any]]) -> str:
+    if not place:
+        return ""
+    name = str(place.get("name") or "").strip().lower()
+    address = str(place.get("address") or "").strip().lower()
+    return f"{name}|{address}"
+
+
+def _location_key(location: Optional[Tuple[float, float]]) -> str:
+    if location is None:
+        return ""
+    return geohash_encode(float(location[0]), float(location[1]), LOCATION_PRECISION)
+
+
+def _profile_key(profile: Dict[str, Any]) -> str:
+    relevant = {k: profile.get(k) for k in PROFILE_KEY_FIELDS}
+    return json.dumps(relevant, sort_keys=True, ensure_ascii=False)
+
+
+def make_key(
+    frame: bytes,
+    profile: Dict[str, Any],
+    place: Optional[Dict[str, Any]] = None,
+    location: Optional[Tuple[float, float]] = None,
+) -> Optional[str]:
+    """
+    Build the cache key for a frame/place/location/profile combination.
+    None when the frame is too featureless to tell scenes apart.
+    """
+    fingerprint = frame_fingerprint(frame)
+    if not is_informative(fingerprint):
+        return None
+    raw = "\x1f".join((fingerprint, _place_key(place), _location_key(location), _profile_key(profile)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """One in-flight generation and the number of callers awaiting it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class StoryCache:
+    """LRU + TTL cache of generated stories with single-flight generation."""
+
+    def __init__(self, max_entries: int = 256, ttl_s: float = 6 * 3600):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, _Flight] = {}
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, story = item
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return story
+
+    def put(self, key: str, story: str) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_s, story)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_create(self, key: Optional[str], factory: Callable[[], Awaitable[str]]) -> str:
+        """
+        Return the cached story for `key`, or run `factory()` once and cache it.
+        Failures are not cached; every waiter on the same key sees the error.
+        key=None (see make_key) runs `factory()` without caching.
+        """
+        if key is None:
+            self.bypassed += 1
+            return await factory()
+
+        story = self.get(key)
+        if story is not None:
+            self.hits += 1
+            return story
+
+        flight = self._inflight.get(key)
+        if flight is not None:
+            # Someone is already generating this story; count as a hit
+            self.hits += 1
+        else:
+            self.misses += 1
+            flight = _Flight(asyncio.create_task(self._generate(key, factory), name=f"StoryCache-{key[:12]}"))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda _t, f=flight: self._forget(key, f))
+
+        # The generation runs in its own task: a waiter that is cancelled (its
+        # client disconnected) leaves without cancelling it for the others.
+        # It is only cancelled once the last waiter is gone.
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    async def _generate(self, key: str, factory: Callable[[], Awaitable[str]]) -> str:
+        story = await factory()
+        self.put(key, story)
+        return story
+
+    def _forget(self, key: str, flight: "_Flight") -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_ratio": round(self.hit_ratio, 3),
+        }
+
+
+# Process-wide cache; size/TTL can be tuned via env
+STORY_CACHE = StoryCache(
+    max_entries=int(os.getenv("STORY_CACHE_MAX_ENTRIES", "256")),
+    ttl_s=float(os.getenv("STORY_CACHE_TTL_S", str(6 * 3600))),
+)
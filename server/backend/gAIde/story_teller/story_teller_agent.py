@@ -4,6 +4,7 @@ from textwrap import dedent
 from google.adk.agents import Agent
 
 from .agent_tooling import research_attraction
+from .info_image_agent.genai_client import agent_model
 
 def build_instruction(locale: str = "en-US") -> str:
     return dedent(f"""
@@ -26,7 +27,7 @@ def build_instruction(locale: str = "en-US") -> str:
 def make_orchestrator(locale: str = "en-US") -> Agent:
     return Agent(
         name="orchestrator_storyteller",
-        model="gemini-2.5-flash",
+        model=agent_model("gemini-2.5-flash"),
         instruction=build_instruction(locale),
         description="Orchestrates research (via tool) and writes a short on-site story.",
         tools=[research_attraction],
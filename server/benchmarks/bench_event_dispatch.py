@@ -0,0 +1,186 @@
+"""
+Per-event cost of the live response loop: old `str(event)` dispatch vs dispatch_event.
+
+Replays an event stream through both paths with the client writer stubbed
+out, so only dispatch is measured. By default a synthetic stream shaped like
+a real session is generated (user transcription partials, 24 kHz audio
+chunks, output transcription partials, turn_complete). A recorded stream can
+be replayed instead: one `Event.model_dump_json()` per line.
+
+    python -m benchmarks.bench_event_dispatch --turns 50
+    python -m benchmarks.bench_event_dispatch --events session.jsonl
+"""
+
+import argparse
+import random
+import statistics
+import time
+import tracemalloc
+from typing import List
+
+from google.adk.events import Event
+from google.genai import types
+
+from live_events import LiveEventHandler, dispatch_event
+
+
+def synth_stream(turns: int, audio_chunk_bytes: int, seed: int = 0) -> List[Event]:
+    rnd = random.Random(seed)
+    words = "tell me about this old cathedral and when it was built please".split()
+    events: List[Event] = []
+    for turn in range(turns):
+        for i in range(rnd.randint(4, 10)):
+            text = " ".join(rnd.choice(words) for _ in range(rnd.randint(1, 3)))
+            events.append(Event(author="user", partial=True, content=types.Content(role="user", parts=[types.Part(text=text)])))
+        for i in range(rnd.randint(40, 120)):
+            pcm = rnd.randbytes(audio_chunk_bytes)
+            events.append(
+                Event(
+                    author="guide",
+                    partial=True,
+                    content=types.Content(
+                        role="model",
+                        parts=[types.Part(inline_data=types.Blob(data=pcm, mime_type="audio/pcm;rate=24000"))],
+                    ),
+                )
+            )
+            if i % 6 == 0:
+                text = " ".join(rnd.choice(words) for _ in range(rnd.randint(2, 5)))
+                events.append(Event(author="guide", partial=True, content=types.Content(role="model", parts=[types.Part(text=text)])))
+        events.append(Event(author="guide", content=types.Content(role="model", parts=[types.Part(text="final transcript")])))
+        events.append(Event(author="guide", turn_complete=True))
+        if turn % 5 == 0:
+            events.append(
+                Event(
+                    author="guide",
+                    live_session_resumption_update=types.LiveServerSessionResumptionUpdate(
+                        new_handle=f"handle-{turn}", resumable=True
+                    ),
+                )
+            )
+    return events
+
+
+def load_stream(path: str) -> List[Event]:
+    with open(path, encoding="utf-8") as f:
+        return [Event.model_validate_json(line) for line in f if line.strip()]
+
+
+class _NullWriter:
+    def send_control(self, message, ordered=False):
+        pass
+
+    def send_audio(self, pcm):
+        pass
+
+    def send_text(self, text):
+        pass
+
+    def flush_audio(self):
+        pass
+
+
+def old_dispatch(events: List[Event], writer: _NullWriter) -> None:
+    """The pre-dispatcher loop body from receive_and_process_responses, verbatim in shape."""
+    input_texts, output_texts, interrupted = [], [], False
+    for event in events:
+        event_str = str(event)
+
+        if hasattr(event, "session_resumption_update") and event.session_resumption_update:
+            update = event.session_resumption_update
+            if update.resumable and update.new_handle:
+                writer.send_control({"type": "session_id", "data": update.new_handle})
+
+        if event.content and event.content.parts:
+            for part in event.content.parts:
+                if hasattr(part, "inline_data") and part.inline_data:
+                    writer.send_audio(part.inline_data.data)
+                if hasattr(part, "text") and part.text:
+                    if hasattr(event.content, "role") and event.content.role == "user":
+                        input_texts.append(part.text)
+                    else:
+                        if "partial=True" in event_str:
+                            writer.send_text(part.text)
+                            output_texts.append(part.text)
+
+        if event.interrupted and not interrupted:
+            interrupted = True
+        if event.turn_complete:
+            input_texts, output_texts, interrupted = [], [], False
+
+
+class _BenchHandler(LiveEventHandler):
+    def __init__(self, writer: _NullWriter):
+        self.writer = writer
+        self.input_texts, self.output_texts, self.interrupted = [], [], False
+
+    def on_session_handle(self, handle):
+        self.writer.send_control({"type": "session_id", "data": handle})
+
+    def on_model_audio(self, pcm):
+        self.writer.send_audio(pcm)
+
+    def on_user_text(self, text, partial):
+        self.input_texts.append(text)
+
+    def on_model_text(self, text, partial):
+        if partial:
+            self.writer.send_text(text)
+            self.output_texts.append(text)
+
+    def on_interrupted(self):
+        self.interrupted = True
+
+    def on_turn_complete(self):
+        self.input_texts, self.output_texts, self.interrupted = [], [], False
+
+
+def new_dispatch(events: List[Event], writer: _NullWriter) -> None:
+    handler = _BenchHandler(writer)
+    for event in events:
+        dispatch_event(event, handler)
+
+
+def _time(fn, events, repeat: int) -> float:
+    """Median seconds per replay of the whole stream."""
+    writer = _NullWriter()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(events, writer)
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples)
+
+
+def _allocated(fn, events) -> int:
+    """Bytes allocated at peak while replaying the stream once."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    fn(events, _NullWriter())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak - base
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", help="JSONL of recorded ADK events to replay")
+    parser.add_argument("--turns", type=int, default=30, help="synthetic turns")
+    parser.add_argument("--chunk", type=int, default=3840, help="synthetic audio chunk bytes (80 ms at 24 kHz)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    events = load_stream(args.events) if args.events else synth_stream(args.turns, args.chunk)
+    print(f"{len(events)} events")
+    print(f"{'dispatch':<10}{'us/event':>10}{'events/s':>12}{'peak alloc KB':>15}")
+    results = {}
+    for name, fn in (("old", old_dispatch), ("new", new_dispatch)):
+        per_event = _time(fn, events, args.repeat) / len(events)
+        results[name] = per_event
+        print(f"{name:<10}{per_event * 1e6:>10.2f}{1 / per_event:>12.0f}{_allocated(fn, events) / 1024:>15.1f}")
+    print(f"speedup: {results['old'] / results['new']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
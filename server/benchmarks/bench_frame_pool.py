@@ -0,0 +1,81 @@
+"""
+Bytes saved and latency added per frame by the downscale/re-encode pool.
+
+Synthesises camera-like JPEGs at common phone resolutions and pushes them
+through FramePool (process workers) and, for comparison, inline.
+
+    python -m benchmarks.bench_frame_pool -n 40 --max-side 768
+"""
+
+import argparse
+import asyncio
+import io
+import random
+import statistics
+import time
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from frame_pool import FramePool, prepare_frame
+
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080), (4032, 3024)]
+
+
+def synth_jpeg(width: int, height: int, seed: int, quality: int = 85) -> bytes:
+    """Noisy gradient + shapes: compresses roughly like a real street scene."""
+    rnd = random.Random(seed)
+    img = Image.effect_noise((width, height), 40).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x0, y0 = rnd.randrange(width), rnd.randrange(height)
+        x1, y1 = x0 + rnd.randrange(width // 4 + 1), y0 + rnd.randrange(height // 4 + 1)
+        draw.rectangle([x0, y0, x1, y1], fill=tuple(rnd.randrange(256) for _ in range(3)))
+    img = img.filter(ImageFilter.GaussianBlur(1))
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=quality)
+    return out.getvalue()
+
+
+async def run(args) -> None:
+    pool = FramePool(workers=args.workers, max_side=args.max_side, quality=args.quality)
+    pool.start()
+    try:
+        await pool.prepare(synth_jpeg(64, 64, 0))  # spin up workers
+
+        print(f"{'resolution':<12}{'in KB':>9}{'out KB':>9}{'saved':>8}{'pool ms':>10}{'inline ms':>11}")
+        for w, h in RESOLUTIONS:
+            frames = [synth_jpeg(w, h, i) for i in range(args.n)]
+            pool_ms, inline_ms, sizes_out = [], [], []
+            for f in frames:
+                t0 = time.perf_counter()
+                prepared = await pool.prepare(f)
+                pool_ms.append((time.perf_counter() - t0) * 1000)
+                sizes_out.append(len(prepared.data))
+
+                t0 = time.perf_counter()
+                prepare_frame(f, args.max_side, args.quality)
+                inline_ms.append((time.perf_counter() - t0) * 1000)
+
+            size_in = statistics.mean(len(f) for f in frames)
+            size_out = statistics.mean(sizes_out)
+            print(
+                f"{f'{w}x{h}':<12}{size_in / 1024:>9.1f}{size_out / 1024:>9.1f}"
+                f"{1 - size_out / size_in:>8.0%}{statistics.median(pool_ms):>10.2f}"
+                f"{statistics.median(inline_ms):>11.2f}"
+            )
+        print("pool stats:", pool.stats())
+    finally:
+        pool.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", type=int, default=20, help="frames per resolution")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-side", type=int, default=768)
+    parser.add_argument("--quality", type=int, default=80)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Per-call overhead of building a genai.Client vs reusing the shared one.
+
+Offline (default): times client construction only — what every
+recognize_showplace* call used to pay before doing any work.
+
+    python -m benchmarks.bench_genai_client -n 50
+
+With --live (needs GOOGLE_API_KEY, costs quota): also times a tiny
+generate_content round-trip on a fresh client vs the shared client, which
+adds the TCP/TLS setup the shared pool avoids.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from typing import Callable, List
+
+from backend.gAIde.story_teller.info_image_agent.genai_client import (
+    close_genai_client,
+    get_genai_client,
+)
+
+
+def _time(fn: Callable[[], object], n: int) -> List[float]:
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000)
+    return out
+
+
+def _report(label: str, ms: List[float]) -> None:
+    ms = sorted(ms)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"{label:<28} mean {statistics.mean(ms):8.3f} ms   p50 {ms[len(ms) // 2]:8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", type=int, default=50, help="iterations per variant")
+    parser.add_argument("--live", action="store_true", help="also time real generate_content calls")
+    parser.add_argument("--model", default="gemini-2.0-flash")
+    args = parser.parse_args()
+
+    os.environ.setdefault("GOOGLE_API_KEY", "bench-offline-key")
+    from google import genai
+
+    api_key = os.environ["GOOGLE_API_KEY"]
+    get_genai_client()  # warm the shared client
+
+    fresh = _time(lambda: genai.Client(api_key=api_key), args.n)
+    shared = _time(get_genai_client, args.n)
+    _report("construct: fresh client", fresh)
+    _report("construct: shared client", shared)
+
+    if args.live:
+        def call(client):
+            client.models.generate_content(model=args.model, contents="Reply with OK.")
+
+        fresh_live = _time(lambda: call(genai.Client(api_key=api_key)), args.n)
+        shared_live = _time(lambda: call(get_genai_client()), args.n)
+        _report("generate: fresh client", fresh_live)
+        _report("generate: shared client", shared_live)
+        print(f"saved per call: {statistics.mean(fresh_live) - statistics.mean(shared_live):.1f} ms")
+    else:
+        print(f"saved per call: {statistics.mean(fresh) - statistics.mean(shared):.3f} ms (construction only)")
+
+    close_genai_client()
+
+
+if __name__ == "__main__":
+    main()
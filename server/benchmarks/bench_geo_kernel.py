@@ -0,0 +1,115 @@
+"""
+Scalar vs NumPy crossover for the distance/bearing kernel (info_image_agent/geo.py).
+
+For each candidate-set size N, times rank_by_distance (radius filter + sort)
+and bearings_deg on both paths, and reports the smallest N from which NumPy
+is faster on every larger size measured. That N is what GEO_VECTOR_MIN should
+be on this machine:
+
+    python -m benchmarks.bench_geo_kernel
+    python -m benchmarks.bench_geo_kernel --sizes 8,16,32,64,128,256 --json
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.gAIde.story_teller.info_image_agent import geo
+
+ORIGIN = (48.179169, 11.555972)
+
+
+def candidates(n: int, spread_m: float, seed: int = 0):
+    """n points uniformly in a disc of spread_m around ORIGIN."""
+    rnd = random.Random(seed)
+    lat0, lon0 = ORIGIN
+    lats, lons = [], []
+    for _ in range(n):
+        d = spread_m * math.sqrt(rnd.random())
+        theta = rnd.uniform(0, 2 * math.pi)
+        lats.append(lat0 + d * math.cos(theta) / 111_320)
+        lons.append(lon0 + d * math.sin(theta) / (111_320 * math.cos(math.radians(lat0))))
+    return lats, lons
+
+
+def best_ns(fn: Callable[[], Any], repeat: int, min_time: float) -> float:
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - t0 >= min_time:
+            break
+        loops *= 2
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / loops * 1e9)
+    return best
+
+
+def crossover(rows: List[Dict[str, Any]], key: str) -> Optional[int]:
+    """Smallest size from which the NumPy path wins at every larger size."""
+    found = None
+    for row in reversed(rows):
+        if row[key]["numpy_ns"] >= row[key]["scalar_ns"]:
+            break
+        found = row["n"]
+    return found
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1,4,8,16,32,64,128,256,512,1024,4096,16384")
+    parser.add_argument("--radius-m", type=float, default=150.0, help="rank_by_distance radius")
+    parser.add_argument("--spread-m", type=float, default=600.0, help="candidates are spread over this radius")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.02, help="seconds per timed batch")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    if geo.np is None:
+        print("numpy is not installed: only the scalar path is available", file=sys.stderr)
+        return 1
+
+    lat, lon = ORIGIN
+    rows: List[Dict[str, Any]] = []
+    for n in (int(s) for s in args.sizes.split(",")):
+        lats, lons = candidates(n, args.spread_m)
+        row: Dict[str, Any] = {"n": n}
+        for key, call in (
+            ("rank", lambda v: geo.rank_by_distance(lat, lon, lats, lons, radius_m=args.radius_m, vectorized=v)),
+            ("bearing", lambda v: geo.bearings_deg(lat, lon, lats, lons, vectorized=v)),
+        ):
+            scalar = best_ns(lambda: call(False), args.repeat, args.min_time)
+            vector = best_ns(lambda: call(True), args.repeat, args.min_time)
+            row[key] = {"scalar_ns": round(scalar, 1), "numpy_ns": round(vector, 1)}
+        rows.append(row)
+
+    result = {
+        "vector_min": geo.VECTOR_MIN,
+        "crossover": {key: crossover(rows, key) for key in ("rank", "bearing")},
+        "rows": rows,
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+
+    print(f"{'n':>7}{'rank scalar':>14}{'rank numpy':>13}{'speedup':>9}{'bearing scalar':>17}{'bearing numpy':>15}{'speedup':>9}")
+    for row in rows:
+        r, b = row["rank"], row["bearing"]
+        print(f"{row['n']:>7}{r['scalar_ns'] / 1e3:>11.1f} us{r['numpy_ns'] / 1e3:>10.1f} us{r['scalar_ns'] / r['numpy_ns']:>8.2f}x"
+              f"{b['scalar_ns'] / 1e3:>14.1f} us{b['numpy_ns'] / 1e3:>12.1f} us{b['scalar_ns'] / b['numpy_ns']:>8.2f}x")
+    print(f"crossover: rank n>={result['crossover']['rank']}, bearing n>={result['crossover']['bearing']} "
+          f"(GEO_VECTOR_MIN={geo.VECTOR_MIN})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
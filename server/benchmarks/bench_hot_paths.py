@@ -0,0 +1,263 @@
+"""
+Microbenchmarks for per-message and per-call helpers, with baseline comparison.
+
+Each case is timed in calibrated batches (at least --min-time per batch,
+--repeat batches) and reports median and min ns/call. Results are JSON, so
+runs can be kept and compared across versions:
+
+    python -m benchmarks.bench_hot_paths --out bench/hot_paths-$(git rev-parse --short HEAD).json
+    python -m benchmarks.bench_hot_paths --baseline bench/hot_paths-abc123.json
+    python -m benchmarks.bench_hot_paths --filter 'b64|ws_'
+
+With --baseline, cases whose min ns/call (the least noisy estimate on a
+shared box) is slower than the baseline's by more than --threshold are
+flagged and the exit status is 1, so the suite can gate CI. Only compare
+runs from the same machine and Python.
+"""
+
+import argparse
+import base64
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import framing
+from backend.gAIde.story_teller.config import PLACE, USER_PROFILE
+from backend.gAIde.story_teller.generate_story_func import _strip_code_fences
+from backend.gAIde.story_teller.info_image_agent.agent import _haversine_m, _load_nearby_places
+from backend.gAIde.story_teller.research_agent import build_instruction
+from backend.gAIde.story_teller.research_function import _parse_loose_json
+from backend.gAIde.story_teller.story_teller_agent import build_instruction as build_story_instruction
+from common import RECEIVE_SAMPLE_RATE, SEND_SAMPLE_RATE
+from multimodal_server_adk import MultimodalADKServer, decode_client_message
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLACES_FIXTURE = os.path.join(SERVER_DIR, "backend", "location_list.json")
+JPEG_FIXTURE = os.path.join(SERVER_DIR, "backend", "alte_pinakothek.jpg")
+
+Case = Tuple[str, Callable[[], Any]]
+
+
+# ---------------------------------------------------------------------------
+# Payloads
+# ---------------------------------------------------------------------------
+
+def _mic_chunk(ms: int = 20) -> bytes:
+    return os.urandom(SEND_SAMPLE_RATE * 2 * ms // 1000)
+
+
+def _model_chunk(ms: int = 40) -> bytes:
+    return os.urandom(RECEIVE_SAMPLE_RATE * 2 * ms // 1000)
+
+
+def _camera_frame() -> bytes:
+    """640x480 JPEG of the fixture photo (what the app sends), or the file itself without Pillow."""
+    with open(JPEG_FIXTURE, "rb") as f:
+        data = f.read()
+    try:
+        import io
+
+        from PIL import Image
+    except Exception:
+        return data
+    img = Image.open(io.BytesIO(data)).convert("RGB").resize((640, 480))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=80)
+    return buf.getvalue()
+
+
+def _places_payload(n: int) -> Dict[str, Any]:
+    with open(PLACES_FIXTURE, encoding="utf-8") as f:
+        base = json.load(f)["find_places_nearby_response"]["result"]
+    result = [dict(base[i % len(base)], name=f"{base[i % len(base)]['name']} {i}") for i in range(n)]
+    return {"find_places_nearby_response": {"result": result}}
+
+
+def _facts_text() -> str:
+    facts = {
+        "attraction": {"name": PLACE["name"], "address": PLACE["address"],
+                       "coordinates": {"lat": PLACE["latitude"], "lng": PLACE["longitude"]}},
+        "essentials": {"hours_today": "09:00-18:00", "last_entry_time": "17:30", "closing_soon_minutes": None,
+                       "tickets": {"is_free": True, "price_range_eur": None}},
+        "highlights": [{"title": f"Highlight {i}", "why_it_matters": "x" * 80, "estimated_minutes": 10} for i in range(6)],
+        "context_snippets": ["y" * 120 for _ in range(5)],
+        "interest_panels": [{"type": "history", "overview": "z" * 150,
+                             "micro_timeline": [{"year": str(1900 + i), "event": "e" * 40} for i in range(3)]}],
+    }
+    return "```json\n" + json.dumps(facts, ensure_ascii=False, indent=2) + "\n```"
+
+
+def _story_text() -> str:
+    return "```text\n===== STORY_SCRIPT =====\n" + ("You are standing in front of BMW Welt. " * 40) + "\n```"
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+
+def cases() -> List[Case]:
+    mic = _mic_chunk()
+    model = _model_chunk()
+    frame = _camera_frame()
+    mic_b64 = base64.b64encode(mic).decode("ascii")
+    frame_b64 = base64.b64encode(frame).decode("ascii")
+    places_small = _places_payload(12)
+    places_large = _places_payload(1000)
+    facts = _facts_text()
+    story = _story_text()
+    allow = MultimodalADKServer._allow_from_user_text
+
+    audio_msg = json.dumps({"type": "audio", "data": mic_b64})
+    video_msg = json.dumps({"type": "video", "data": frame_b64, "mode": "webcam"})
+    text_msg = json.dumps({"type": "text", "data": "Please describe this place"})
+    audio_frame = framing.encode_frame(framing.KIND_AUDIO, mic)
+    video_frame = framing.encode_frame(framing.KIND_VIDEO, frame)
+
+    return [
+        ("haversine_m", lambda: _haversine_m(48.179169, 11.555972, 48.1771981, 11.5562963)),
+        ("load_nearby_places[12]", lambda: _load_nearby_places(places_small)),
+        ("load_nearby_places[1000]", lambda: _load_nearby_places(places_large)),
+        ("load_nearby_places[1000 origin]", lambda: _load_nearby_places(places_large, origin=(48.179169, 11.555972))),
+        ("parse_loose_json[facts]", lambda: _parse_loose_json(facts)),
+        ("strip_code_fences[story]", lambda: _strip_code_fences(story)),
+        ("allow_from_user_text[hit]", lambda: allow("Could you describe this place for me?")),
+        ("allow_from_user_text[miss]", lambda: allow("Where is the nearest cafe with good coffee and cake?")),
+        ("build_instruction[research]", lambda: build_instruction(PLACE, USER_PROFILE)),
+        ("build_instruction[story]", lambda: build_story_instruction(USER_PROFILE["locale"])),
+        ("b64decode[mic 20ms]", lambda: base64.b64decode(mic_b64)),
+        ("b64encode[model 40ms]", lambda: base64.b64encode(model).decode("utf-8")),
+        ("b64decode[jpeg 640x480]", lambda: base64.b64decode(frame_b64)),
+        ("b64encode[jpeg 640x480]", lambda: base64.b64encode(frame).decode("ascii")),
+        ("ws_json[audio]", lambda: decode_client_message(audio_msg)),
+        ("ws_json[video]", lambda: decode_client_message(video_msg)),
+        ("ws_json[text]", lambda: decode_client_message(text_msg)),
+        ("ws_binary[audio]", lambda: decode_client_message(audio_frame)),
+        ("ws_binary[video]", lambda: decode_client_message(video_frame)),
+        ("ws_out_json[model audio]", lambda: json.dumps({"type": "audio", "data": base64.b64encode(model).decode("utf-8")})),
+        ("ws_out_binary[model audio]", lambda: framing.encode_frame(framing.KIND_AUDIO, model)),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Timing
+# ---------------------------------------------------------------------------
+
+def _calibrate(fn: Callable[[], Any], min_time: float) -> int:
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - t0 >= min_time:
+            return loops
+        loops *= 2
+
+
+def measure(fn: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    loops = _calibrate(fn, min_time)
+    per_call = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        per_call.append((time.perf_counter() - t0) / loops * 1e9)
+    return {
+        "median_ns": round(statistics.median(per_call), 1),
+        "min_ns": round(min(per_call), 1),
+        "stdev_ns": round(statistics.stdev(per_call), 1) if len(per_call) > 1 else 0.0,
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Per-case ratio vs baseline; `regression` when slower by more than `threshold`."""
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            rows.append({"name": name, "ratio": None, "regression": False})
+            continue
+        ratio = result["min_ns"] / base["min_ns"] if base["min_ns"] else float("inf")
+        rows.append({"name": name, "ratio": round(ratio, 3), "base_ns": base["min_ns"],
+                     "regression": ratio > 1 + threshold})
+    return rows
+
+
+def _fmt_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} us"
+    return f"{ns:.0f} ns"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", help="regex on case names")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per timed batch")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    pattern = re.compile(args.filter) if args.filter else None
+    selected = [(name, fn) for name, fn in cases() if pattern is None or pattern.search(name)]
+
+    run: Dict[str, Any] = {
+        "suite": "hot_paths",
+        "git_rev": _git_rev(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": {},
+    }
+    for name, fn in selected:
+        run["results"][name] = measure(fn, args.repeat, args.min_time)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    rows = {r["name"]: r for r in compare(run, baseline, args.threshold)} if baseline else {}
+
+    print(f"{'case':<30}{'median':>12}{'min':>12}{'stdev %':>9}" + (f"{'base min':>12}{'ratio':>8}" if baseline else ""))
+    for name, r in run["results"].items():
+        line = f"{name:<30}{_fmt_ns(r['median_ns']):>12}{_fmt_ns(r['min_ns']):>12}{100 * r['stdev_ns'] / r['median_ns']:>8.1f}%"
+        if baseline:
+            row = rows[name]
+            if row["ratio"] is None:
+                line += f"{'-':>12}{'new':>8}"
+            else:
+                line += f"{_fmt_ns(row['base_ns']):>12}{row['ratio']:>7.2f}x" + ("  REGRESSION" if row["regression"] else "")
+        print(line)
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+
+    regressions = [r["name"] for r in rows.values() if r["regression"]]
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
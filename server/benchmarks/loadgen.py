@@ -0,0 +1,542 @@
+"""
+Synthetic multi-client load for the WebSocket server.
+
+Opens N clients (ramped up over --ramp-s) that behave like tourists with the
+app open: each streams 16 kHz PCM16 mic audio in realtime chunks and JPEG
+camera frames at --video-fps, and every --turn-interval-s (exponentially
+jittered) issues one request drawn from --mix:
+
+  text        {"type": "text", ...}        a question typed into the app
+  speak_text  {"type": "speak_text", ...}  narrate text verbatim (as speak_via_live_api in backend/run_test.py)
+  describe    "describe this place"        goes through describe_place on the latest frame
+
+A client has at most one request in flight and waits for its turn_complete,
+so latencies are unambiguous. Reported as percentiles over all clients:
+
+  ttfa     request sent -> first model audio chunk
+  turn     request sent -> turn_complete
+  drops    server-side drop counters (scraped from /metrics before/after),
+           turns that timed out, clients shed with "busy"
+
+    python -m benchmarks.loadgen --standin --clients 50 --duration-s 60
+    python -m benchmarks.loadgen --url ws://box:8765 --clients 200 --ramp-s 30 --json out.json
+
+--standin serves a small in-process stand-in for the live backend (fixed
+latency distribution, synthetic audio replies), so the tool runs offline.
+--offline-server instead starts the real server (multimodal_server_adk.py)
+in a subprocess with FAKE_BACKEND=all: Gemini Live, generate_content and
+Places are replaced by the stand-ins from fake_live.py / fakes.py (their
+FAKE_* latency and error knobs pass through from the environment), so
+describe requests run the full pipeline.
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import math
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import websockets
+from websockets.exceptions import ConnectionClosed
+
+import framing
+from common import RECEIVE_SAMPLE_RATE, SEND_SAMPLE_RATE, BaseWebSocketServer, logger
+from outbound import ClientWriter
+
+DEFAULT_JPEG = os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend", "alte_pinakothek.jpg")
+
+PROMPTS = {
+    "text": [
+        "What is the best time to visit this museum?",
+        "Is there a cafe nearby?",
+        "How old is this building?",
+    ],
+    "speak_text": [
+        "The Alte Pinakothek is one of the oldest galleries in the world and houses a famous collection of Old Master paintings.",
+    ],
+    "describe": ["Please describe this place.", "What am I looking at?"],
+}
+
+
+# ---------------------------------------------------------------------------
+# Synthetic media
+# ---------------------------------------------------------------------------
+
+def synth_pcm(chunk_ms: int, seed: int, voiced_ratio: float = 0.3, chunks: int = 500) -> List[bytes]:
+    """
+    Looping mic track: quiet room noise with voiced bursts (harmonic tone,
+    syllable-rate envelope) so server-side VAD sees both speech and silence.
+    """
+    rnd = random.Random(seed)
+    n = SEND_SAMPLE_RATE * chunk_ms // 1000
+    out = []
+    voiced_left = 0
+    f0 = 140.0
+    phase = 0.0
+    for _ in range(chunks):
+        if voiced_left == 0 and rnd.random() < voiced_ratio / 25:
+            voiced_left = rnd.randint(25, 100)  # 0.5 - 2 s at 20 ms
+            f0 = rnd.uniform(100, 220)
+        samples = bytearray()
+        for i in range(n):
+            s = rnd.gauss(0, 60)
+            if voiced_left:
+                t = phase + i / SEND_SAMPLE_RATE
+                env = 0.5 + 0.5 * math.sin(2 * math.pi * 4 * t)  # ~4 syllables/s
+                s += env * 6000 * (math.sin(2 * math.pi * f0 * t) + 0.5 * math.sin(4 * math.pi * f0 * t))
+            samples += int(max(-32768, min(32767, s))).to_bytes(2, "little", signed=True)
+        phase += n / SEND_SAMPLE_RATE
+        voiced_left = max(0, voiced_left - 1)
+        out.append(bytes(samples))
+    return out
+
+
+def load_jpeg(path: str, size: Optional[str]) -> bytes:
+    """Camera frame payload; re-encoded to WxH when Pillow is available."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not size:
+        return data
+    try:
+        from PIL import Image
+    except Exception:
+        return data
+    w, h = (int(x) for x in size.lower().split("x"))
+    img = Image.open(io.BytesIO(data)).convert("RGB").resize((w, h))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=80)
+    return buf.getvalue()
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        if kind not in PROMPTS:
+            raise argparse.ArgumentTypeError(f"unknown request kind {kind!r}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ClientStats:
+    connected: bool = False
+    shed: bool = False
+    error: Optional[str] = None
+    session_handles: int = 0
+    ttfa_s: Dict[str, List[float]] = field(default_factory=dict)
+    turn_s: Dict[str, List[float]] = field(default_factory=dict)
+    turns_sent: int = 0
+    turns_completed: int = 0
+    turns_timed_out: int = 0
+    turns_without_audio: int = 0
+    audio_chunks_sent: int = 0
+    video_frames_sent: int = 0
+    audio_bytes_received: int = 0
+    send_stall_s: float = 0.0  # time spent blocked in websocket.send (client-side backpressure)
+
+
+class LoadClient:
+    """One synthetic tourist. Protocol as in speak_via_live_api, plus media streaming."""
+
+    def __init__(self, index: int, args: argparse.Namespace, pcm: List[bytes], jpeg: bytes):
+        self.index = index
+        self.args = args
+        self.pcm = pcm
+        self.jpeg = jpeg
+        self.rnd = random.Random(args.seed * 100_003 + index)
+        self.stats = ClientStats()
+        self._turn_sent_at: Optional[float] = None
+        self._turn_kind = ""
+        self._turn_first_audio = False
+        self._turn_done = asyncio.Event()
+
+    async def _send(self, ws, message) -> None:
+        t0 = time.perf_counter()
+        await ws.send(message)
+        self.stats.send_stall_s += time.perf_counter() - t0
+
+    async def run(self, deadline: float) -> ClientStats:
+        try:
+            async with websockets.connect(self.args.url, max_size=None, open_timeout=30) as ws:
+                hello = json.loads(await ws.recv())
+                if hello.get("type") == "busy":
+                    self.stats.shed = True
+                    return self.stats
+                self.stats.connected = True
+                if self.args.binary and hello.get("binary") == framing.VERSION:
+                    await ws.send(json.dumps({"type": "hello", "binary": framing.VERSION}))
+                tasks = [asyncio.create_task(self._receive(ws))]
+                if not self.args.no_audio:
+                    tasks.append(asyncio.create_task(self._stream_audio(ws, deadline)))
+                if self.args.video_fps > 0:
+                    tasks.append(asyncio.create_task(self._stream_video(ws, deadline)))
+                try:
+                    await self._drive_turns(ws, deadline)
+                finally:
+                    for t in tasks:
+                        t.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionClosed as e:
+            if e.rcvd is not None and e.rcvd.code == 1013:
+                self.stats.shed = True
+            else:
+                self.stats.error = f"closed: {e}"
+        except Exception as e:
+            self.stats.error = repr(e)
+        return self.stats
+
+    async def _stream_audio(self, ws, deadline: float) -> None:
+        period = self.args.audio_chunk_ms / 1000
+        next_at = time.monotonic()
+        i = self.rnd.randrange(len(self.pcm))
+        while next_at < deadline:
+            chunk = self.pcm[i % len(self.pcm)]
+            i += 1
+            if self.args.binary:
+                await self._send(ws, framing.encode_frame(framing.KIND_AUDIO, chunk))
+            else:
+                await self._send(ws, json.dumps({"type": "audio", "data": base64.b64encode(chunk).decode("ascii")}))
+            self.stats.audio_chunks_sent += 1
+            next_at += period  # fixed cadence like a mic callback; no catch-up bursts beyond one chunk
+            await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+
+    async def _stream_video(self, ws, deadline: float) -> None:
+        period = 1 / self.args.video_fps
+        await asyncio.sleep(self.rnd.uniform(0, period))
+        while time.monotonic() < deadline:
+            if self.args.binary:
+                await self._send(ws, framing.encode_frame(framing.KIND_VIDEO, self.jpeg))
+            else:
+                payload = base64.b64encode(self.jpeg).decode("ascii")
+                await self._send(ws, json.dumps({"type": "video", "data": payload, "mode": "webcam"}))
+            self.stats.video_frames_sent += 1
+            await asyncio.sleep(period)
+
+    async def _drive_turns(self, ws, deadline: float) -> None:
+        kinds, weights = zip(*self.args.mix.items())
+        while True:
+            wait = self.rnd.expovariate(1 / self.args.turn_interval_s)
+            if time.monotonic() + wait >= deadline:
+                await asyncio.sleep(max(0.0, deadline - time.monotonic()))
+                return
+            await asyncio.sleep(wait)
+            kind = self.rnd.choices(kinds, weights)[0]
+            text = self.rnd.choice(PROMPTS[kind])
+            msg_type = "speak_text" if kind == "speak_text" else "text"
+
+            self._turn_done.clear()
+            self._turn_kind = kind
+            self._turn_first_audio = False
+            self._turn_sent_at = time.perf_counter()
+            await self._send(ws, json.dumps({"type": msg_type, "data": text}))
+            self.stats.turns_sent += 1
+            try:
+                await asyncio.wait_for(self._turn_done.wait(), self.args.turn_timeout_s)
+            except asyncio.TimeoutError:
+                self.stats.turns_timed_out += 1
+            self._turn_sent_at = None
+
+    def _on_audio(self, nbytes: int) -> None:
+        self.stats.audio_bytes_received += nbytes
+        if self._turn_sent_at is not None and not self._turn_first_audio:
+            self._turn_first_audio = True
+            self.stats.ttfa_s.setdefault(self._turn_kind, []).append(time.perf_counter() - self._turn_sent_at)
+
+    async def _receive(self, ws) -> None:
+        async for message in ws:
+            if isinstance(message, bytes):
+                _, _, payload = framing.decode_frame(message)
+                self._on_audio(len(payload))
+                continue
+            evt = json.loads(message)
+            kind = evt.get("type")
+            if kind == "audio":
+                self._on_audio(len(evt.get("data", "")) * 3 // 4)
+            elif kind == "session_id":
+                self.stats.session_handles += 1
+            elif kind == "turn_complete" and self._turn_sent_at is not None:
+                elapsed = time.perf_counter() - self._turn_sent_at
+                self.stats.turn_s.setdefault(self._turn_kind, []).append(elapsed)
+                self.stats.turns_completed += 1
+                if not self._turn_first_audio:
+                    self.stats.turns_without_audio += 1
+                self._turn_sent_at = None
+                self._turn_done.set()
+
+
+# ---------------------------------------------------------------------------
+# Offline stand-in backend
+# ---------------------------------------------------------------------------
+
+class StandInServer(BaseWebSocketServer):
+    """
+    Speaks the client protocol with a canned model: every text / speak_text
+    gets ~--standin-reply-s of 24 kHz audio after a lognormal first-audio
+    delay. Inbound media is decoded and discarded through the same bounded
+    drop-oldest queue policy as the real server.
+    """
+
+    def __init__(self, host: str, port: int, ttfa_median_s: float, reply_s: float, seed: int = 0):
+        super().__init__(host, port)
+        self.ttfa_median_s = ttfa_median_s
+        self.reply_s = reply_s
+        self.rnd = random.Random(seed)
+
+    async def process_audio(self, websocket, client_id):
+        self.active_clients[client_id] = websocket
+        writer = ClientWriter(websocket)
+        writer_task = asyncio.create_task(writer.run())
+        replies: set = set()
+        chunk = bytes(RECEIVE_SAMPLE_RATE * 2 // 25)  # 40 ms of silence
+
+        async def reply():
+            await asyncio.sleep(self.rnd.lognormvariate(math.log(self.ttfa_median_s), 0.35))
+            for _ in range(int(self.reply_s * 25)):
+                writer.send_audio(chunk)
+                await asyncio.sleep(0.01)  # model generates faster than realtime
+            writer.send_control({"type": "turn_complete"}, ordered=True)
+
+        try:
+            async for message in websocket:
+                if isinstance(message, bytes):
+                    framing.decode_frame(message)
+                    continue
+                data = json.loads(message)
+                if data.get("type") in ("audio", "video"):
+                    base64.b64decode(data.get("data", ""))
+                elif data.get("type") == "hello":
+                    writer.binary_audio = data.get("binary") == framing.VERSION
+                elif data.get("type") in ("text", "speak_text"):
+                    task = asyncio.create_task(reply())
+                    replies.add(task)
+                    task.add_done_callback(replies.discard)
+        finally:
+            for task in list(replies):
+                task.cancel()
+            writer.close()
+            await asyncio.gather(writer_task, return_exceptions=True)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# ---------------------------------------------------------------------------
+# Server-side counters
+# ---------------------------------------------------------------------------
+
+_SAMPLE_RE = re.compile(r'^(gaid_(?:ws_queue_dropped_total|outbound_dropped_total)(?:\{[^}]*\})?) (\S+)$', re.M)
+
+
+def scrape_drops(ws_url: str) -> Optional[Dict[str, float]]:
+    """Drop counters from the server's /metrics (None if the endpoint is unavailable)."""
+    parts = urlsplit(ws_url)
+    scheme = "https" if parts.scheme == "wss" else "http"
+    try:
+        with urllib.request.urlopen(f"{scheme}://{parts.netloc}/metrics", timeout=5) as r:
+            body = r.read().decode()
+    except Exception:
+        return None
+    return {name: float(value) for name, value in _SAMPLE_RE.findall(body)}
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {}
+    s = sorted(samples)
+
+    def q(p: float) -> float:
+        return round(s[min(len(s) - 1, int(p * len(s)))] * 1000, 1)
+
+    return {"n": len(s), "p50_ms": q(0.50), "p90_ms": q(0.90), "p99_ms": q(0.99), "max_ms": round(s[-1] * 1000, 1)}
+
+
+def summarize(stats: List[ClientStats], elapsed_s: float, drops: Optional[Dict[str, float]]) -> Dict[str, Any]:
+    def merged(attr: str) -> Dict[str, List[float]]:
+        out: Dict[str, List[float]] = {"all": []}
+        for st in stats:
+            for kind, xs in getattr(st, attr).items():
+                out.setdefault(kind, []).extend(xs)
+                out["all"].extend(xs)
+        return out
+
+    total = lambda attr: sum(getattr(st, attr) for st in stats)  # noqa: E731
+    turns_sent = total("turns_sent")
+    audio_sent = total("audio_chunks_sent")
+    report = {
+        "clients": len(stats),
+        "connected": sum(st.connected for st in stats),
+        "shed": sum(st.shed for st in stats),
+        "errors": sorted({st.error for st in stats if st.error}),
+        "elapsed_s": round(elapsed_s, 1),
+        "ttfa": {k: percentiles(v) for k, v in merged("ttfa_s").items()},
+        "turn": {k: percentiles(v) for k, v in merged("turn_s").items()},
+        "turns_sent": turns_sent,
+        "turns_completed": total("turns_completed"),
+        "turn_timeout_rate": round(total("turns_timed_out") / turns_sent, 4) if turns_sent else 0.0,
+        "turns_without_audio": total("turns_without_audio"),
+        "audio_chunks_sent": audio_sent,
+        "video_frames_sent": total("video_frames_sent"),
+        "audio_mb_received": round(total("audio_bytes_received") / 1e6, 2),
+        "client_send_stall_s": round(total("send_stall_s"), 2),
+    }
+    if drops is not None:
+        report["server_drops"] = drops
+        dropped_audio = drops.get('gaid_ws_queue_dropped_total{queue="audio"}', 0.0)
+        report["inbound_audio_drop_rate"] = round(dropped_audio / audio_sent, 4) if audio_sent else 0.0
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"clients {report['connected']}/{report['clients']} connected, {report['shed']} shed, "
+          f"{report['elapsed_s']} s")
+    for err in report["errors"][:5]:
+        print(f"  error: {err}")
+    print(f"{'metric':<22}{'n':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for metric in ("ttfa", "turn"):
+        for kind, p in sorted(report[metric].items()):
+            if p:
+                print(f"{metric + ' ' + kind:<22}{p['n']:>7}{p['p50_ms']:>10}{p['p90_ms']:>10}{p['p99_ms']:>10}{p['max_ms']:>10}")
+    print(f"turns {report['turns_completed']}/{report['turns_sent']} completed, "
+          f"timeout rate {report['turn_timeout_rate']:.2%}, {report['turns_without_audio']} without audio")
+    print(f"sent {report['audio_chunks_sent']} audio chunks, {report['video_frames_sent']} frames; "
+          f"received {report['audio_mb_received']} MB audio; client send stall {report['client_send_stall_s']} s")
+    if "server_drops" in report:
+        print(f"inbound audio drop rate {report['inbound_audio_drop_rate']:.2%}")
+        for name, value in sorted(report["server_drops"].items()):
+            print(f"  {name} +{value:g}")
+
+
+# ---------------------------------------------------------------------------
+
+async def _start_offline_server(port: int) -> subprocess.Popen:
+    server_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, FAKE_BACKEND=os.getenv("FAKE_BACKEND") or "all", PORT=str(port))
+    env.setdefault("GOOGLE_API_KEY", "offline")
+    proc = subprocess.Popen([sys.executable, "multimodal_server_adk.py"], cwd=server_dir, env=env)
+    url = f"http://127.0.0.1:{port}/healthz"
+    for _ in range(300):
+        if proc.poll() is not None:
+            raise RuntimeError(f"offline server exited with {proc.returncode}")
+        try:
+            await asyncio.to_thread(lambda: urllib.request.urlopen(url, timeout=1).read())
+            return proc
+        except Exception:
+            await asyncio.sleep(0.1)
+    await _stop_offline_server(proc)
+    raise RuntimeError("offline server did not come up")
+
+
+async def _stop_offline_server(proc: subprocess.Popen, timeout_s: float = 15.0) -> None:
+    """SIGTERM runs the server's on_shutdown (frame pool included); kill it if that hangs."""
+    proc.terminate()
+    try:
+        await asyncio.to_thread(proc.wait, timeout_s)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        await asyncio.to_thread(proc.wait)
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    server_task = None
+    server_proc = None
+    if args.offline_server:
+        port = _free_port()
+        server_proc = await _start_offline_server(port)
+        args.url = f"ws://127.0.0.1:{port}"
+    elif args.standin:
+        port = _free_port()
+        server = StandInServer("127.0.0.1", port, args.standin_ttfa_s, args.standin_reply_s, seed=args.seed)
+        server_task = asyncio.create_task(server.start())
+        args.url = f"ws://127.0.0.1:{port}"
+        await asyncio.sleep(0.5)
+
+    try:
+        pcm = synth_pcm(args.audio_chunk_ms, args.seed, voiced_ratio=args.voiced_ratio)
+        jpeg = load_jpeg(args.jpeg, args.jpeg_size)
+        logger.info(f"Load: {args.clients} clients -> {args.url}, {len(jpeg)} B frames at {args.video_fps} fps")
+
+        before = await asyncio.to_thread(scrape_drops, args.url)
+        t0 = time.monotonic()
+        deadline = t0 + args.ramp_s + args.duration_s
+        clients = [LoadClient(i, args, pcm, jpeg) for i in range(args.clients)]
+
+        async def start(client: LoadClient, delay: float) -> ClientStats:
+            await asyncio.sleep(delay)
+            return await client.run(deadline)
+
+        step = args.ramp_s / args.clients if args.clients else 0
+        stats = await asyncio.gather(*(start(c, i * step) for i, c in enumerate(clients)))
+        elapsed = time.monotonic() - t0
+
+        after = await asyncio.to_thread(scrape_drops, args.url)
+        drops = None
+        if before is not None and after is not None:
+            drops = {k: v - before.get(k, 0.0) for k, v in after.items() if v - before.get(k, 0.0)}
+    finally:
+        # Also when the clients raise: a leaked offline server keeps our stdout pipe open
+        if server_task is not None:
+            server_task.cancel()
+            await asyncio.gather(server_task, return_exceptions=True)
+        if server_proc is not None:
+            await _stop_offline_server(server_proc)
+    return summarize(stats, elapsed, drops)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="ws://localhost:8765")
+    parser.add_argument("--standin", action="store_true", help="serve an in-process stand-in backend and target it")
+    parser.add_argument("--offline-server", action="store_true",
+                        help="run multimodal_server_adk.py with FAKE_BACKEND=all in a subprocess and target it")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--ramp-s", type=float, default=5.0, help="spread client connects over this long")
+    parser.add_argument("--duration-s", type=float, default=30.0, help="steady-state duration after the ramp")
+    parser.add_argument("--audio-chunk-ms", type=int, default=20)
+    parser.add_argument("--no-audio", action="store_true")
+    parser.add_argument("--voiced-ratio", type=float, default=0.3, help="rough share of mic audio that is speech")
+    parser.add_argument("--video-fps", type=float, default=1.0)
+    parser.add_argument("--jpeg", default=DEFAULT_JPEG)
+    parser.add_argument("--jpeg-size", default="640x480", help="re-encode frames to WxH ('' keeps the file)")
+    parser.add_argument("--binary", action="store_true", help="binary media frames both ways")
+    parser.add_argument("--turn-interval-s", type=float, default=8.0, help="mean think time between requests")
+    parser.add_argument("--turn-timeout-s", type=float, default=60.0)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("text=5,speak_text=3,describe=2"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--standin-ttfa-s", type=float, default=0.6, help="stand-in median first-audio delay")
+    parser.add_argument("--standin-reply-s", type=float, default=3.0, help="stand-in audio per reply")
+    parser.add_argument("--json", help="also write the report here")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
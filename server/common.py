@@ -2,10 +2,16 @@ import asyncio
 import json
 import base64
 import logging
+import os
 import websockets
 import traceback
+from http import HTTPStatus
 from websockets.exceptions import ConnectionClosed
 
+import framing
+from admission import admission_from_env
+import metrics
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -20,6 +26,9 @@ VOICE_NAME = "Puck"
 RECEIVE_SAMPLE_RATE = 24000
 SEND_SAMPLE_RATE = 16000    
 
+# On shutdown, client handlers get this long to finish before they are cancelled
+SHUTDOWN_GRACE_S = float(os.getenv("SHUTDOWN_GRACE_S", "5"))
+
 def get_order_status(order_id):
     """Mock order status API that returns data for an order ID."""
     if order_id == "SH1005":
@@ -118,21 +127,83 @@ class BaseWebSocketServer:
         self.host = host
         self.port = port
         self.active_clients = {}  # Store client websockets
+        self._handlers = set()  # handle_client tasks, cancelled if they outlive shutdown
+        # Cap on concurrent live sessions (per process); LIVE_SESSIONS_MAX etc. override
+        self.admission = admission_from_env("live sessions", "LIVE_SESSIONS", max_active=50, queue_size=10)
 
-    async def start(self):
+    async def start(self, reuse_port=False):
+        """Serve until cancelled; reuse_port lets several worker processes share the port."""
         logger.info(f"Starting WebSocket server on {self.host}:{self.port}")
-        async with websockets.serve(self.handle_client, self.host, self.port):
-            await asyncio.Future()  # Run forever
+        await self.on_startup()
+        try:
+            async with websockets.serve(
+                self.handle_client,
+                self.host,
+                self.port,
+                reuse_port=reuse_port,
+                process_request=self.process_request,
+            ) as server:
+                try:
+                    await asyncio.Future()  # Run forever
+                finally:
+                    await self._close_clients(server)
+        finally:
+            await self.on_shutdown()
+
+    async def _close_clients(self, server):
+        """
+        Close every client connection. A handler still waiting on its upstream
+        stream after SHUTDOWN_GRACE_S is cancelled, so on_shutdown always runs.
+        """
+        server.close()
+        try:
+            await asyncio.wait_for(server.wait_closed(), SHUTDOWN_GRACE_S)
+        except asyncio.TimeoutError:
+            logger.warning(f"Cancelling {len(self._handlers)} client handlers still running after shutdown")
+            for task in list(self._handlers):
+                task.cancel()
+
+    def stats(self):
+        """Snapshot reported to the supervisor; subclasses extend it."""
+        return {"active_clients": len(self.active_clients), "admission": self.admission.stats()}
+
+    def process_request(self, connection, request):
+        """Plain HTTP on the WebSocket port: /metrics (Prometheus text) and /healthz."""
+        path = request.path.split("?", 1)[0]
+        if path == "/metrics":
+            return connection.respond(HTTPStatus.OK, metrics.render(self.stats()))
+        if path == "/healthz":
+            return connection.respond(HTTPStatus.OK, "ok\n")
+        return None  # continue with the WebSocket handshake
+
+    async def on_startup(self):
+        """Lifecycle hook: acquire process-wide resources before serving."""
+
+    async def on_shutdown(self):
+        """Lifecycle hook: release process-wide resources after serving."""
 
     async def handle_client(self, websocket):
         """Handle a new WebSocket client connection"""
         client_id = id(websocket)
         logger.info(f"New client connected: {client_id}")
 
-        # Send ready message to client
-        await websocket.send(json.dumps({"type": "ready"}))
-
+        # Over capacity: answer the handshake with busy + retry-after instead of ready
+        if not await self.admission.acquire():
+            retry_after = self.admission.retry_after_s
+            logger.warning(f"Shedding client {client_id}: {self.admission.stats()}")
+            try:
+                await websocket.send(json.dumps({"type": "busy", "retry_after": retry_after}))
+                await websocket.close(code=1013, reason="Try again later")
+            except ConnectionClosed:
+                pass
+            return
+
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
         try:
+            # Send ready message to client (advertises binary media framing)
+            await websocket.send(json.dumps({"type": "ready", "binary": framing.VERSION}))
+
             # Start the audio processing for this client
             await self.process_audio(websocket, client_id)
         except ConnectionClosed:
@@ -141,6 +212,8 @@ class BaseWebSocketServer:
             logger.error(f"Error handling client {client_id}: {e}")
             logger.error(traceback.format_exc())
         finally:
+            self._handlers.discard(handler)
+            self.admission.release()
             # Clean up if needed
             if client_id in self.active_clients:
                 del self.active_clients[client_id]
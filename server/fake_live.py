@@ -0,0 +1,187 @@
+"""
+Offline stand-in for `Runner.run_live` (FAKE_BACKEND=live).
+
+Same constructor and `run_live(session=, live_request_queue=, run_config=)`
+signature as the ADK runner, and the same Event shapes the server
+dispatches: input transcription (role "user"), partial output transcription
+and 24 kHz PCM audio (role "model"), interrupted, turn_complete and
+resumption handles.
+
+A user turn is either a text Content on the request queue, or speech on the
+audio blobs (RMS above a threshold, ended by FAKE_LIVE_END_OF_SPEECH_S of
+quiet). Replies are deterministic:
+  - speak_text narrates the given text
+  - describe requests (intent table) call the agent's describe_place tool,
+    as Gemini would, and narrate its result
+  - anything else gets a canned answer
+New user input during a reply interrupts it.
+
+  FAKE_LIVE_LATENCY=lognormal:0.6,0.3   user turn end -> first audio
+  FAKE_LIVE_ERROR_RATE=0.0              per turn: the upstream connection drops
+  FAKE_LIVE_SPEED=2.0                   audio generated this many times faster than realtime
+  FAKE_LIVE_MAX_REPLY_S=8               cap on reply audio length
+"""
+
+import array
+import asyncio
+import math
+import os
+import time
+from types import SimpleNamespace
+from typing import Any, AsyncGenerator, Optional
+
+from google.adk.events import Event
+from google.genai import types
+from websockets.exceptions import ConnectionClosedError
+
+from backend.gAIde.story_teller.info_image_agent.fakes import Upstream, stable_hash
+from common import RECEIVE_SAMPLE_RATE, SEND_SAMPLE_RATE
+from intent import DEFAULT_MATCHER, DESCRIBE_PLACE
+
+SPEAK_PREFIX = "Read the following verbatim and do not add anything else: "
+HEARD = (
+    "Hello, can you hear me?",
+    "What is there to see around here?",
+    "Is this place open today?",
+)
+ANSWERS = (
+    "Yes, I can hear you well. Point your camera at a building and ask me about it.",
+    "There are a few museums and a park within walking distance. Shall I describe what you are looking at?",
+    "Most sights around here are open until six in the evening.",
+)
+
+CHUNK_S = 0.04
+CHARS_PER_S = 15.0  # narration pace used to size reply audio
+SPEECH_RMS = 500.0  # PCM16 RMS that counts as voiced mic audio
+MIN_SPEECH_S = 0.3
+
+
+def _tone_chunk() -> bytes:
+    n = int(RECEIVE_SAMPLE_RATE * CHUNK_S)
+    samples = array.array("h", (int(3000 * math.sin(2 * math.pi * 220 * i / RECEIVE_SAMPLE_RATE)) for i in range(n)))
+    return samples.tobytes()
+
+
+def _rms(pcm: bytes) -> float:
+    samples = array.array("h")
+    samples.frombytes(pcm[: len(pcm) - len(pcm) % 2])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples[::4]) / len(samples[::4]))
+
+
+class FakeLiveRunner:
+    def __init__(self, *, app_name: str, agent: Any, session_service: Any, upstream: Optional[Upstream] = None):
+        self.app_name = app_name
+        self.agent = agent
+        self.session_service = session_service
+        self.upstream = upstream or Upstream("FAKE_LIVE", "lognormal:0.6,0.3")
+        self.speed = float(os.getenv("FAKE_LIVE_SPEED", "2.0"))
+        self.max_reply_s = float(os.getenv("FAKE_LIVE_MAX_REPLY_S", "8"))
+        self.end_of_speech_s = float(os.getenv("FAKE_LIVE_END_OF_SPEECH_S", "0.7"))
+        self._chunk = _tone_chunk()
+
+    def _tool(self, name: str):
+        for tool in getattr(self.agent, "tools", None) or []:
+            if getattr(tool, "__name__", None) == name:
+                return tool
+        return None
+
+    async def run_live(self, *, session: Any, live_request_queue: Any, run_config: Any = None) -> AsyncGenerator[Event, None]:
+        out: asyncio.Queue = asyncio.Queue()
+        author = getattr(self.agent, "name", "model")
+        resumable = getattr(run_config, "session_resumption", None) is not None
+        turns = 0
+        reply: Optional[asyncio.Task] = None
+
+        def emit(**fields: Any) -> None:
+            out.put_nowait(Event(author=author, **fields))
+
+        async def respond(heard: str) -> None:
+            nonlocal turns
+            turns += 1
+            delay, fail = self.upstream.draw()
+            if fail:
+                out.put_nowait(ConnectionClosedError(None, None))
+                return
+            t_end = time.monotonic() + delay
+
+            if heard.startswith(SPEAK_PREFIX):
+                text = heard[len(SPEAK_PREFIX):]
+            elif DEFAULT_MATCHER.matches(DESCRIBE_PLACE, heard) and self._tool("describe_place") is not None:
+                # The model calls the tool; the server reads the session id off the tool context
+                tool_context = SimpleNamespace(_invocation_context=SimpleNamespace(session=session))
+                try:
+                    text = str(await self._tool("describe_place")(tool_context))
+                except Exception as e:  # ADK hands tool errors back to the model
+                    text = f"Sorry, I could not describe this place: {e}"
+            else:
+                text = ANSWERS[stable_hash(session.id, heard) % len(ANSWERS)]
+            await asyncio.sleep(max(0.0, t_end - time.monotonic()))
+
+            words = text.split()
+            n_chunks = max(1, int(min(self.max_reply_s, len(text) / CHARS_PER_S) / CHUNK_S))
+            per_chunk = max(1, math.ceil(len(words) / n_chunks))
+            for i in range(n_chunks):
+                emit(partial=True, content=types.Content(
+                    role="model",
+                    parts=[types.Part(inline_data=types.Blob(data=self._chunk, mime_type=f"audio/pcm;rate={RECEIVE_SAMPLE_RATE}"))],
+                ))
+                fragment = " ".join(words[i * per_chunk:(i + 1) * per_chunk])
+                if fragment:
+                    emit(partial=True, content=types.Content(role="model", parts=[types.Part(text=fragment + " ")]))
+                await asyncio.sleep(CHUNK_S / self.speed)
+            emit(content=types.Content(role="model", parts=[types.Part(text=text)]))
+            emit(turn_complete=True)
+            if resumable:
+                emit(live_session_resumption_update=types.LiveServerSessionResumptionUpdate(
+                    new_handle=f"fake-{session.id}-{turns}", resumable=True,
+                ))
+
+        def user_turn(heard: str) -> None:
+            nonlocal reply
+            if reply is not None and not reply.done():
+                reply.cancel()
+                emit(interrupted=True)
+            emit(content=types.Content(role="user", parts=[types.Part(text=heard)]))
+            reply = asyncio.create_task(respond(heard))
+
+        async def read_requests() -> None:
+            speech_s = 0.0
+            last_voiced = 0.0
+            while True:
+                timeout = None
+                if speech_s >= MIN_SPEECH_S:
+                    timeout = max(0.0, last_voiced + self.end_of_speech_s - time.monotonic())
+                try:
+                    req = await asyncio.wait_for(live_request_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    # Quiet long enough after speech: end of the user's utterance
+                    user_turn(HEARD[stable_hash(session.id, turns) % len(HEARD)])
+                    speech_s = 0.0
+                    continue
+                if req.close:
+                    out.put_nowait(None)
+                    return
+                if req.content is not None:
+                    text = "".join(p.text or "" for p in req.content.parts or [])
+                    if text:
+                        user_turn(text)
+                elif req.blob is not None and (req.blob.mime_type or "").startswith("audio/") and req.blob.data:
+                    if _rms(req.blob.data) >= SPEECH_RMS:
+                        speech_s += len(req.blob.data) / 2 / SEND_SAMPLE_RATE
+                        last_voiced = time.monotonic()
+
+        reader = asyncio.create_task(read_requests())
+        try:
+            while True:
+                item = await out.get()
+                if item is None:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            reader.cancel()
+            if reply is not None:
+                reply.cancel()
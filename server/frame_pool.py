@@ -0,0 +1,116 @@
+"""
+Server-side JPEG downscale / re-encode ahead of the model.
+
+Phones send frames at whatever resolution their camera produces. Before a
+frame goes to the live model (and into the per-session ring), a process pool
+decodes it once, shrinks it to `max_side` pixels on the long edge,
+re-encodes it at `quality`, and computes the frame score/dHash from the same
+decode. Running in processes keeps the event loop and the GIL free.
+
+If Pillow is missing, frames pass through unchanged and are only analysed.
+"""
+
+import asyncio
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional
+
+from frames import FrameInfo, analyze_frame, analyze_image
+
+try:
+    from PIL import Image as _PILImage
+except Exception:
+    _PILImage = None  # type: ignore[assignment]
+
+# Gemini tiles images into 768x768 crops; larger frames only cost tokens
+DEFAULT_MAX_SIDE = int(os.getenv("FRAME_MAX_SIDE", "768"))
+DEFAULT_QUALITY = int(os.getenv("FRAME_JPEG_QUALITY", "80"))
+
+
+class PreparedFrame(NamedTuple):
+    data: bytes        # model-sized JPEG
+    info: FrameInfo    # score + dHash
+    resized: bool
+
+
+def prepare_frame(jpeg: bytes, max_side: int, quality: int) -> PreparedFrame:
+    """Worker entry point: downscale/re-encode + analyse from a single decode."""
+    if _PILImage is None:
+        return PreparedFrame(jpeg, analyze_frame(jpeg), False)
+    try:
+        with _PILImage.open(io.BytesIO(jpeg)) as img:
+            if max(img.size) <= max_side:
+                return PreparedFrame(jpeg, analyze_image(img), False)
+            # Let the JPEG decoder skip straight to a 1/2, 1/4 or 1/8 scale
+            img.draft("RGB", (max_side, max_side))
+            img = img.convert("RGB")
+        img.thumbnail((max_side, max_side))
+        out = io.BytesIO()
+        img.save(out, format="JPEG", quality=quality, optimize=False)
+        data = out.getvalue()
+        if len(data) >= len(jpeg):
+            data = jpeg
+        return PreparedFrame(data, analyze_image(img), data is not jpeg)
+    except Exception:
+        return PreparedFrame(jpeg, analyze_frame(jpeg), False)
+
+
+class FramePool:
+    """Process pool wrapper with per-frame byte/latency accounting."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_side: int = DEFAULT_MAX_SIDE,
+        quality: int = DEFAULT_QUALITY,
+    ):
+        self.workers = workers or int(os.getenv("FRAME_WORKERS", str(min(4, os.cpu_count() or 1))))
+        self.max_side = max_side
+        self.quality = quality
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        self.frames = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latency_s_total = 0.0
+
+    def start(self) -> None:
+        if self._executor is None and _PILImage is not None and self.workers > 0:
+            # spawn: the server process already runs threads (HTTP pools), fork is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def prepare(self, jpeg: bytes) -> PreparedFrame:
+        t0 = time.perf_counter()
+        if self._executor is not None:
+            loop = asyncio.get_running_loop()
+            prepared = await loop.run_in_executor(
+                self._executor, prepare_frame, jpeg, self.max_side, self.quality
+            )
+        else:
+            prepared = await asyncio.to_thread(prepare_frame, jpeg, self.max_side, self.quality)
+        self.frames += 1
+        self.bytes_in += len(jpeg)
+        self.bytes_out += len(prepared.data)
+        self.latency_s_total += time.perf_counter() - t0
+        return prepared
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers if self._executor is not None else 0,
+            "frames": self.frames,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_in - self.bytes_out,
+            "avg_latency_ms": round(1000 * self.latency_s_total / self.frames, 2) if self.frames else 0.0,
+        }
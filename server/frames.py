@@ -0,0 +1,180 @@
+"""
+Per-session camera frame buffering, cheap quality scoring and upstream gating.
+
+Every incoming JPEG is analysed once on arrival (sharpness + exposure score,
+perceptual hash) and kept in a small per-session ring. describe_place then
+picks the best-scoring frame inside the freshness window instead of whatever
+happened to arrive last, which is often motion-blurred.
+
+FrameGate decides which frames are worth forwarding to the live model:
+near-duplicates of the last forwarded frame are suppressed, and the
+forwarding rate drops while nobody is speaking.
+"""
+
+import hashlib
+import io
+import time
+from collections import deque
+from typing import Deque, NamedTuple, Optional
+
+# Pillow is optional: without it frames are scored by encoded size, which
+# still tracks detail (blurry/dark JPEGs compress much smaller), and only
+# byte-identical frames count as duplicates.
+try:
+    from PIL import Image as _PILImage, ImageFilter as _PILImageFilter, ImageStat as _PILImageStat
+except Exception:
+    _PILImage = None  # type: ignore[assignment]
+
+# Decode at most this many pixels per side for scoring
+_SCORE_SIZE = 160
+
+
+class Frame(NamedTuple):
+    data: bytes
+    ts: float
+    score: float
+
+
+class FrameInfo(NamedTuple):
+    score: float
+    dhash: int  # 64-bit difference hash for near-duplicate detection
+
+
+def analyze_frame(jpeg: bytes) -> FrameInfo:
+    """
+    Score and fingerprint a frame with a single thumbnail decode.
+
+    Score (higher is better): variance of an edge-filtered thumbnail, scaled
+    down when the frame is badly under/over-exposed.
+    """
+    if _PILImage is not None:
+        try:
+            with _PILImage.open(io.BytesIO(jpeg)) as img:
+                img.draft("L", (_SCORE_SIZE, _SCORE_SIZE))
+                return analyze_image(img)
+        except Exception:
+            pass
+    digest = hashlib.blake2b(jpeg, digest_size=8).digest()
+    return FrameInfo(float(len(jpeg)), int.from_bytes(digest, "big"))
+
+
+def analyze_image(img) -> FrameInfo:
+    """analyze_frame for an already decoded PIL image."""
+    gray = img.convert("L")
+    gray.thumbnail((_SCORE_SIZE, _SCORE_SIZE))
+    sharpness = _PILImageStat.Stat(gray.filter(_PILImageFilter.FIND_EDGES)).var[0]
+    mean = _PILImageStat.Stat(gray).mean[0]
+    exposure = 1.0 - abs(mean - 128.0) / 128.0  # 1 = mid-grey, 0 = black/white
+    return FrameInfo(sharpness * (0.25 + 0.75 * exposure), _dhash(gray))
+
+
+def _dhash(gray) -> int:
+    px = list(gray.resize((9, 8)).getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return bits
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class FrameRing:
+    """Bounded buffer of a session's most recent scored frames."""
+
+    def __init__(self, maxlen: int = 8):
+        self._frames: Deque[Frame] = deque(maxlen=maxlen)
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def push(self, data: bytes, score: float, ts: Optional[float] = None) -> None:
+        self._frames.append(Frame(data, time.time() if ts is None else ts, score))
+
+    def latest(self) -> Optional[Frame]:
+        return self._frames[-1] if self._frames else None
+
+    def best(self, max_age_s: float, now: Optional[float] = None) -> Optional[Frame]:
+        """Best-scoring frame no older than max_age_s (newest wins ties)."""
+        cutoff = (time.time() if now is None else now) - max_age_s
+        best: Optional[Frame] = None
+        for frame in self._frames:
+            if frame.ts >= cutoff and (best is None or frame.score >= best.score):
+                best = frame
+        return best
+
+
+class FrameGate:
+    """
+    Near-duplicate suppression + adaptive rate for frames sent to the live model.
+
+    A frame is forwarded when it differs from the last forwarded frame by more
+    than `diff_threshold` hash bits and the per-mode minimum interval has
+    passed. While there is no speech activity for `idle_after_s`, the interval
+    grows from `active_interval_s` to `idle_interval_s`. An unchanged scene is
+    still refreshed every `keepalive_s` so the model never loses the view.
+    """
+
+    def __init__(
+        self,
+        diff_threshold: int = 6,
+        active_interval_s: float = 0.5,
+        idle_interval_s: float = 4.0,
+        idle_after_s: float = 5.0,
+        keepalive_s: float = 15.0,
+    ):
+        self.diff_threshold = diff_threshold
+        self.active_interval_s = active_interval_s
+        self.idle_interval_s = idle_interval_s
+        self.idle_after_s = idle_after_s
+        self.keepalive_s = keepalive_s
+
+        self._last_hash: Optional[int] = None
+        self._last_forward_ts = float("-inf")
+        self._last_activity_ts = float("-inf")
+
+        self.forwarded = 0
+        self.suppressed_duplicate = 0
+        self.suppressed_rate = 0
+
+    def note_activity(self, now: Optional[float] = None) -> None:
+        """Call whenever the user or the model is speaking."""
+        self._last_activity_ts = time.monotonic() if now is None else now
+
+    def is_idle(self, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        return now - self._last_activity_ts > self.idle_after_s
+
+    def should_forward(self, dhash: int, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        since_last = now - self._last_forward_ts
+
+        if (
+            self._last_hash is not None
+            and hamming(dhash, self._last_hash) <= self.diff_threshold
+            and since_last < self.keepalive_s
+        ):
+            self.suppressed_duplicate += 1
+            return False
+
+        interval = self.idle_interval_s if self.is_idle(now) else self.active_interval_s
+        if since_last < interval:
+            self.suppressed_rate += 1
+            return False
+
+        self._last_hash = dhash
+        self._last_forward_ts = now
+        self.forwarded += 1
+        return True
+
+    def stats(self) -> dict:
+        suppressed = self.suppressed_duplicate + self.suppressed_rate
+        total = self.forwarded + suppressed
+        return {
+            "forwarded": self.forwarded,
+            "suppressed_duplicate": self.suppressed_duplicate,
+            "suppressed_rate": self.suppressed_rate,
+            "suppressed_ratio": round(suppressed / total, 3) if total else 0.0,
+        }
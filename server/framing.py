@@ -0,0 +1,68 @@
+"""
+Binary WebSocket framing for media payloads (audio + video).
+
+JSON stays the protocol for control and text messages. Media can instead be
+sent as binary WebSocket messages with a small fixed header followed by the
+raw payload (PCM16 audio or JPEG bytes), which avoids base64 and json.dumps
+on the hottest path.
+
+Frame layout (network byte order):
+
+    offset  size  field
+    0       1     magic    b"G"
+    1       1     version  VERSION
+    2       1     kind     KIND_AUDIO | KIND_VIDEO
+    3       1     flags    FLAG_SCREEN (video captured from screen share)
+    4       ...   payload
+
+Negotiation: the server advertises ``"binary": VERSION`` in its ``ready``
+message. Inbound binary frames are always accepted; the server only switches
+its *outbound* audio to binary after the client sends
+``{"type": "hello", "binary": VERSION}``. Old clients never send ``hello``
+and keep receiving JSON/base64.
+"""
+
+import struct
+from typing import Tuple
+
+MAGIC = b"G"
+VERSION = 1
+
+KIND_AUDIO = 0x01
+KIND_VIDEO = 0x02
+
+FLAG_SCREEN = 0x01
+
+HEADER = struct.Struct("!cBBB")
+
+
+class FrameError(ValueError):
+    """Raised when a binary message is not a valid media frame."""
+
+
+def encode_frame(kind: int, payload: bytes, flags: int = 0) -> bytes:
+    """Prefix a raw payload with the binary frame header."""
+    return HEADER.pack(MAGIC, VERSION, kind, flags) + payload
+
+
+def decode_frame(message: bytes) -> Tuple[int, int, bytes]:
+    """
+    Split a binary message into (kind, flags, payload).
+
+    The payload is returned as raw bytes, ready for ``types.Blob(data=...)``.
+    """
+    if len(message) < HEADER.size:
+        raise FrameError(f"frame too short ({len(message)} bytes)")
+    magic, version, kind, flags = HEADER.unpack_from(message)
+    if magic != MAGIC:
+        raise FrameError(f"bad magic {magic!r}")
+    if version != VERSION:
+        raise FrameError(f"unsupported frame version {version}")
+    if kind not in (KIND_AUDIO, KIND_VIDEO):
+        raise FrameError(f"unknown frame kind {kind}")
+    return kind, flags, message[HEADER.size:]
+
+
+def video_mode(flags: int) -> str:
+    """Map frame flags to the ``mode`` string used by JSON video messages."""
+    return "screen" if flags & FLAG_SCREEN else "webcam"
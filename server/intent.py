@@ -0,0 +1,98 @@
+"""
+Compiled, table-driven intent matching over streaming input transcriptions.
+
+Patterns live in a TSV table (intent, language, regex), so new phrasings or
+languages are a data change. All patterns of an intent are compiled into a
+single case-insensitive alternation once at load time.
+
+Input transcription arrives as small partial fragments while the user is
+still talking. IntentTracker accumulates a turn's fragments and re-scans only
+the tail of the transcript on each fragment, so a phrase split across
+fragments ("describe" + " this place") is still caught, and an intent is
+reported the moment its phrase completes rather than at the end of the turn.
+"""
+
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+DESCRIBE_PLACE = "describe_place"
+
+DEFAULT_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_patterns.tsv")
+
+
+def load_table(path: str) -> List[Tuple[str, str, str]]:
+    """Read (intent, language, pattern) rows; blank lines and '#' comments are skipped."""
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            cols = line.split("\t")
+            if len(cols) != 3:
+                raise ValueError(f"{path}:{lineno}: expected 3 tab-separated columns, got {len(cols)}")
+            rows.append((cols[0].strip(), cols[1].strip(), cols[2].strip()))
+    return rows
+
+
+class IntentMatcher:
+    """One compiled regex per intent, built from a pattern table."""
+
+    def __init__(self, rows: Iterable[Tuple[str, str, str]]):
+        by_intent: Dict[str, List[str]] = {}
+        self.languages: Dict[str, Set[str]] = {}
+        for intent, lang, pattern in rows:
+            re.compile(pattern)  # fail fast with the offending pattern
+            by_intent.setdefault(intent, []).append(f"(?:{pattern})")
+            self.languages.setdefault(intent, set()).add(lang)
+        self._compiled = {
+            intent: re.compile("|".join(patterns), re.IGNORECASE)
+            for intent, patterns in by_intent.items()
+        }
+
+    @classmethod
+    def from_table(cls, path: str = DEFAULT_TABLE) -> "IntentMatcher":
+        return cls(load_table(path))
+
+    @property
+    def intents(self) -> List[str]:
+        return list(self._compiled)
+
+    def match(self, text: str) -> Optional[str]:
+        """First intent (in table order) whose patterns occur in text."""
+        for intent, regex in self._compiled.items():
+            if regex.search(text):
+                return intent
+        return None
+
+    def matches(self, intent: str, text: str) -> bool:
+        regex = self._compiled.get(intent)
+        return regex is not None and regex.search(text) is not None
+
+
+class IntentTracker:
+    """Incremental intent detection over one turn of partial transcription fragments."""
+
+    def __init__(self, matcher: IntentMatcher, window_chars: int = 160):
+        self.matcher = matcher
+        self.window_chars = window_chars  # longer than any phrase in the table
+        self._text = ""
+        self.detected: Set[str] = set()
+
+    def feed(self, fragment: str) -> List[str]:
+        """Add a fragment; return intents detected for the first time this turn."""
+        self._text = (self._text + fragment)[-self.window_chars:]
+        new = []
+        for intent in self.matcher.intents:
+            if intent not in self.detected and self.matcher.matches(intent, self._text):
+                self.detected.add(intent)
+                new.append(intent)
+        return new
+
+    def reset(self) -> None:
+        self._text = ""
+        self.detected.clear()
+
+
+DEFAULT_MATCHER = IntentMatcher.from_table(os.getenv("INTENT_PATTERNS", DEFAULT_TABLE))
@@ -0,0 +1,61 @@
+"""
+Typed dispatch of ADK live events.
+
+The response loop used to run `str(event)` on every event (a full pydantic
+repr, audio bytes included) only to look for "partial=True", plus a string
+of `hasattr` checks per part. At live-audio rates that was the most
+expensive thing the loop did. `dispatch_event` reads partial / turn /
+interrupt / resumption state straight from the Event fields and calls the
+matching handler method; nothing is stringified or copied on the way.
+"""
+
+from typing import Any
+
+
+class LiveEventHandler:
+    """Override the callbacks you need; all are synchronous and must not block."""
+
+    def on_session_handle(self, handle: str) -> None:
+        pass
+
+    def on_model_audio(self, pcm: bytes) -> None:
+        pass
+
+    def on_user_text(self, text: str, partial: bool) -> None:
+        pass
+
+    def on_model_text(self, text: str, partial: bool) -> None:
+        pass
+
+    def on_interrupted(self) -> None:
+        pass
+
+    def on_turn_complete(self) -> None:
+        pass
+
+
+def dispatch_event(event: Any, handler: LiveEventHandler) -> None:
+    """Route one `google.adk.events.Event` from Runner.run_live to `handler`."""
+    update = event.live_session_resumption_update
+    if update is not None and update.resumable and update.new_handle:
+        handler.on_session_handle(update.new_handle)
+
+    content = event.content
+    if content is not None and content.parts:
+        partial = event.partial is True
+        from_user = content.role == "user"
+        for part in content.parts:
+            blob = part.inline_data
+            if blob is not None and blob.data:
+                handler.on_model_audio(blob.data)
+            text = part.text
+            if text:
+                if from_user:
+                    handler.on_user_text(text, partial)
+                else:
+                    handler.on_model_text(text, partial)
+
+    if event.interrupted:
+        handler.on_interrupted()
+    if event.turn_complete:
+        handler.on_turn_complete()
@@ -0,0 +1,74 @@
+"""
+Server-side metrics and the /metrics HTTP endpoint body.
+
+Histograms and counters live in the shared pipeline registry
+(info_image_agent/telemetry.py), so one scrape returns WebSocket queue
+health, turn latency and describe stage latencies together. Numeric leaves of
+`server.stats()` (admission, session store, caches, ...) are exported under
+their path: leaves that only ever grow (COUNTER_KEYS) as counters with a
+`_total` suffix, e.g. `gaid_admission_shed_total`, so rate() works on them;
+everything else as gauges, e.g. `gaid_admission_active`.
+
+Every process serves its own numbers. With SERVER_WORKERS > 1 the kernel
+hands each scrape to whichever worker SO_REUSEPORT picks, so successive
+scrapes of one port come from different workers (see supervisor.py).
+"""
+
+import re
+from typing import Any, Dict, List
+
+from backend.gAIde.story_teller.info_image_agent.telemetry import REGISTRY
+
+QUEUE_DROPPED = REGISTRY.counter(
+    "gaid_ws_queue_dropped_total",
+    "Inbound media dropped (oldest first) because a per-client queue was full.",
+    ("queue",),
+)
+OUTBOUND_DROPPED = REGISTRY.counter(
+    "gaid_outbound_dropped_total",
+    "Outbound items dropped or flushed by client writers (audio in bytes, text in messages).",
+    ("lane", "reason"),
+)
+TIME_TO_FIRST_AUDIO = REGISTRY.histogram(
+    "gaid_turn_time_to_first_audio_seconds",
+    "From the user's last input in a turn to the first model audio chunk.",
+    buckets=(0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10),
+)
+
+# stats() leaves that are cumulative since process start
+COUNTER_KEYS = frozenset({
+    "admitted", "shed", "shed_queue_full", "shed_timeout", "waited",  # admission
+    "hits", "misses", "bypassed", "coalesced",  # story / places caches, session handles
+    "resumed", "evicted", "evicted_idle", "evicted_memory", "reloaded",  # sessions
+    "requests",  # pooled Places client
+    "frames", "bytes_in", "bytes_out", "bytes_saved",  # frame pool
+})
+
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _flatten(prefix: str, value: Any, out: List[str], key: str = "") -> None:
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _flatten(f"{prefix}_{_NAME_RE.sub('_', str(k))}", v, out, str(k))
+    elif isinstance(value, bool):
+        out.append(f"# TYPE {prefix} gauge")
+        out.append(f"{prefix} {int(value)}")
+    elif isinstance(value, (int, float)):
+        if key in COUNTER_KEYS:
+            out.append(f"# TYPE {prefix}_total counter")
+            out.append(f"{prefix}_total {value}")
+        else:
+            out.append(f"# TYPE {prefix} gauge")
+            out.append(f"{prefix} {value}")
+
+
+def render_stats(stats: Dict[str, Any], prefix: str = "gaid") -> str:
+    """Numeric leaves of a (nested) stats dict as Prometheus counters and gauges."""
+    out: List[str] = []
+    _flatten(prefix, stats, out)
+    return "\n".join(out) + "\n"
+
+
+def render(stats: Dict[str, Any]) -> str:
+    return REGISTRY.render() + render_stats(stats)
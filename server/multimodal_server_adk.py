@@ -1,13 +1,14 @@
 import asyncio
 import base64
 import contextlib
+import functools
 import json
 import logging
 import os
-import re
-import tempfile
-import threading
+import signal
 import time
+import uuid
+from urllib.parse import parse_qs, urlsplit
 
 from dotenv import load_dotenv
 from websockets.exceptions import ConnectionClosed, ConnectionClosedError
@@ -16,12 +17,37 @@ from websockets.exceptions import ConnectionClosed, ConnectionClosedError
 from google.adk.agents import Agent, LiveRequestQueue
 from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.runners import Runner
-from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from google.adk.tools.tool_context import ToolContext
 from google.genai import types
 
 # Ваши модули
-from backend.gAIde.story_teller.generate_story_func import generate_story_sync
+import framing
+import metrics
+from admission import Overloaded, admission_from_env
+from frame_pool import FramePool
+from frames import FrameGate, FrameRing
+from intent import DEFAULT_MATCHER, DESCRIBE_PLACE, IntentTracker
+from live_events import LiveEventHandler, dispatch_event
+from outbound import ClientWriter
+from session_handles import SESSION_HANDLES
+from supervisor import Supervisor, reuse_port_supported
+from vad import VoiceActivityGate
+from backend.gAIde.story_teller.generate_story_func import generate_story
 from backend.gAIde.story_teller.config import USER_PROFILE
+from backend.gAIde.story_teller import story_cache
+from backend.gAIde.story_teller.story_cache import STORY_CACHE
+from backend.gAIde.story_teller.research_function import KNOWN_PLACE, recognize_place
+from backend.gAIde.story_teller.session_store import session_store_from_env
+from backend.gAIde.story_teller.info_image_agent.genai_client import (
+    aclose_genai_client,
+    get_genai_client,
+)
+from backend.gAIde.story_teller.info_image_agent.places_cache import PLACES_CACHE
+from backend.gAIde.story_teller.info_image_agent.places_client import PLACES_HTTP
+from backend.gAIde.story_teller.info_image_agent.telemetry import record_upstream_error, stage_timer
+from backend.gAIde.story_teller.info_image_agent import tracing
+from fake_live import FakeLiveRunner
+from backend.gAIde.story_teller.info_image_agent import fakes
 from common import (
     BaseWebSocketServer,
     logger,
@@ -33,6 +59,133 @@ from common import (
 
 load_dotenv()
 
+# Offline stand-in for Gemini Live (FAKE_BACKEND=live, see fake_live.py)
+LIVE_RUNNER = FakeLiveRunner if fakes.enabled("live") else Runner
+
+# describe_place picks the best frame received within this window
+FRAME_FRESHNESS_S = 3.0
+FRAME_RING_SIZE = 8
+# Keep the camera's full-resolution frame for recognition; the model gets the downscaled one
+KEEP_FULL_RES_FRAMES = os.getenv("FRAME_KEEP_FULL_RES", "1") != "0"
+# Voice-activity gating of inbound mic audio
+AUDIO_VAD_ENABLED = os.getenv("AUDIO_VAD", "1") != "0"
+
+
+def decode_client_message(message: str | bytes) -> tuple[str | None, bytes | None, dict]:
+    """
+    Inbound decode step of handle_websocket_messages: one client message ->
+    (type, media bytes for audio/video, JSON fields). Binary frames carry the
+    video mode in their flags; it is returned as fields["mode"] like in JSON.
+    Raises ValueError (FrameError, JSONDecodeError, bad base64) for malformed input.
+    """
+    # Binary media frame: header + raw payload, no base64
+    if isinstance(message, bytes):
+        kind, flags, payload = framing.decode_frame(message)
+        if kind == framing.KIND_AUDIO:
+            return "audio", payload, {}
+        return "video", payload, {"mode": framing.video_mode(flags)}
+
+    data = json.loads(message)
+    if not isinstance(data, dict):
+        raise ValueError("message is not a JSON object")
+    msg_type = data.get("type")
+    if msg_type in ("audio", "video"):
+        return msg_type, base64.b64decode(data.get("data", "")), data
+    return msg_type, None, data
+
+
+class ResponseTurnHandler(LiveEventHandler):
+    """Per-client reaction to live model events, with per-turn transcript state."""
+
+    def __init__(
+        self,
+        server: "MultimodalADKServer",
+        session_id: str,
+        user_id: str,
+        writer: ClientWriter,
+        frame_gate: FrameGate,
+    ):
+        self.server = server
+        self.session_id = session_id
+        self.user_id = user_id
+        self.writer = writer
+        self.frame_gate = frame_gate
+        self.intents = IntentTracker(DEFAULT_MATCHER)
+        self.session_handle = None
+        self.input_texts = []
+        self.output_texts = []
+        self.interrupted = False
+        self.events = 0
+        self._last_user_input = None  # monotonic ts; set until the model's first audio answers it
+
+    def note_user_input(self) -> None:
+        """User spoke or typed: the next model audio closes a time-to-first-audio sample."""
+        self._last_user_input = time.monotonic()
+
+    def on_session_handle(self, handle: str) -> None:
+        self.session_handle = handle
+        logger.info(f"New SESSION: {handle}")
+        # Remember it so a reconnect with ?resume=<handle> lands back in this session
+        SESSION_HANDLES.put(handle, self.session_id, self.user_id)
+        self.writer.send_control({"type": "session_id", "data": handle})
+
+    def on_model_audio(self, pcm: bytes) -> None:
+        self.frame_gate.note_activity()  # model is speaking
+        if self._last_user_input is not None:
+            metrics.TIME_TO_FIRST_AUDIO.observe(time.monotonic() - self._last_user_input)
+            self._last_user_input = None
+        self.writer.send_audio(pcm)
+
+    def on_user_text(self, text: str, partial: bool) -> None:
+        # Не эхоим в клиент; используем для распознавания намерения
+        self.frame_gate.note_activity()  # user is speaking
+        self.note_user_input()
+        self.input_texts.append(text)
+        # Намерение ищем по частичной транскрипции, пока пользователь ещё говорит
+        if DESCRIBE_PLACE in self.intents.feed(text):
+            self.server._describe_allowed.add(self.session_id)
+            # Start frame selection + recognition + places now, before the model asks
+            self.server._start_speculative_describe(self.session_id)
+
+    def on_model_text(self, text: str, partial: bool) -> None:
+        # Отправляем только partial, чтобы не дублировать финал
+        if partial:
+            self.writer.send_text(text)
+            self.output_texts.append(text)
+
+    def on_interrupted(self) -> None:
+        if self.interrupted:
+            return
+        logger.info("🤐 INTERRUPTION DETECTED")
+        # Stale model audio must not keep playing after barge-in
+        self.writer.flush_audio()
+        self.writer.send_control({"type": "interrupted", "data": "Response interrupted by user input"})
+        self.interrupted = True
+
+    def on_turn_complete(self) -> None:
+        if not self.interrupted:
+            # ordered: must not overtake this turn's queued audio
+            self.writer.send_control(
+                {"type": "turn_complete", "session_id": self.session_handle},
+                ordered=True,
+            )
+
+        # Logs (dedup)
+        if self.input_texts:
+            unique = list(dict.fromkeys(self.input_texts))
+            logger.info(f"Input transcription: {' '.join(unique)}")
+        if self.output_texts:
+            unique = list(dict.fromkeys(self.output_texts))
+            logger.info(f"Output transcription: {' '.join(unique)}")
+
+        # Reset per turn
+        self.input_texts = []
+        self.output_texts = []
+        self.interrupted = False
+        self.intents.reset()
+        self.server._describe_allowed.discard(self.session_id)  # сбрасываем разрешение на тул
+        self.server._speculative_describes.pop(self.session_id, None)
+
 
 class MultimodalADKServer(BaseWebSocketServer):
     """WebSocket server implementation for multimodal input (audio + video) using Google ADK."""
@@ -40,13 +193,33 @@ class MultimodalADKServer(BaseWebSocketServer):
     def __init__(self, host: str = "0.0.0.0", port: int = 8765):
         super().__init__(host, port)
 
-        # Состояние последнего кадра + защита потока
-        self.latest_frame: bytes | None = None
-        self.latest_frame_ts: float = 0.0
-        self._frame_lock = threading.Lock()
+        # Кольцевой буфер последних кадров на каждую сессию (session.id -> FrameRing)
+        self._frame_rings: dict[str, FrameRing] = {}
+
+        # Пул процессов для уменьшения/перекодирования кадров перед моделью
+        self.frame_pool = FramePool()
 
-        # Разрешение на вызов describe_place в текущем ходе
-        self._allow_describe_place: bool = False
+        # Трейсинг describe-пайплайна (TRACE_FILE / TRACE_EXPORTER), по умолчанию выключен
+        tracing.configure_from_env()
+
+        # Очереди активных сессий для /metrics (session.id -> (audio_queue, video_queue, writer))
+        self._session_queues: dict[str, tuple] = {}
+        metrics.REGISTRY.gauge(
+            "gaid_ws_queue_depth",
+            "Items waiting in per-client queues, summed over sessions.",
+            self._queue_depths,
+            ("queue",),
+        )
+
+        # Сессии, которым разрешён describe_place в текущем ходе
+        self._describe_allowed: set[str] = set()
+        # describe_place, запущенный заранее по намерению пользователя (session.id -> task)
+        self._speculative_describes: dict[str, asyncio.Task] = {}
+        self._background_tasks: set[asyncio.Task] = set()
+        # Cap on concurrent story pipelines (cache misses only); DESCRIBE_MAX etc. override
+        self.describe_admission = admission_from_env(
+            "describe_place", "DESCRIBE", max_active=8, queue_size=16, queue_timeout_s=20.0, retry_after_s=10.0
+        )
 
         # Инициализация агента с привязанным методом-инструментом
         self.agent = Agent(
@@ -56,85 +229,231 @@ class MultimodalADKServer(BaseWebSocketServer):
             tools=[self.describe_place],  # ВАЖНО: bound-метод
         )
 
-        self.session_service = InMemorySessionService()
+        # Bounded (memory cap + idle eviction, optional SQLite spill), see session_store.py
+        self.session_service = session_store_from_env()
+
+    # ---------- LIFECYCLE ----------
+
+    async def on_startup(self):
+        """Create shared API clients and the frame worker pool before the first session."""
+        if fakes.enabled("places"):
+            fakes.places_url()  # serve the Places stand-in from this process; workers inherit its URL
+        self.frame_pool.start()
+        try:
+            await asyncio.to_thread(get_genai_client)
+        except Exception as e:
+            logger.warning(f"genai client not initialised at startup: {e}")
+
+    async def on_shutdown(self):
+        """Close pooled connections of the shared API clients and stop frame workers."""
+        logger.info(f"Frame pool: {self.frame_pool.stats()}")
+        self.frame_pool.shutdown()
+        with contextlib.suppress(Exception):
+            await aclose_genai_client()
+        with contextlib.suppress(Exception):
+            await PLACES_HTTP.aclose()
+
+    def _queue_depths(self) -> dict:
+        depths = {"audio": 0, "video": 0, "outbound_control": 0, "outbound_audio": 0, "outbound_text": 0}
+        for audio_queue, video_queue, writer in list(self._session_queues.values()):
+            depths["audio"] += audio_queue.qsize()
+            depths["video"] += video_queue.qsize()
+            for lane, n in writer.depth().items():
+                if lane != "audio_bytes":
+                    depths[f"outbound_{lane}"] += n
+        return depths
+
+    def stats(self):
+        return {
+            **super().stats(),
+            "speculative_describes": len(self._speculative_describes),
+            "session_handles": SESSION_HANDLES.stats(),
+            "sessions": self.session_service.stats(),
+            "describe_admission": self.describe_admission.stats(),
+            "story_cache": STORY_CACHE.stats(),
+            "places_cache": PLACES_CACHE.stats(),
+            "places_http": PLACES_HTTP.stats(),
+            "frame_pool": self.frame_pool.stats(),
+        }
 
     # ---------- SERVER-SIDE INTENT CHECK ----------
 
     @staticmethod
     def _allow_from_user_text(text: str) -> bool:
         """Определяет, просил ли пользователь запустить/выполнить описание места."""
-        t = text.lower()
-        patterns = [
-            r"\brun\s+describe_place\b",
-            r"\bdescribe\s+(this|the)?\s*(place|building|landmark)\b",
-            r"\bwhat\s+is\s+this\s+(place|building|landmark)\b",
-            # русские варианты (по желанию):
-            r"\bзапусти\s+describe_place\b",
-            r"\bопиши\s+(это|здание|место|достопримечательность)\b",
-        ]
-        return any(re.search(p, t) for p in patterns)
+        # Шаблоны (все языки) берутся из таблицы intent_patterns.tsv
+        return DEFAULT_MATCHER.matches(DESCRIBE_PLACE, text)
+
+    def _start_speculative_describe(self, session_id: str) -> None:
+        """Run the describe pipeline on the current best frame before the tool is called."""
+        ring = self._frame_rings.get(session_id)
+        best = ring.best(FRAME_FRESHNESS_S) if ring else None
+        if best is None:
+            return
+        # Speculation never queues: under load it just waits for the real tool call
+        task = asyncio.create_task(
+            self._speculative_describe(session_id, best.data), name=f"SpeculativeDescribe-{session_id}"
+        )
+        self._speculative_describes[session_id] = task
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        logger.info("Speculative describe_place started from user intent")
+
+    async def _speculative_describe(self, session_id: str, frame: bytes) -> str:
+        with tracing.span("describe_place", root=True, session_id=session_id, speculative=True):
+            return await self._describe_frame(frame, wait=False)
 
     # ---------- TOOL (с жёстким гейтом) ----------
 
-    def describe_place(self) -> str:
+    @staticmethod
+    def _session_id(tool_context: ToolContext) -> str | None:
+        """ADK session id of the live session that invoked a tool."""
+        with contextlib.suppress(AttributeError):
+            return tool_context._invocation_context.session.id
+        return None
+
+    async def describe_place(self, tool_context: ToolContext) -> str:
+        # One trace per describe, linked to (not nested in) the live session's trace
+        with stage_timer("describe"), tracing.span("describe_place", root=True, session_id=self._session_id(tool_context)):
+            return await self._describe_place(tool_context)
+
+    async def _describe_place(self, tool_context: ToolContext) -> str:
         """
         Инструмент доступен ТОЛЬКО если:
         1) Пользователь явно попросил (server-side флаг True)
-        2) Есть свежий кадр (например, не старше 3 сек)
+        2) Есть свежий кадр этой сессии (не старше FRAME_FRESHNESS_S)
+
+        Async tool: ADK awaits it on the serving loop, so the story pipeline
+        runs as a coroutine and other sessions keep streaming meanwhile.
         """
+        session_id = self._session_id(tool_context)
+
         # 1) Проверка намерения (флаг выставляется при обработке текста пользователя)
-        if not self._allow_describe_place:
+        if session_id not in self._describe_allowed:
             return (
                 "I’m ready to describe a place when you ask. "
                 "Say: 'Describe this place' or 'Run describe_place'."
             )
 
-        # 2) Свежесть кадра
-        with self._frame_lock:
-            frame = self.latest_frame
-            ts = self.latest_frame_ts
-
-        if not frame or (time.time() - ts) > 3.0:
+        # Pipeline already started on intent: just wait for it
+        speculative = self._speculative_describes.pop(session_id, None)
+        if speculative is not None and not speculative.cancelled():
+            try:
+                return await speculative
+            except Overloaded:
+                pass
+            except Exception:
+                logger.exception("Speculative describe_place failed, retrying")
+
+        # 2) Свежесть кадра: лучший (самый резкий) кадр этой сессии за окно свежести
+        ring = self._frame_rings.get(session_id)
+        best = ring.best(FRAME_FRESHNESS_S) if ring else None
+        frame = best.data if best else None
+
+        if not frame:
             return (
                 "I don’t have a fresh camera frame yet. "
                 "Please show the place to the camera or send an image."
             )
 
-        # 3) Генерация текста по кадру
-        tmp_path = None
+        # 3) Генерация текста по кадру (через кэш историй)
         try:
-            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
-                tmp.write(frame)
-                tmp_path = tmp.name
-
-            story = generate_story_sync(tmp_path, USER_PROFILE)
-            return story
-
+            return await self._describe_frame(frame)
+        except Overloaded as e:
+            logger.warning(f"describe_place shed: {self.describe_admission.stats()}")
+            return (
+                "I’m handling a lot of requests right now. "
+                f"Please ask me again in about {e.retry_after_s:.0f} seconds."
+            )
         except Exception as e:
             logger.exception("describe_place failed")
             return f"Sorry, I couldn't describe the place: {e}"
 
+    async def _describe_frame(self, frame: bytes, wait: bool = True) -> str:
+        # Ключ кэша: хэш кадра + распознанное место + профиль.
+        # Похожие кадры разных зданий не делят одну историю.
+        place = await self._recognize_frame(frame)
+        key = await asyncio.to_thread(story_cache.make_key, frame, USER_PROFILE, place=place)
+        # Only cache misses take a pipeline slot; hits and joins are free
+        story = await STORY_CACHE.get_or_create(
+            key,
+            lambda: self.describe_admission.run(lambda: self._generate_story_from_frame(frame, place), wait=wait),
+        )
+        logger.info(f"Story cache: {STORY_CACHE.stats()}")
+        return story
+
+    async def _recognize_frame(self, frame: bytes) -> dict:
+        """Recognized place for the frame ({} if recognition failed)."""
+        return await recognize_place(frame)
+
+    async def _generate_story_from_frame(self, frame: bytes, place: dict | None = None) -> str:
+        """Cache-miss path: run the full story pipeline on the in-memory frame."""
+        # The research tool reuses the place instead of recognizing the frame again
+        token = KNOWN_PLACE.set(place or None)
+        try:
+            return await generate_story(frame, USER_PROFILE)
         finally:
-            if tmp_path and os.path.exists(tmp_path):
-                with contextlib.suppress(Exception):
-                    os.remove(tmp_path)
+            KNOWN_PLACE.reset(token)
 
     # ---------- MAIN WS HANDLER ----------
 
+    @staticmethod
+    def _resume_handle(websocket) -> str | None:
+        """Resumption handle the client presented as ?resume=<handle>, if any."""
+        with contextlib.suppress(AttributeError):
+            query = parse_qs(urlsplit(websocket.request.path).query)
+            return (query.get("resume") or [None])[0] or None
+        return None
+
+    @staticmethod
+    def _run_config(resume_handle: str | None = None) -> RunConfig:
+        return RunConfig(
+            streaming_mode=StreamingMode.BIDI,
+            speech_config=types.SpeechConfig(
+                voice_config=types.VoiceConfig(
+                    prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                        voice_name=VOICE_NAME
+                    )
+                )
+            ),
+            response_modalities=["AUDIO"],
+            output_audio_transcription=types.AudioTranscriptionConfig(),
+            input_audio_transcription=types.AudioTranscriptionConfig(),
+            # Ask Gemini for resumption handles; resume upstream context when we have one
+            session_resumption=types.SessionResumptionConfig(handle=resume_handle),
+        )
+
     async def process_audio(self, websocket, client_id):
         """Process audio and video from the client using ADK."""
         # Store reference to client
         self.active_clients[client_id] = websocket
 
-        # Create session for this client
-        session = await self.session_service.create_session(
-            app_name="multimodal_assistant",
-            user_id=f"user_{client_id}",
-            session_id=f"session_{client_id}",
-        )
+        # Reconnect with a resumption handle: reuse the ADK session and upstream context
+        resume_handle = self._resume_handle(websocket)
+        record = SESSION_HANDLES.take(resume_handle) if resume_handle else None
+        session = None
+        if record is not None:
+            session = await self.session_service.get_session(
+                app_name="multimodal_assistant",
+                user_id=record.user_id,
+                session_id=record.session_id,
+            )
+        if session is not None:
+            logger.info(f"Resuming session {session.id} for client {client_id}")
+        else:
+            if resume_handle:
+                logger.info(f"Resumption handle unknown or expired; new session for client {client_id}")
+            resume_handle = None
+            # Create session for this client; id(websocket) is reused after GC, so key by uuid
+            session_key = uuid.uuid4().hex
+            session = await self.session_service.create_session(
+                app_name="multimodal_assistant",
+                user_id=f"user_{session_key}",
+                session_id=f"session_{session_key}",
+            )
 
         # Create runner
-        runner = Runner(
+        runner = LIVE_RUNNER(
             app_name="multimodal_assistant",
             agent=self.agent,
             session_service=self.session_service,
@@ -144,267 +463,246 @@ class MultimodalADKServer(BaseWebSocketServer):
         live_request_queue = LiveRequestQueue()
 
         # Create run config with audio settings
-        run_config = RunConfig(
-            streaming_mode=StreamingMode.BIDI,
-            speech_config=types.SpeechConfig(
-                voice_config=types.VoiceConfig(
-                    prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                        voice_name=VOICE_NAME
-                    )
-                )
-            ),
-            response_modalities=["AUDIO"],
-            output_audio_transcription=types.AudioTranscriptionConfig(),
-            input_audio_transcription=types.AudioTranscriptionConfig(),
-        )
+        run_config = self._run_config(resume_handle)
+        # Per-session frame buffer consulted by describe_place
+        frame_ring = FrameRing(maxlen=FRAME_RING_SIZE)
+        self._frame_rings[session.id] = frame_ring
+        # Decides which frames are worth sending to the live model
+        frame_gate = FrameGate()
+        # Drops/thins mic silence before it goes upstream
+        vad = VoiceActivityGate() if AUDIO_VAD_ENABLED else None
 
         # Bounded queues for audio/video to avoid unbounded growth
         audio_queue = asyncio.Queue(maxsize=50)
         video_queue = asyncio.Queue(maxsize=5)
 
-        client_alive = True  # guard to stop sending after browser disconnects
-
-        async with asyncio.TaskGroup() as tg:
+        # Outbound messages go through a per-client writer task, never awaited inline
+        writer = ClientWriter(websocket)
+        if resume_handle:
+            writer.send_control({"type": "resumed"})
+        self._session_queues[session.id] = (audio_queue, video_queue, writer)
+        # Reacts to model events; created up front so the audio worker can mark user input
+        handler = ResponseTurnHandler(self, session.id, session.user_id, writer, frame_gate)
+
+        async def enqueue_audio(audio_bytes: bytes):
+            # Drop oldest if queue is full (keep realtime)
+            if audio_queue.full():
+                _ = audio_queue.get_nowait()
+                audio_queue.task_done()
+                metrics.QUEUE_DROPPED.inc(queue="audio")
+            await audio_queue.put(audio_bytes)
+
+        async def enqueue_video(video_bytes: bytes, video_mode: str):
+            if video_queue.full():
+                _ = video_queue.get_nowait()
+                video_queue.task_done()
+                metrics.QUEUE_DROPPED.inc(queue="video")
+            await video_queue.put({"data": video_bytes, "mode": video_mode})
 
-            # -------- Incoming WS messages --------
-            async def handle_websocket_messages():
-                nonlocal client_alive
-                try:
-                    async for message in websocket:
-                        try:
-                            data = json.loads(message)
-                        except json.JSONDecodeError:
-                            logger.error("Invalid JSON message received")
-                            continue
-
-                        msg_type = data.get("type")
+        try:
+            async with asyncio.TaskGroup() as tg:
 
-                        if msg_type == "audio":
-                            # Decode base64 audio data
+                # -------- Incoming WS messages --------
+                async def handle_websocket_messages():
+                    try:
+                        async for message in websocket:
                             try:
-                                audio_bytes = base64.b64decode(data.get("data", ""))
-                            except Exception as e:
-                                logger.error(f"Audio b64 decode error: {e}")
+                                msg_type, media, data = decode_client_message(message)
+                            except ValueError as e:
+                                logger.error(f"Invalid client message: {e}")
                                 continue
-                            # Drop oldest if queue is full (keep realtime)
-                            if audio_queue.full():
-                                _ = audio_queue.get_nowait()
-                                audio_queue.task_done()
-                            await audio_queue.put(audio_bytes)
 
-                        elif msg_type == "video":
-                            try:
-                                video_bytes = base64.b64decode(data.get("data", ""))
-                            except Exception as e:
-                                logger.error(f"Video b64 decode error: {e}")
-                                continue
-                            video_mode = data.get("mode", "webcam")
-                            if video_queue.full():
-                                _ = video_queue.get_nowait()
-                                video_queue.task_done()
-                            await video_queue.put({"data": video_bytes, "mode": video_mode})
-
-                        elif msg_type == "end":
-                            logger.info("Received end signal from client")
-
-                        elif msg_type in ("text", "speak_text"):
-                            txt = data.get("data", "") or ""
-                            if msg_type == "speak_text":
-                                txt = f"Read the following verbatim and do not add anything else: {txt}"
-                            # Forward text to ADK
-                            live_request_queue.send_realtime(types.Part(text=txt))
-                            logger.info("Forwarded text to live_request_queue for narration")
-
-                except (ConnectionClosed, ConnectionClosedError):
-                    logger.info("Browser client closed the connection")
-                except Exception as e:
-                    logger.exception(f"MessageHandler error: {e}")
-                finally:
-                    client_alive = False
-                    # Unblock workers so TaskGroup can exit cleanly
-                    with contextlib.suppress(Exception):
-                        await audio_queue.put(None)
-                        await video_queue.put(None)
-
-            # -------- Audio worker --------
-            async def process_and_send_audio():
-                while True:
-                    data = await audio_queue.get()
-                    try:
-                        if data is None:  # sentinel
-                            return
-                        live_request_queue.send_realtime(
-                            types.Blob(
-                                data=data,
-                                mime_type=f"audio/pcm;rate={SEND_SAMPLE_RATE}",
-                            )
-                        )
+                            if msg_type == "audio":
+                                await enqueue_audio(media)
+
+                            elif msg_type == "video":
+                                await enqueue_video(media, data.get("mode", "webcam"))
+
+                            elif msg_type == "hello":
+                                # Client opts into binary audio frames from the server
+                                writer.binary_audio = data.get("binary") == framing.VERSION
+                                writer.send_control({"type": "hello", "binary": writer.binary_audio})
+
+                            elif msg_type == "end":
+                                logger.info("Received end signal from client")
+
+                            elif msg_type in ("text", "speak_text"):
+                                txt = data.get("data", "") or ""
+                                if msg_type == "speak_text":
+                                    txt = f"Read the following verbatim and do not add anything else: {txt}"
+                                # Forward text to ADK
+                                live_request_queue.send_content(types.Content(role="user", parts=[types.Part(text=txt)]))
+                                handler.note_user_input()
+                                logger.info("Forwarded text to live_request_queue for narration")
+
+                    except (ConnectionClosed, ConnectionClosedError):
+                        logger.info("Browser client closed the connection")
                     except Exception as e:
-                        logger.exception(f"AudioProcessor error: {e}")
-                        return
+                        logger.exception(f"MessageHandler error: {e}")
                     finally:
-                        audio_queue.task_done()
+                        writer.close()
+                        # Unblock workers so TaskGroup can exit cleanly
+                        with contextlib.suppress(Exception):
+                            await audio_queue.put(None)
+                            await video_queue.put(None)
 
-            # -------- Video worker --------
-            async def process_and_send_video():
-                while True:
-                    video_data = await video_queue.get()
-                    try:
-                        if video_data is None:  # sentinel
+                # -------- Audio worker --------
+                async def process_and_send_audio():
+                    while True:
+                        data = await audio_queue.get()
+                        try:
+                            if data is None:  # sentinel
+                                return
+                            # VAD: тишину прореживаем, речь (+ pre-roll/hangover) отправляем
+                            chunks = vad.feed(data) if vad is not None else [data]
+                            if vad is not None and vad.in_speech:
+                                frame_gate.note_activity()  # user is speaking
+                                handler.note_user_input()
+                            for chunk in chunks:
+                                live_request_queue.send_realtime(
+                                    types.Blob(
+                                        data=chunk,
+                                        mime_type=f"audio/pcm;rate={SEND_SAMPLE_RATE}",
+                                    )
+                                )
+                        except Exception as e:
+                            logger.exception(f"AudioProcessor error: {e}")
                             return
-                        video_bytes = video_data.get("data")
-                        video_mode = video_data.get("mode", "webcam")
-                        logger.info(f"Processing video frame from {video_mode}")
-
-                        # Обновляем буфер последнего кадра + таймштамп
-                        if video_bytes:
-                            with self._frame_lock:
-                                self.latest_frame = video_bytes
-                                self.latest_frame_ts = time.time()
-
-                        # Отправляем кадр в ADK (для контекста/мультимодальности)
-                        live_request_queue.send_realtime(
-                            types.Blob(
-                                data=video_bytes,
-                                mime_type="image/jpeg",
+                        finally:
+                            audio_queue.task_done()
+
+                # -------- Video worker --------
+                async def process_and_send_video():
+                    while True:
+                        video_data = await video_queue.get()
+                        try:
+                            if video_data is None:  # sentinel
+                                return
+                            video_bytes = video_data.get("data")
+                            video_mode = video_data.get("mode", "webcam")
+                            logger.debug(f"Processing video frame from {video_mode}")
+
+                            if not video_bytes:
+                                continue
+
+                            # Уменьшаем/перекодируем кадр в пуле процессов + оценка (резкость/экспозиция + dHash)
+                            prepared = await self.frame_pool.prepare(video_bytes)
+                            # Для распознавания храним полное разрешение (если включено)
+                            frame_ring.push(
+                                video_bytes if KEEP_FULL_RES_FRAMES else prepared.data,
+                                prepared.info.score,
                             )
-                        )
-                    except Exception as e:
-                        logger.exception(f"VideoProcessor error: {e}")
-                        return
-                    finally:
-                        video_queue.task_done()
-
-            # -------- ADK responses --------
-            async def receive_and_process_responses():
-                input_texts = []
-                output_texts = []
-                current_session_id = None
-
-                interrupted = False
-
-                try:
-                    async for event in runner.run_live(
-                        session=session,
-                        live_request_queue=live_request_queue,
-                        run_config=run_config,
-                    ):
-                        event_str = str(event)
-
-                        # Session resumption
-                        if (
-                            hasattr(event, "session_resumption_update")
-                            and event.session_resumption_update
-                        ):
-                            update = event.session_resumption_update
-                            if update.resumable and update.new_handle:
-                                current_session_id = update.new_handle
-                                logger.info(f"New SESSION: {current_session_id}")
-                                if client_alive:
-                                    with contextlib.suppress(Exception):
-                                        await websocket.send(
-                                            json.dumps(
-                                                {"type": "session_id", "data": current_session_id}
-                                            )
-                                        )
-
-                        # Content handling
-                        if event.content and event.content.parts:
-                            for part in event.content.parts:
-                                # Audio chunks from model
-                                if hasattr(part, "inline_data") and part.inline_data:
-                                    b64_audio = base64.b64encode(part.inline_data.data).decode("utf-8")
-                                    if client_alive:
-                                        with contextlib.suppress(Exception):
-                                            await websocket.send(
-                                                json.dumps({"type": "audio", "data": b64_audio})
-                                            )
-
-                                # Text chunks
-                                if hasattr(part, "text") and part.text:
-                                    if hasattr(event.content, "role") and event.content.role == "user":
-                                        # Не эхоим в клиент; используем для распознавания намерения
-                                        input_texts.append(part.text)
-                                        # Обновляем разрешение на инструмент на основе текста пользователя
-                                        self._allow_describe_place = self._allow_from_user_text(part.text)
-                                    else:
-                                        # Отправляем только partial, чтобы не дублировать финал
-                                        if "partial=True" in event_str:
-                                            if client_alive:
-                                                with contextlib.suppress(Exception):
-                                                    await websocket.send(
-                                                        json.dumps({"type": "text", "data": part.text})
-                                                    )
-                                            output_texts.append(part.text)
-
-                        # Interruption
-                        if event.interrupted and not interrupted:
-                            logger.info("🤐 INTERRUPTION DETECTED")
-                            if client_alive:
-                                with contextlib.suppress(Exception):
-                                    await websocket.send(
-                                        json.dumps(
-                                            {"type": "interrupted", "data": "Response interrupted by user input"}
-                                        )
-                                    )
-                            interrupted = True
-
-                        # Turn complete
-                        if event.turn_complete:
-                            if not interrupted and client_alive:
-                                with contextlib.suppress(Exception):
-                                    await websocket.send(
-                                        json.dumps({"type": "turn_complete", "session_id": current_session_id})
+
+                            # Отправляем кадр в ADK, только если сцена изменилась (и не чаще лимита)
+                            if frame_gate.should_forward(prepared.info.dhash):
+                                live_request_queue.send_realtime(
+                                    types.Blob(
+                                        data=prepared.data,
+                                        mime_type="image/jpeg",
                                     )
+                                )
+                        except Exception as e:
+                            logger.exception(f"VideoProcessor error: {e}")
+                            return
+                        finally:
+                            video_queue.task_done()
 
-                            # Logs (dedup)
-                            if input_texts:
-                                unique = list(dict.fromkeys(input_texts))
-                                logger.info(f"Input transcription: {' '.join(unique)}")
-                            if output_texts:
-                                unique = list(dict.fromkeys(output_texts))
-                                logger.info(f"Output transcription: {' '.join(unique)}")
-
-                            # Reset per turn
-                            input_texts = []
-                            output_texts = []
-                            interrupted = False
-                            self._allow_describe_place = False  # сбрасываем разрешение на тул
-
-                except (ConnectionClosedError, ConnectionClosed, TimeoutError) as e:
-                    logger.error(f"Gemini live connection closed: {e}")
-                    if client_alive:
-                        with contextlib.suppress(Exception):
-                            await websocket.send(json.dumps({"type": "error", "data": "model_connection_closed"}))
-                except asyncio.CancelledError:
-                    raise
-                except Exception as e:
-                    logger.exception(f"Unexpected error in ResponseHandler: {e}")
-                    if client_alive:
+                # -------- ADK responses --------
+                async def receive_and_process_responses():
+                    nonlocal run_config
+                    try:
+                        while True:
+                            try:
+                                async for event in runner.run_live(
+                                    session=session,
+                                    live_request_queue=live_request_queue,
+                                    run_config=run_config,
+                                ):
+                                    handler.events += 1
+                                    dispatch_event(event, handler)
+                                break
+                            except Exception as e:
+                                # Expired/foreign handle: upstream refuses before the first event
+                                if run_config.session_resumption.handle and not handler.events:
+                                    logger.warning(f"Live session resumption failed, starting fresh: {e}")
+                                    record_upstream_error("gemini_live", "resumption_failed")
+                                    run_config = self._run_config()
+                                    continue
+                                raise
+
+                    except (ConnectionClosedError, ConnectionClosed, TimeoutError) as e:
+                        logger.error(f"Gemini live connection closed: {e}")
+                        record_upstream_error("gemini_live", e)
+                        writer.send_control({"type": "error", "data": "model_connection_closed"})
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        logger.exception(f"Unexpected error in ResponseHandler: {e}")
+                        record_upstream_error("gemini_live", e)
+                        writer.send_control({"type": "error", "data": "server_error"})
+                    finally:
+                        # Make sure workers can exit if this task dies first
                         with contextlib.suppress(Exception):
-                            await websocket.send(json.dumps({"type": "error", "data": "server_error"}))
-                finally:
-                    # Make sure workers can exit if this task dies first
-                    with contextlib.suppress(Exception):
-                        await audio_queue.put(None)
-                        await video_queue.put(None)
+                            await audio_queue.put(None)
+                            await video_queue.put(None)
+                        writer.close()
 
-            # Start all tasks
-            tg.create_task(handle_websocket_messages(), name="MessageHandler")
-            tg.create_task(process_and_send_audio(), name="AudioProcessor")
-            tg.create_task(process_and_send_video(), name="VideoProcessor")
-            tg.create_task(receive_and_process_responses(), name="ResponseHandler")
+                # Start all tasks
+                tg.create_task(handle_websocket_messages(), name="MessageHandler")
+                tg.create_task(process_and_send_audio(), name="AudioProcessor")
+                tg.create_task(process_and_send_video(), name="VideoProcessor")
+                tg.create_task(receive_and_process_responses(), name="ResponseHandler")
+                tg.create_task(writer.run(), name="ClientWriter")
 
+        finally:
+            self._session_queues.pop(session.id, None)
+            # A resumed connection may already own this session id again
+            if self._frame_rings.get(session.id) is frame_ring:
+                self._frame_rings.pop(session.id, None)
+                self._describe_allowed.discard(session.id)
+                speculative = self._speculative_describes.pop(session.id, None)
+                if speculative is not None:
+                    speculative.cancel()
+            logger.info(f"Video gate for {client_id}: {frame_gate.stats()}")
+            logger.info(f"Outbound writer for {client_id}: {writer.stats()}")
+            if vad is not None:
+                logger.info(f"Audio VAD for {client_id}: {vad.stats()}")
 
 async def main():
     """Main function to start the server"""
-    server = MultimodalADKServer()
-    await server.start()
+    server = MultimodalADKServer(port=int(os.getenv("PORT", "8765")))
+    # SIGTERM (docker stop, loadgen --offline-server) stops serving through
+    # on_shutdown, so the frame pool's workers exit with us
+    serve_task = asyncio.create_task(server.start())
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, serve_task.cancel)
+    try:
+        await serve_task
+    except asyncio.CancelledError:
+        logger.info("Server stopped by SIGTERM")
+
+
+def run_supervised(workers: int):
+    """Pre-fork `workers` server processes on the same port (SERVER_WORKERS > 1)."""
+    if fakes.enabled("places"):
+        fakes.places_url()  # one Places stand-in in the supervisor, shared by all workers
+    Supervisor(
+        # partial of a module-level class stays picklable for spawned workers
+        functools.partial(MultimodalADKServer, port=int(os.getenv("PORT", "8765"))),
+        workers,
+        stats_file=os.getenv("SUPERVISOR_STATS_FILE") or None,
+    ).run()
 
 
 if __name__ == "__main__":
+    workers = int(os.getenv("SERVER_WORKERS", "1"))
+    if workers > 1 and not reuse_port_supported():
+        logger.warning("SO_REUSEPORT is not available on this platform; running a single worker")
+        workers = 1
     try:
-        asyncio.run(main())
+        if workers > 1:
+            run_supervised(workers)
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Exiting application via KeyboardInterrupt...")
     except Exception as e:
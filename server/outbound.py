@@ -0,0 +1,198 @@
+"""
+Per-client outbound writer with a prioritized, bounded send queue.
+
+The response loop never awaits `websocket.send` itself; it enqueues and moves
+on, so a slow mobile client can no longer back-pressure the model event
+stream. A single writer task per client drains three lanes in priority
+order:
+
+  control  (session_id, interrupted, error, ...)  never dropped
+  audio    (model PCM)                            coalesced, bounded by seconds
+  text     (output transcription partials)        bounded by count
+
+Policy when the client falls behind: the audio lane keeps at most
+`max_audio_s` of speech and drops the oldest chunks beyond that (the client
+skips ahead instead of drifting further behind realtime); the text lane drops
+its oldest partials. `interrupted` flushes pending audio outright.
+
+Ordered control messages (turn_complete) travel in the audio lane so they
+never overtake the audio of their own turn.
+"""
+
+import asyncio
+import base64
+import json
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+from websockets.exceptions import ConnectionClosed
+
+import framing
+import metrics
+from common import RECEIVE_SAMPLE_RATE, logger
+
+_AUDIO = "audio"
+_CONTROL = "control"
+_TEXT = "text"
+
+
+class ClientWriter:
+    def __init__(
+        self,
+        websocket,
+        *,
+        max_audio_s: float = 2.0,
+        max_text: int = 64,
+        coalesce_bytes: int = 9600,  # 200 ms of 24 kHz PCM16
+    ):
+        self.websocket = websocket
+        self.binary_audio = False  # set once the client negotiates binary frames
+        self.max_audio_bytes = int(max_audio_s * RECEIVE_SAMPLE_RATE * 2)
+        self.max_text = max_text
+        self.coalesce_bytes = coalesce_bytes
+
+        # Items are (kind, payload, enqueue_ts)
+        self._control: Deque[Tuple[str, Any, float]] = deque()
+        self._audio: Deque[Tuple[str, Any, float]] = deque()
+        self._text: Deque[Tuple[str, Any, float]] = deque()
+        self._audio_bytes = 0
+        self._wakeup = asyncio.Event()
+        self.closed = False
+
+        self.sent_messages = 0
+        self.audio_dropped_bytes = 0
+        self.audio_flushed_bytes = 0
+        self.text_dropped = 0
+        self.send_latency_max_s = 0.0
+        self._send_latency_total_s = 0.0
+
+    # ---------- producers (non-blocking) ----------
+
+    def send_control(self, message: Dict[str, Any], ordered: bool = False) -> None:
+        """Queue a JSON control message; ordered=True keeps it behind queued audio."""
+        if self.closed:
+            return
+        item = (_CONTROL, json.dumps(message), time.monotonic())
+        (self._audio if ordered else self._control).append(item)
+        self._wakeup.set()
+
+    def send_audio(self, pcm: bytes) -> None:
+        if self.closed:
+            return
+        self._audio.append((_AUDIO, pcm, time.monotonic()))
+        self._audio_bytes += len(pcm)
+        # Degrade: keep only the most recent max_audio_s of speech
+        while self._audio_bytes > self.max_audio_bytes:
+            dropped = self._pop_oldest_audio()
+            if dropped is None:
+                break
+            self.audio_dropped_bytes += dropped
+            metrics.OUTBOUND_DROPPED.inc(dropped, lane="audio", reason="behind")
+        self._wakeup.set()
+
+    def send_text(self, text: str) -> None:
+        if self.closed:
+            return
+        self._text.append((_TEXT, json.dumps({"type": "text", "data": text}), time.monotonic()))
+        while len(self._text) > self.max_text:
+            self._text.popleft()
+            self.text_dropped += 1
+            metrics.OUTBOUND_DROPPED.inc(lane="text", reason="behind")
+        self._wakeup.set()
+
+    def flush_audio(self) -> None:
+        """Discard queued model audio (e.g. the user interrupted); ordered control is kept."""
+        kept = deque(item for item in self._audio if item[0] != _AUDIO)
+        self.audio_flushed_bytes += self._audio_bytes
+        metrics.OUTBOUND_DROPPED.inc(self._audio_bytes, lane="audio", reason="interrupted")
+        self._audio, self._audio_bytes = kept, 0
+
+    def close(self) -> None:
+        self.closed = True
+        self._wakeup.set()
+
+    # ---------- writer task ----------
+
+    def _pop_oldest_audio(self):
+        for i, (kind, payload, _) in enumerate(self._audio):
+            if kind == _AUDIO:
+                del self._audio[i]
+                self._audio_bytes -= len(payload)
+                return len(payload)
+        return None
+
+    def _next_message(self) -> Tuple[Any, float] | None:
+        if self._control:
+            _, payload, ts = self._control.popleft()
+            return payload, ts
+        if self._audio:
+            kind, payload, ts = self._audio.popleft()
+            if kind != _AUDIO:
+                return payload, ts
+            self._audio_bytes -= len(payload)
+            # Coalesce consecutive small chunks into one send
+            parts = [payload]
+            size = len(payload)
+            while self._audio and self._audio[0][0] == _AUDIO and size < self.coalesce_bytes:
+                _, more, _ = self._audio.popleft()
+                self._audio_bytes -= len(more)
+                parts.append(more)
+                size += len(more)
+            pcm = parts[0] if len(parts) == 1 else b"".join(parts)
+            return self._encode_audio(pcm), ts
+        if self._text:
+            _, payload, ts = self._text.popleft()
+            return payload, ts
+        return None
+
+    def _encode_audio(self, pcm: bytes):
+        if self.binary_audio:
+            return framing.encode_frame(framing.KIND_AUDIO, pcm)
+        return json.dumps({"type": "audio", "data": base64.b64encode(pcm).decode("utf-8")})
+
+    async def run(self) -> None:
+        """Drain the lanes until close() or the connection drops."""
+        while True:
+            nxt = self._next_message()
+            if nxt is None:
+                if self.closed:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            payload, enqueued = nxt
+            try:
+                await self.websocket.send(payload)
+            except ConnectionClosed:
+                self.closed = True
+                return
+            except Exception as e:
+                logger.error(f"ClientWriter send error: {e}")
+                continue
+            latency = time.monotonic() - enqueued
+            self.sent_messages += 1
+            self._send_latency_total_s += latency
+            self.send_latency_max_s = max(self.send_latency_max_s, latency)
+
+    # ---------- metrics ----------
+
+    def depth(self) -> Dict[str, int]:
+        return {
+            "control": len(self._control),
+            "audio": len(self._audio),
+            "audio_bytes": self._audio_bytes,
+            "text": len(self._text),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        avg = self._send_latency_total_s / self.sent_messages if self.sent_messages else 0.0
+        return {
+            **self.depth(),
+            "sent": self.sent_messages,
+            "send_latency_avg_ms": round(avg * 1000, 2),
+            "send_latency_max_ms": round(self.send_latency_max_s * 1000, 2),
+            "audio_dropped_bytes": self.audio_dropped_bytes,
+            "audio_flushed_bytes": self.audio_flushed_bytes,
+            "text_dropped": self.text_dropped,
+        }
@@ -0,0 +1,94 @@
+"""
+Bounded, TTL-evicted store of live-session resumption handles.
+
+Gemini live sends a fresh resumption handle every few turns. The server
+remembers the latest one per ADK session so a client that drops off flaky
+mobile data can reconnect with `?resume=<handle>` and land back in the same
+ADK session with the upstream model context intact, instead of starting cold.
+
+Handles are single-use here: resuming consumes the record, and the resumed
+session immediately starts issuing new handles of its own.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class ResumeRecord(NamedTuple):
+    session_id: str
+    user_id: str
+    expires_at: float
+
+
+class SessionHandleStore:
+    """handle -> ResumeRecord, LRU-bounded, latest handle per session only."""
+
+    def __init__(self, max_entries: int = 10_000, ttl_s: float = 2 * 3600):
+        self.max_entries = max_entries
+        # Gemini keeps a handle resumable for 2 h after the session ends
+        self.ttl_s = ttl_s
+        self._records: "OrderedDict[str, ResumeRecord]" = OrderedDict()
+        self._latest: Dict[str, str] = {}  # session_id -> newest handle
+        self.resumed = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _drop(self, handle: str) -> Optional[ResumeRecord]:
+        record = self._records.pop(handle, None)
+        if record is not None and self._latest.get(record.session_id) == handle:
+            del self._latest[record.session_id]
+        return record
+
+    def put(self, handle: str, session_id: str, user_id: str) -> None:
+        self.purge_expired()
+        previous = self._latest.get(session_id)
+        if previous is not None and previous != handle:
+            self._drop(previous)  # superseded
+        self._records[handle] = ResumeRecord(session_id, user_id, time.monotonic() + self.ttl_s)
+        self._records.move_to_end(handle)
+        self._latest[session_id] = handle
+        while len(self._records) > self.max_entries:
+            oldest = next(iter(self._records))
+            self._drop(oldest)
+            self.evicted += 1
+
+    def take(self, handle: str) -> Optional[ResumeRecord]:
+        """Consume the record for `handle`, or None if unknown/expired."""
+        record = self._drop(handle)
+        if record is None or time.monotonic() >= record.expires_at:
+            self.misses += 1
+            return None
+        self.resumed += 1
+        return record
+
+    def purge_expired(self) -> int:
+        now = time.monotonic()
+        # Entries are in insertion/refresh order, so expired ones sit at the front
+        expired = 0
+        while self._records:
+            handle, record = next(iter(self._records.items()))
+            if record.expires_at > now:
+                break
+            self._drop(handle)
+            expired += 1
+        self.evicted += expired
+        return expired
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "handles": len(self._records),
+            "resumed": self.resumed,
+            "misses": self.misses,
+            "evicted": self.evicted,
+        }
+
+
+SESSION_HANDLES = SessionHandleStore(
+    max_entries=int(os.getenv("SESSION_HANDLE_MAX_ENTRIES", "10000")),
+    ttl_s=float(os.getenv("SESSION_HANDLE_TTL_S", str(2 * 3600))),
+)
@@ -0,0 +1,289 @@
+"""
+Multi-core serving: N worker processes sharing one listening port.
+
+A single process caps JSON parsing, base64 and event dispatch for every
+session at one core. The supervisor spawns `workers` processes that each run
+the normal asyncio server with SO_REUSEPORT, so the kernel spreads incoming
+connections across them; clients still connect to the same host:port.
+
+Each worker pushes a heartbeat with its `server.stats()` every
+`heartbeat_s`. The supervisor restarts workers that exit or whose heartbeat
+goes stale (with exponential backoff for crash loops) and periodically logs
+aggregated stats across workers (nested counters included, see merge_stats).
+
+/metrics is served by the workers, not the supervisor: a scrape of the shared
+port reaches whichever worker SO_REUSEPORT picks, so consecutive scrapes see
+different processes and their numbers jump. For fleet-wide totals read the
+merged stats the supervisor writes to SUPERVISOR_STATS_FILE.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import time
+from typing import Any, Callable, Dict, Optional
+
+from common import logger
+
+# A fresh worker needs time to import ADK/genai before its first heartbeat
+STARTUP_GRACE_S = 60.0
+MAX_RESTART_BACKOFF_S = 30.0
+
+
+def reuse_port_supported() -> bool:
+    return hasattr(socket, "SO_REUSEPORT")
+
+
+async def _serve_worker(server, index: int, heartbeats, heartbeat_s: float) -> None:
+    loop = asyncio.get_running_loop()
+    serve_task = asyncio.create_task(server.start(reuse_port=True))
+    loop.add_signal_handler(signal.SIGTERM, serve_task.cancel)
+
+    async def heartbeat():
+        while True:
+            try:
+                heartbeats.put_nowait((index, os.getpid(), time.time(), server.stats()))
+            except Exception as e:
+                logger.warning(f"Worker {index} heartbeat failed: {e}")
+            await asyncio.sleep(heartbeat_s)
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    try:
+        await serve_task
+    except asyncio.CancelledError:
+        pass
+    finally:
+        heartbeat_task.cancel()
+
+
+def _worker_main(server_factory: Callable[[], Any], index: int, workers: int, heartbeats, heartbeat_s: float) -> None:
+    # Ctrl+C reaches the whole process group; only the supervisor reacts to it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Share the cores between workers' frame pools instead of oversubscribing
+    os.environ.setdefault("FRAME_WORKERS", str(max(1, (os.cpu_count() or 1) // workers)))
+    server = server_factory()
+    logger.info(f"Worker {index} (pid {os.getpid()}) serving on {server.host}:{server.port}")
+    asyncio.run(_serve_worker(server, index, heartbeats, heartbeat_s))
+
+
+# Per-worker averages and the counter each one is averaged over
+AVERAGE_WEIGHTS = {"avg_wait_ms": "waited", "avg_latency_ms": "frames"}
+# Shares of a per-worker total: not additive across workers
+UNMERGED_KEYS = ("ratio", "occupancy")
+
+
+def merge_stats(totals: Dict[str, Any], stats: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add one worker's stats into `totals`, recursing into nested dicts
+    (per-queue, per-stage counters, ...):
+      - counters are summed;
+      - peak_* and *_max* values take the maximum;
+      - max_* are configured limits, the same in every worker: kept, not summed;
+      - avg_* are weighted by their counter in AVERAGE_WEIGHTS (left out without one);
+      - ratios and occupancy can't be combined and are left out.
+    """
+    prior = dict(totals)  # weights before this worker's counters are added
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            merged = merge_stats(totals.get(key) if isinstance(totals.get(key), dict) else {}, value)
+            if merged:
+                totals[key] = merged
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            if any(part in key for part in UNMERGED_KEYS):
+                continue
+            if key.startswith(("max_", "peak_")) or "_max" in key:
+                totals[key] = max(totals.get(key, value), value)
+            elif key.startswith("avg_"):
+                weight_key = AVERAGE_WEIGHTS.get(key)
+                if weight_key is None:
+                    continue
+                seen, weight = prior.get(weight_key, 0), stats.get(weight_key, 0)
+                if seen + weight:
+                    totals[key] = round((totals.get(key, 0.0) * seen + value * weight) / (seen + weight), 2)
+                else:
+                    totals.setdefault(key, 0.0)
+            else:
+                totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+class _WorkerSlot:
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.started_at = 0.0
+        self.last_heartbeat = 0.0
+        self.stats: Dict[str, Any] = {}
+        self.restarts = 0
+        self.crash_streak = 0
+        self.restart_at = 0.0  # backoff: do not respawn before this time
+
+
+class Supervisor:
+    def __init__(
+        self,
+        server_factory: Callable[[], Any],
+        workers: int,
+        heartbeat_s: float = 5.0,
+        health_timeout_s: float = 20.0,
+        stats_interval_s: float = 60.0,
+        stats_file: Optional[str] = None,
+    ):
+        self.server_factory = server_factory  # must be picklable (e.g. a module-level class)
+        self.workers = workers
+        self.heartbeat_s = heartbeat_s
+        self.health_timeout_s = health_timeout_s
+        self.stats_interval_s = stats_interval_s
+        self.stats_file = stats_file
+
+        # spawn: workers must not inherit the supervisor's threads or sockets
+        self._ctx = multiprocessing.get_context("spawn")
+        self._heartbeats = self._ctx.Queue()
+        self._slots = [_WorkerSlot(i) for i in range(workers)]
+        self._stopping = False
+
+    # ---------- worker management ----------
+
+    def _spawn(self, slot: _WorkerSlot) -> None:
+        slot.process = self._ctx.Process(
+            target=_worker_main,
+            args=(self.server_factory, slot.index, self.workers, self._heartbeats, self.heartbeat_s),
+            name=f"ws-worker-{slot.index}",
+            daemon=False,
+        )
+        slot.process.start()
+        slot.started_at = time.monotonic()
+        slot.last_heartbeat = 0.0
+        slot.stats = {}
+
+    def _stop(self, slot: _WorkerSlot, timeout_s: float = 10.0) -> None:
+        proc = slot.process
+        if proc is None:
+            return
+        if proc.is_alive():
+            proc.terminate()
+            proc.join(timeout_s)
+            if proc.is_alive():
+                logger.warning(f"Worker {slot.index} ignored SIGTERM, killing")
+                proc.kill()
+                proc.join()
+        slot.process = None
+
+    def _schedule_restart(self, slot: _WorkerSlot, reason: str) -> None:
+        now = time.monotonic()
+        # A worker that dies soon after starting is crash-looping: back off
+        slot.crash_streak = slot.crash_streak + 1 if now - slot.started_at < STARTUP_GRACE_S else 1
+        backoff = min(MAX_RESTART_BACKOFF_S, 2.0 ** (slot.crash_streak - 1))
+        slot.restart_at = now + backoff
+        slot.restarts += 1
+        slot.stats = {}  # its clients are gone with it
+        logger.error(f"Worker {slot.index} {reason}; restarting in {backoff:.0f}s")
+
+    def _check(self, slot: _WorkerSlot) -> None:
+        now = time.monotonic()
+        proc = slot.process
+        if proc is None:
+            if now >= slot.restart_at:
+                self._spawn(slot)
+            return
+
+        if not proc.is_alive():
+            code = proc.exitcode
+            slot.process = None
+            self._schedule_restart(slot, f"exited with code {code}")
+            return
+
+        last_seen = slot.last_heartbeat or slot.started_at
+        timeout = self.health_timeout_s if slot.last_heartbeat else STARTUP_GRACE_S
+        if now - last_seen > timeout:
+            self._stop(slot)
+            self._schedule_restart(slot, f"missed heartbeats for {now - last_seen:.0f}s")
+
+    def _drain_heartbeats(self, timeout_s: float) -> None:
+        deadline = time.monotonic() + timeout_s
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                index, pid, _, stats = self._heartbeats.get(timeout=remaining)
+            except queue.Empty:
+                return
+            slot = self._slots[index]
+            # Ignore late heartbeats from a worker that was already replaced
+            if slot.process is not None and slot.process.pid == pid:
+                slot.last_heartbeat = time.monotonic()
+                slot.stats = stats
+
+    # ---------- stats ----------
+
+    def stats(self) -> Dict[str, Any]:
+        per_worker = {}
+        totals: Dict[str, Any] = {}
+        for slot in self._slots:
+            alive = slot.process is not None and slot.process.is_alive()
+            per_worker[slot.index] = {
+                "pid": slot.process.pid if slot.process is not None else None,
+                "alive": alive,
+                "restarts": slot.restarts,
+                **slot.stats,
+            }
+            # Counters (active_clients, queue drops, stage timers, ...) across workers
+            merge_stats(totals, slot.stats)
+        return {
+            "workers": self.workers,
+            "alive": sum(1 for w in per_worker.values() if w["alive"]),
+            "restarts": sum(slot.restarts for slot in self._slots),
+            **totals,
+            "per_worker": per_worker,
+        }
+
+    def _report(self) -> None:
+        stats = self.stats()
+        logger.info(
+            f"Supervisor: {stats['alive']}/{stats['workers']} workers alive, "
+            f"{stats.get('active_clients', 0)} clients, {stats['restarts']} restarts"
+        )
+        if self.stats_file:
+            tmp = f"{self.stats_file}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(stats, f)
+            os.replace(tmp, self.stats_file)
+
+    # ---------- main loop ----------
+
+    def _request_stop(self, signum, _frame) -> None:
+        logger.info(f"Supervisor received signal {signum}, stopping workers")
+        self._stopping = True
+
+    def run(self) -> None:
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGTERM, self._request_stop)
+
+        logger.info(f"Supervisor starting {self.workers} workers (SO_REUSEPORT)")
+        for slot in self._slots:
+            self._spawn(slot)
+
+        next_report = time.monotonic() + self.stats_interval_s
+        try:
+            while not self._stopping:
+                self._drain_heartbeats(timeout_s=1.0)
+                if self._stopping:
+                    break
+                for slot in self._slots:
+                    self._check(slot)
+                if time.monotonic() >= next_report:
+                    self._report()
+                    next_report = time.monotonic() + self.stats_interval_s
+        finally:
+            # SIGTERM everyone first so workers drain in parallel
+            for slot in self._slots:
+                if slot.process is not None and slot.process.is_alive():
+                    slot.process.terminate()
+            for slot in self._slots:
+                self._stop(slot)
+            logger.info("Supervisor stopped")
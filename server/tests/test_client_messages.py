@@ -0,0 +1,35 @@
+"""decode_client_message: the inbound decode step of handle_websocket_messages."""
+
+import base64
+import json
+
+import pytest
+
+import framing
+from multimodal_server_adk import decode_client_message
+
+PCM = b"\x01\x02" * 320
+
+
+def test_json_and_binary_audio_decode_to_the_same_bytes():
+    as_json = json.dumps({"type": "audio", "data": base64.b64encode(PCM).decode("ascii")})
+    assert decode_client_message(as_json)[:2] == ("audio", PCM)
+    assert decode_client_message(framing.encode_frame(framing.KIND_AUDIO, PCM))[:2] == ("audio", PCM)
+
+
+def test_video_mode_comes_from_json_or_frame_flags():
+    as_json = json.dumps({"type": "video", "data": "", "mode": "screen"})
+    assert decode_client_message(as_json)[2]["mode"] == "screen"
+    frame = framing.encode_frame(framing.KIND_VIDEO, b"jpeg", framing.FLAG_SCREEN)
+    assert decode_client_message(frame) == ("video", b"jpeg", {"mode": "screen"})
+
+
+def test_text_messages_keep_their_fields():
+    msg_type, media, data = decode_client_message(json.dumps({"type": "speak_text", "data": "Hi"}))
+    assert (msg_type, media, data["data"]) == ("speak_text", None, "Hi")
+
+
+@pytest.mark.parametrize("message", ["{not json", "[1, 2]", '{"type": "audio", "data": "abcde"}', b"\x00"])
+def test_malformed_messages_raise_value_error(message):
+    with pytest.raises(ValueError):
+        decode_client_message(message)
@@ -0,0 +1,116 @@
+"""
+describe_place runs as an async tool on the serving loop: while N describes
+are in flight, other sessions' model audio must keep reaching their clients.
+
+Sessions are driven through ResponseTurnHandler by FakeLiveRunner (offline
+Gemini Live); the story pipeline behind describe_place is a slow coroutine.
+"""
+
+import asyncio
+import os
+import time
+
+from google.adk.agents import LiveRequestQueue
+from google.genai import types
+
+from backend.gAIde.story_teller.info_image_agent.fakes import Upstream
+from fake_live import FakeLiveRunner
+from frames import FrameGate, FrameRing
+from live_events import dispatch_event
+from multimodal_server_adk import MultimodalADKServer, ResponseTurnHandler
+from outbound import ClientWriter
+
+N_DESCRIBES = 8  # all admitted at once with the default DESCRIBE_MAX
+DESCRIBE_S = 3.0
+AUDIO_BOUND_S = 0.5
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.sent = []  # (monotonic ts, message)
+
+    async def send(self, message):
+        self.sent.append((time.monotonic(), message))
+
+    def first_audio_at(self):
+        for ts, message in self.sent:
+            if isinstance(message, bytes) or '"type": "audio"' in message:
+                return ts
+        return None
+
+
+async def _session(server, runner, index, text):
+    session = await server.session_service.create_session(
+        app_name="multimodal_assistant", user_id=f"user_{index}", session_id=f"session_{index}"
+    )
+    ring = FrameRing()
+    ring.push(os.urandom(4096), 1.0)  # distinct frames: no story-cache sharing
+    server._frame_rings[session.id] = ring
+
+    socket = RecordingSocket()
+    writer = ClientWriter(socket)
+    handler = ResponseTurnHandler(server, session.id, session.user_id, writer, FrameGate())
+    queue = LiveRequestQueue()
+
+    async def pump():
+        async for event in runner.run_live(session=session, live_request_queue=queue):
+            dispatch_event(event, handler)
+
+    tasks = [asyncio.create_task(pump()), asyncio.create_task(writer.run())]
+    queue.send_content(types.Content(role="user", parts=[types.Part(text=text)]))
+    return socket, tasks, time.monotonic()
+
+
+async def _wait_for(predicate, timeout_s):
+    deadline = time.monotonic() + timeout_s
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def _scenario():
+    server = MultimodalADKServer()
+    in_flight = 0
+
+    async def no_place(frame):
+        return {}
+
+    async def slow_story(frame, place=None):
+        nonlocal in_flight
+        in_flight += 1
+        try:
+            await asyncio.sleep(DESCRIBE_S)
+            return "A long story about this place."
+        finally:
+            in_flight -= 1
+
+    server._recognize_frame = no_place
+    server._generate_story_from_frame = slow_story
+    runner = FakeLiveRunner(
+        app_name="multimodal_assistant",
+        agent=server.agent,
+        session_service=server.session_service,
+        upstream=Upstream("TEST_LIVE", "fixed:0"),
+    )
+
+    tasks = []
+    try:
+        for i in range(N_DESCRIBES):
+            _, session_tasks, _ = await _session(server, runner, i, "Describe this place")
+            tasks += session_tasks
+        await _wait_for(lambda: in_flight == N_DESCRIBES, DESCRIBE_S)
+
+        socket, session_tasks, asked_at = await _session(server, runner, N_DESCRIBES, "Hello, can you hear me?")
+        tasks += session_tasks
+        await _wait_for(lambda: socket.first_audio_at() is not None, DESCRIBE_S)
+        return socket.first_audio_at() - asked_at, in_flight
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def test_audio_keeps_flowing_while_describes_are_in_flight():
+    latency_s, in_flight = asyncio.run(_scenario())
+    assert in_flight == N_DESCRIBES  # every describe was still running when the audio went out
+    assert latency_s < AUDIO_BOUND_S
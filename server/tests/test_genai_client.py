@@ -0,0 +1,53 @@
+"""Async genai connections and event loops: generate_story_sync runs every call on a fresh loop."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.gAIde.story_teller import generate_story_func
+from backend.gAIde.story_teller.info_image_agent import fakes
+from backend.gAIde.story_teller.info_image_agent.genai_client import close_genai_client, get_genai_async_client
+
+
+class _GenerateContent(BaseHTTPRequestHandler):
+    """Keep-alive generateContent endpoint: pooled connections outlive a call."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("content-length") or 0))
+        body = json.dumps({"candidates": [{"content": {"role": "model", "parts": [{"text": "A story."}]}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GenerateContent)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(fakes, "FAKE_BACKEND", set())
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setenv("GOOGLE_GEMINI_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    yield
+    close_genai_client()
+    server.shutdown()
+    server.server_close()
+
+
+def test_generate_story_sync_twice_in_a_row(gemini, monkeypatch):
+    async def story(image, profile, timeout_s):
+        response = await get_genai_async_client().models.generate_content(model="gemini-2.5-flash", contents="hi")
+        return response.text
+
+    monkeypatch.setattr(generate_story_func, "generate_story", story)
+    # The second call runs on a new loop; the first loop's pooled connection must not be reused
+    assert generate_story_func.generate_story_sync(b"frame", {}) == "A story."
+    assert generate_story_func.generate_story_sync(b"frame", {}) == "A story."
@@ -0,0 +1,13 @@
+"""/metrics rendering of server.stats(): cumulative leaves are counters, the rest gauges."""
+
+from metrics import render_stats
+
+
+def test_cumulative_stats_are_counters_with_total_suffix():
+    body = render_stats({"admission": {"active": 2, "admitted": 10, "shed": 1},
+                         "session_handles": {"handles": 3, "evicted": 4}})
+    assert "# TYPE gaid_admission_shed_total counter\ngaid_admission_shed_total 1" in body
+    assert "# TYPE gaid_admission_admitted_total counter\ngaid_admission_admitted_total 10" in body
+    assert "# TYPE gaid_session_handles_evicted_total counter\ngaid_session_handles_evicted_total 4" in body
+    assert "# TYPE gaid_admission_active gauge\ngaid_admission_active 2" in body
+    assert "# TYPE gaid_session_handles_handles gauge\ngaid_session_handles_handles 3" in body
@@ -0,0 +1,80 @@
+"""PlacesHTTPClient against the local searchNearby stand-in: pooled connections and the in-flight cap."""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.gAIde.story_teller.info_image_agent.fakes import FakePlacesServer, Upstream
+from backend.gAIde.story_teller.info_image_agent.places_client import PlacesHTTPClient
+
+HEADERS = {"Content-Type": "application/json", "X-Goog-Api-Key": "test-key"}
+BODY = {
+    "maxResultCount": 20,
+    "locationRestriction": {"circle": {"center": {"latitude": 48.179169, "longitude": 11.555972}, "radius": 150}},
+}
+
+
+def _serve(latency: str):
+    server = FakePlacesServer(upstream=Upstream("TEST_PLACES", latency))
+    accepted = []  # one entry per TCP connection the server accepts
+    get_request = server.httpd.get_request
+
+    def counting_get_request():
+        conn, addr = get_request()
+        accepted.append(addr)
+        return conn, addr
+
+    server.httpd.get_request = counting_get_request
+    return server, server.start(), accepted
+
+
+@pytest.fixture
+def places():
+    servers = []
+
+    def start(latency: str = "fixed:0"):
+        server, url, accepted = _serve(latency)
+        servers.append(server)
+        return url, accepted
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def test_sequential_requests_reuse_one_connection(places):
+    url, accepted = places()
+    client = PlacesHTTPClient(max_connections=4)
+    try:
+        for _ in range(5):
+            r = client.post_json(url, headers=HEADERS, body=BODY)
+            assert r.status_code == 200
+            assert r.json()["places"]
+    finally:
+        client.close()
+    assert client.stats()["requests"] == 5
+    assert len(accepted) == 1
+
+
+def test_in_flight_requests_never_exceed_the_limit(places):
+    url, accepted = places("fixed:0.2")
+    client = PlacesHTTPClient(max_connections=2)
+
+    async def burst():
+        return await asyncio.gather(*(client.post_json_async(url, headers=HEADERS, body=BODY) for _ in range(8)))
+
+    try:
+        t0 = time.monotonic()
+        responses = asyncio.run(burst())
+        elapsed = time.monotonic() - t0
+    finally:
+        client.close()
+
+    assert [r.status_code for r in responses] == [200] * 8
+    stats = client.stats()
+    assert stats["peak_in_flight"] == 2
+    assert stats["in_flight"] == 0
+    assert len(accepted) <= 2
+    # 8 requests of 0.2 s, two at a time: the server saw them in four waves
+    assert elapsed >= 0.75
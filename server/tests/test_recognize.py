@@ -0,0 +1,76 @@
+"""Pipelined recognition: reconciling the vision answer with nearby places, and the Places fetch it races."""
+
+import asyncio
+import json
+
+from backend.gAIde.story_teller.info_image_agent import agent
+
+NEARBY = [
+    {"name": "Bar", "address": "Carrer 1", "latitude": 41.38, "longitude": 2.17},
+    {"name": "Museum", "address": "Kunstareal", "latitude": 48.15, "longitude": 11.57},
+    {"name": "Alte Pinakothek", "address": "Barer Str. 27", "latitude": 48.1483, "longitude": 11.5700},
+]
+
+
+def _vision(name):
+    return json.dumps({"name": name, "address": "from vision", "latitude": 0.0, "longitude": 0.0})
+
+
+def test_short_nearby_name_is_not_matched_inside_a_longer_one():
+    assert agent._reconcile_with_nearby(_vision("Barcelona Cathedral"), NEARBY) is None
+    assert agent._reconcile_with_nearby(_vision("Museum Brandhorst"), NEARBY) is None
+
+
+def test_whole_name_match_takes_the_places_entry():
+    for name in ("Alte Pinakothek", "alte pinakothek", "Alte Pinakothek Museum"):
+        place = json.loads(agent._reconcile_with_nearby(_vision(name), NEARBY))
+        assert place["name"] == "Alte Pinakothek"
+        assert place["address"] == "Barer Str. 27"
+        assert place["latitude"] == 48.1483
+
+
+def _patch_pipeline(monkeypatch, *, places_s, vision_error=False):
+    calls = {"places": 0, "places_done": 0, "with_nearby": 0}
+
+    async def places(*args, **kwargs):
+        calls["places"] += 1
+        await asyncio.sleep(places_s)
+        calls["places_done"] += 1
+        return [NEARBY[2]]
+
+    async def vision(image_path, locale="en"):
+        if vision_error:
+            raise RuntimeError("vision down")
+        return _vision("Something Else Entirely")
+
+    async def with_nearby(image_path, wrapped, locale="en"):
+        calls["with_nearby"] += 1
+        return _vision("Alte Pinakothek")
+
+    monkeypatch.setattr(agent, "find_places_nearby_async", places)
+    monkeypatch.setattr(agent, "recognize_showplace_async", vision)
+    monkeypatch.setattr(agent, "recognize_showplace_with_nearby_async", with_nearby)
+    monkeypatch.setattr(agent, "PLACES_GRACE_S", 0.05)
+    return calls
+
+
+def test_late_places_fetch_finishes_after_the_grace_period(monkeypatch):
+    calls = _patch_pipeline(monkeypatch, places_s=0.2)
+
+    async def scenario():
+        text = await agent.recognize_showplace_auto_async(b"frame", lat=48.1483, lon=11.57, pipelined=True)
+        await asyncio.sleep(0.3)
+        return text
+
+    text = asyncio.run(scenario())
+    assert json.loads(text)["name"] == "Something Else Entirely"  # vision answer: places were late
+    assert calls["places_done"] == 1  # but the fetch still ran to the end and filled the cache
+
+
+def test_vision_failure_reuses_the_places_fetch(monkeypatch):
+    calls = _patch_pipeline(monkeypatch, places_s=0.05, vision_error=True)
+
+    text = asyncio.run(agent.recognize_showplace_auto_async(b"frame", lat=48.1483, lon=11.57, pipelined=True))
+    assert json.loads(text)["name"] == "Alte Pinakothek"
+    assert calls["places"] == 1
+    assert calls["with_nearby"] == 1
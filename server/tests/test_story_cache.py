@@ -0,0 +1,35 @@
+"""Story cache keys: the recognized place separates look-alike frames."""
+
+import asyncio
+
+from backend.gAIde.story_teller.story_cache import STORY_CACHE
+from multimodal_server_adk import MultimodalADKServer
+
+FRAME = b"\xff\xd8 the same facade, twice"
+
+
+def test_same_frame_of_different_places_gets_different_stories():
+    server = MultimodalADKServer()
+    places = iter([{"name": "Alte Pinakothek", "address": "Barer Str. 27"},
+                   {"name": "Neue Pinakothek", "address": "Barer Str. 29"},
+                   {"name": "Alte Pinakothek", "address": "Barer Str. 27"}])
+    generated = []
+
+    async def recognize(frame):
+        return next(places)
+
+    async def story(frame, place=None):
+        generated.append(place["name"])
+        return f"A story about {place['name']}."
+
+    server._recognize_frame = recognize
+    server._generate_story_from_frame = story
+
+    async def describe_three_times():
+        return [await server._describe_frame(FRAME) for _ in range(3)]
+
+    STORY_CACHE._entries.clear()
+    stories = asyncio.run(describe_three_times())
+    assert stories == ["A story about Alte Pinakothek.", "A story about Neue Pinakothek.",
+                       "A story about Alte Pinakothek."]
+    assert generated == ["Alte Pinakothek", "Neue Pinakothek"]  # the third was a cache hit
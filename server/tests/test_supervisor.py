@@ -0,0 +1,55 @@
+"""Supervisor totals: how one worker's stats combine with the others'."""
+
+from supervisor import merge_stats
+
+WORKER_A = {
+    "active_clients": 3,
+    "admission": {"max_active": 50, "admitted": 10, "shed": 1, "waited": 4, "avg_wait_ms": 10.0},
+    "sessions": {"max_sessions": 1000, "max_bytes": 1 << 28, "hot_sessions": 3, "occupancy": 0.25},
+    "places_http": {"in_flight": 1, "peak_in_flight": 4, "max_connections": 10},
+    "outbound": {"send_latency_max_ms": 12.5},
+    "story_cache": {"hits": 3, "misses": 1, "hit_ratio": 0.75},
+    "frame_pool": {"frames": 30, "avg_latency_ms": 20.0},
+}
+WORKER_B = {
+    "active_clients": 5,
+    "admission": {"max_active": 50, "admitted": 20, "shed": 2, "waited": 12, "avg_wait_ms": 30.0},
+    "sessions": {"max_sessions": 1000, "max_bytes": 1 << 28, "hot_sessions": 5, "occupancy": 0.5},
+    "places_http": {"in_flight": 2, "peak_in_flight": 3, "max_connections": 10},
+    "outbound": {"send_latency_max_ms": 40.0},
+    "story_cache": {"hits": 1, "misses": 3, "hit_ratio": 0.25},
+    "frame_pool": {"frames": 0, "avg_latency_ms": 0.0},
+}
+
+
+def _merged():
+    totals = {}
+    merge_stats(totals, WORKER_A)
+    merge_stats(totals, WORKER_B)
+    return totals
+
+
+def test_counters_are_summed():
+    totals = _merged()
+    assert totals["active_clients"] == 8
+    assert totals["admission"]["admitted"] == 30
+    assert totals["admission"]["shed"] == 3
+    assert totals["sessions"]["hot_sessions"] == 8
+    assert totals["story_cache"] == {"hits": 4, "misses": 4}  # the ratio is left out
+
+
+def test_limits_are_kept_and_maxima_are_not_summed():
+    totals = _merged()
+    assert totals["admission"]["max_active"] == 50
+    assert totals["sessions"]["max_sessions"] == 1000
+    assert totals["sessions"]["max_bytes"] == 1 << 28
+    assert totals["places_http"]["max_connections"] == 10
+    assert totals["places_http"]["peak_in_flight"] == 4
+    assert totals["outbound"]["send_latency_max_ms"] == 40.0
+    assert "occupancy" not in totals["sessions"]
+
+
+def test_averages_are_weighted_by_their_counter():
+    totals = _merged()
+    assert totals["admission"]["avg_wait_ms"] == 25.0  # (4 * 10 + 12 * 30) / 16
+    assert totals["frame_pool"]["avg_latency_ms"] == 20.0  # worker B prepared no frames
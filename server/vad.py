@@ -0,0 +1,132 @@
+"""
+Lightweight energy-based voice activity gate for inbound 16 kHz PCM16 audio.
+
+Tourists spend most of a session looking around, not talking. Instead of
+streaming every chunk upstream, the gate forwards:
+
+  - speech chunks (RMS clearly above an adaptive noise floor),
+  - one pre-roll chunk before speech onset, so word starts are not clipped,
+  - a hangover window of silence after speech, so the model's own VAD still
+    sees the end of the utterance,
+  - one silent keepalive chunk every `keepalive_s`, so the stream never
+    looks dead.
+
+Everything else is dropped, so upstream bytes scale with speech time rather
+than wall-clock time.
+"""
+
+import math
+import warnings
+from array import array
+from typing import List, Optional
+
+from common import SEND_SAMPLE_RATE
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop as _audioop  # C implementation; removed in Python 3.13
+except ImportError:
+    _audioop = None
+
+
+def pcm16_rms(pcm: bytes) -> float:
+    """RMS amplitude of little-endian signed 16-bit PCM."""
+    if len(pcm) < 2:
+        return 0.0
+    if len(pcm) % 2:
+        pcm = pcm[:-1]
+    if _audioop is not None:
+        return float(_audioop.rms(pcm, 2))
+    samples = array("h")
+    samples.frombytes(pcm)
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+class VoiceActivityGate:
+    def __init__(
+        self,
+        sample_rate: int = SEND_SAMPLE_RATE,
+        speech_ratio: float = 3.0,
+        min_speech_rms: float = 300.0,
+        hangover_s: float = 0.8,
+        keepalive_s: float = 1.0,
+        floor_alpha: float = 0.05,
+    ):
+        self.sample_rate = sample_rate
+        self.speech_ratio = speech_ratio      # speech = rms > floor * ratio ...
+        self.min_speech_rms = min_speech_rms  # ... and above this absolute level
+        self.hangover_s = hangover_s
+        self.keepalive_s = keepalive_s
+        self.floor_alpha = floor_alpha
+
+        self.noise_floor: Optional[float] = None
+        self._hangover_left = 0.0
+        self._since_keepalive = 0.0
+        self._preroll: Optional[bytes] = None
+
+        self.speech_s = 0.0
+        self.silence_s = 0.0
+        self.bytes_in = 0
+        self.bytes_forwarded = 0
+
+    def _duration(self, pcm: bytes) -> float:
+        return len(pcm) / 2 / self.sample_rate
+
+    def is_speech(self, rms: float) -> bool:
+        floor = self.noise_floor if self.noise_floor is not None else rms
+        return rms >= self.min_speech_rms and rms > floor * self.speech_ratio
+
+    def feed(self, pcm: bytes) -> List[bytes]:
+        """Consume one chunk; return the chunks to forward upstream (possibly none)."""
+        self.bytes_in += len(pcm)
+        duration = self._duration(pcm)
+        rms = pcm16_rms(pcm)
+        speech = self.is_speech(rms)
+
+        out: List[bytes] = []
+        if speech:
+            self.speech_s += duration
+            if self._hangover_left <= 0 and self._preroll is not None:
+                out.append(self._preroll)
+            self._preroll = None
+            self._hangover_left = self.hangover_s
+            out.append(pcm)
+        else:
+            self.silence_s += duration
+            # Only silence adapts the floor, so loud speech doesn't raise it
+            if self.noise_floor is None:
+                self.noise_floor = rms
+            else:
+                self.noise_floor += self.floor_alpha * (rms - self.noise_floor)
+
+            if self._hangover_left > 0:
+                self._hangover_left -= duration
+                out.append(pcm)
+            else:
+                self._since_keepalive += duration
+                if self._since_keepalive >= self.keepalive_s:
+                    out.append(pcm)
+                else:
+                    self._preroll = pcm
+
+        if out:
+            self._since_keepalive = 0.0
+            self.bytes_forwarded += sum(len(c) for c in out)
+        return out
+
+    @property
+    def in_speech(self) -> bool:
+        """True while speech or its hangover is being forwarded."""
+        return self._hangover_left > 0
+
+    def stats(self) -> dict:
+        total = self.speech_s + self.silence_s
+        return {
+            "speech_s": round(self.speech_s, 2),
+            "silence_s": round(self.silence_s, 2),
+            "speech_ratio": round(self.speech_s / total, 3) if total else 0.0,
+            "bytes_forwarded": self.bytes_forwarded,
+            "bytes_dropped": self.bytes_in - self.bytes_forwarded,
+            "forwarded_ratio": round(self.bytes_forwarded / self.bytes_in, 3) if self.bytes_in else 0.0,
+        }